@@ -0,0 +1,341 @@
+"""
+SAP Access Log Aggregation
+Streaming per-user 30-day access features from SAP-style event logs, with a
+sliding-window HyperLogLog for distinct T-codes
+
+An event is one row: user, timestamp, tcode, success. Logon attempts carry the
+T-code LOGON (success = logon succeeded); every other row is a transaction
+start. Logs are read in chunks and folded into fixed-size per-user state, so
+features for any number of users come without a groupby over the full log.
+"""
+
+import numpy as np
+import pandas as pd
+
+from sod_engine import sap_user_ids
+
+EVENT_COLUMNS = ['user', 'timestamp', 'tcode', 'success']
+
+# T-code of logon attempts (SAP security audit log events AU1 / AU2)
+LOGON_TCODE = 'LOGON'
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Feature columns, in the order the anomaly model consumes them
+FEATURE_COLUMNS = ['Login Count', 'Transactions', 'Failed Logins', 'Avg Access Hour', 'Unique T-Codes']
+
+_DAY_NS = 86_400 * 10**9
+_HOUR_NS = 3_600 * 10**9
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def read_events(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield event DataFrames of at most `chunk_rows` rows from a CSV or JSON Lines log"""
+    name = path.lower()
+    if name.endswith(('.jsonl', '.jsonl.gz', '.ndjson', '.ndjson.gz')):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_rows, dtype={'user': str, 'tcode': str})
+    else:
+        reader = pd.read_csv(path, usecols=EVENT_COLUMNS, chunksize=chunk_rows, dtype={'user': str, 'tcode': str})
+    for chunk in reader:
+        yield chunk[EVENT_COLUMNS]
+
+
+def _success_flags(values):
+    """Booleans from bool / 0-1 / 'true'-'false' success columns"""
+    if values.dtype == bool:
+        return values.to_numpy()
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy() != 0
+    return values.astype(str).str.strip().str.lower().isin(['true', '1', 'yes', 'y', 'success']).to_numpy()
+
+
+# ============================================================================
+# SLIDING-WINDOW HYPERLOGLOG
+# ============================================================================
+
+DEFAULT_HLL_PRECISION = 6  # 2^6 = 64 registers per user (~8% error)
+
+# Register values are capped here; 64 registers saturate near 11,000 distinct values
+MAX_RHO = 8
+
+# Days are stored as uint8 offsets from `base_day`; the base moves forward in steps of this
+_REBASE_DAYS = 128
+
+
+class SlidingHyperLogLog:
+    """
+    Distinct-count sketches for many keys over a sliding window of days.
+
+    Instead of one max-rho per register, each register keeps the last day on
+    which each rho value 1..MAX_RHO was seen. A register's value over any
+    window [start, today] is then the largest rho last seen on or after
+    `start`, which is exactly what a plain HyperLogLog fed only the window's
+    items would hold. Nothing has to be subtracted when days expire.
+
+    State is a (keys × registers × MAX_RHO) uint8 array of days counted from
+    `base_day` (0 = never). When the newest day would overflow, the base moves
+    forward and entries older than the new base are cleared, so windows of up
+    to 127 days can be queried; older events are ignored.
+    """
+
+    def __init__(self, precision=DEFAULT_HLL_PRECISION, capacity=0):
+        self.precision = precision
+        self.m = 1 << precision
+        self.base_day = None
+        self.last_day = np.zeros((capacity, self.m, MAX_RHO), dtype=np.uint8)
+
+    def grow(self, capacity):
+        if capacity > len(self.last_day):
+            grown = np.zeros((capacity, self.m, MAX_RHO), dtype=np.uint8)
+            grown[:len(self.last_day)] = self.last_day
+            self.last_day = grown
+
+    def _rebase(self, newest_day):
+        if self.base_day is None:
+            self.base_day = newest_day - _REBASE_DAYS
+        shift = newest_day - self.base_day - 254
+        if shift > 0:
+            shift = -(-shift // _REBASE_DAYS) * _REBASE_DAYS
+            self.last_day = np.where(self.last_day > shift, self.last_day - shift, 0).astype(np.uint8)
+            self.base_day += shift
+
+    def update(self, keys, days, values):
+        """Add `values` (strings) seen by `keys` (row indices) on `days` (days since 1970)"""
+        days = np.asarray(days, dtype=np.int64)
+        if len(days) == 0:
+            return
+        self._rebase(int(days.max()))
+        stored = days - self.base_day + 1
+        recent = stored >= 1
+
+        # Hash each distinct value once; logs repeat a few hundred T-codes millions of times
+        codes, uniques = pd.factorize(pd.Series(values).iloc[recent])
+        hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))[codes]
+        register = (hashes & np.uint64(self.m - 1)).astype(np.int64)
+        rest = hashes >> np.uint64(self.precision)
+        lowest = (rest & (~rest + np.uint64(1))).astype(np.float64)  # lowest set bit (0 if none)
+        rho = np.where(rest == 0, MAX_RHO, np.minimum(np.log2(np.maximum(lowest, 1)) + 1, MAX_RHO)).astype(np.int64)
+        flat = (np.asarray(keys, dtype=np.int64)[recent] * self.m + register) * MAX_RHO + rho - 1
+        np.maximum.at(self.last_day.reshape(-1), flat, stored[recent].astype(np.uint8))
+
+    def registers(self, start_day, keys=None):
+        """HyperLogLog registers of every key over days >= start_day"""
+        state = self.last_day if keys is None else self.last_day[keys]
+        first = max(start_day - self.base_day + 1, 1) if self.base_day is not None else 1
+        seen = state >= first
+        return (seen * np.arange(1, MAX_RHO + 1, dtype=np.uint8)).max(axis=2)
+
+    def estimate(self, start_day, keys=None):
+        """Distinct values per key over days >= start_day"""
+        registers = self.registers(start_day, keys)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(self.m, 0.7213 / (1 + 1.079 / self.m))
+        raw = alpha * self.m ** 2 / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+        zeros = (registers == 0).sum(axis=1)
+        # Small-range correction: linear counting while registers are still empty
+        small = (raw <= 2.5 * self.m) & (zeros > 0)
+        linear = self.m * np.log(self.m / np.maximum(zeros, 1))
+        return np.where(small, linear, raw)
+
+    @property
+    def nbytes(self):
+        return self.last_day.nbytes
+
+
+# ============================================================================
+# PER-USER WINDOW AGGREGATES
+# ============================================================================
+
+class AccessAggregator:
+    """
+    Per-user access aggregates over the last `window_days` days, fed chunk by chunk.
+
+    Counters live in a ring of daily slots per user (logons, failed logons,
+    transactions, event count and hour sum); when the newest day advances, the
+    slots of days that fell out of the window are cleared. Distinct T-codes
+    per user come from a SlidingHyperLogLog. Chunks may arrive in any order
+    within the window; events older than the window are dropped.
+
+    Example:
+        aggregator = AccessAggregator()
+        for chunk in read_events('sap_audit.csv'):
+            aggregator.update(chunk)
+        features = aggregator.features()
+    """
+
+    _COUNTERS = ('logons', 'failed', 'transactions', 'events', 'hour_sum')
+
+    def __init__(self, window_days=DEFAULT_WINDOW_DAYS, precision=DEFAULT_HLL_PRECISION):
+        self.window_days = window_days
+        self.users = []
+        self.user_index = pd.Index([], dtype=object)
+        self.slot_day = np.full(window_days, -1, dtype=np.int64)  # day held by each ring slot
+        self.today = None
+        self.counters = np.zeros((len(self._COUNTERS), 0, window_days), dtype=np.uint32)
+        self.tcodes = SlidingHyperLogLog(precision)
+        self.events_read = 0
+        self.events_dropped = 0
+
+    def _user_rows(self, user_ids):
+        """Row index of every event's user, adding unseen users"""
+        codes, uniques = pd.factorize(user_ids)
+        rows = self.user_index.get_indexer(uniques)
+        unseen = rows < 0
+        if unseen.any():
+            rows[unseen] = np.arange(len(self.users), len(self.users) + int(unseen.sum()))
+            self.users.extend(uniques[unseen].tolist())
+            self.user_index = self.user_index.append(uniques[unseen])
+        if len(self.users) > self.counters.shape[1]:
+            capacity = max(len(self.users), 2 * self.counters.shape[1], 1_024)
+            grown = np.zeros((len(self._COUNTERS), capacity, self.window_days), dtype=np.uint32)
+            grown[:, :self.counters.shape[1]] = self.counters
+            self.counters = grown
+            self.tcodes.grow(capacity)
+        return rows[codes]
+
+    def _advance(self, day):
+        """Move the window end to `day`, clearing the slots of expired days"""
+        first = day - self.window_days + 1 if self.today is None else max(self.today + 1, day - self.window_days + 1)
+        for d in range(first, day + 1):
+            slot = d % self.window_days
+            if self.slot_day[slot] != d:
+                self.counters[:, :, slot] = 0
+                self.slot_day[slot] = d
+        self.today = day
+
+    def update(self, events):
+        """Fold one chunk of events (columns: user, timestamp, tcode, success) into the window"""
+        if len(events) == 0:
+            return 0
+        ns = pd.to_datetime(events['timestamp']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        days = ns // _DAY_NS
+        newest = int(days.max())
+        if self.today is None or newest > self.today:
+            self._advance(newest)
+
+        keep = days > self.today - self.window_days
+        self.events_read += len(events)
+        self.events_dropped += int((~keep).sum())
+        if not keep.any():
+            return 0
+        events = events[keep]
+        days, ns = days[keep], ns[keep]
+
+        rows = self._user_rows(events['user'].astype(str))
+        tcodes = events['tcode'].astype(str)
+        success = _success_flags(events['success'])
+        logon = (tcodes == LOGON_TCODE).to_numpy()
+        hours = (ns % _DAY_NS) // _HOUR_NS
+
+        cell = rows * self.window_days + days % self.window_days
+        for name, weights in (('logons', logon & success), ('failed', logon & ~success),
+                              ('transactions', ~logon), ('events', None), ('hour_sum', hours)):
+            counter = self.counters[self._COUNTERS.index(name)].reshape(-1)
+            np.add.at(counter, cell, 1 if weights is None else weights.astype(np.uint32))
+
+        self.tcodes.update(rows[~logon], days[~logon], tcodes[~logon])
+        return len(events)
+
+    @property
+    def n_users(self):
+        return len(self.users)
+
+    def features(self, active_only=True):
+        """
+        One row per user: FEATURE_COLUMNS over the current window.
+
+        Args:
+            active_only: Skip users without events in the window
+        """
+        n = len(self.users)
+        in_window = (self.slot_day > self.today - self.window_days) if self.today is not None else np.zeros(0, bool)
+        totals = self.counters[:, :n][:, :, in_window].sum(axis=2, dtype=np.int64)
+        logons, failed, transactions, events, hour_sum = totals
+        start = self.today - self.window_days + 1 if self.today is not None else 0
+
+        frame = pd.DataFrame({
+            'User ID': self.users,
+            'Login Count': logons,
+            'Transactions': transactions,
+            'Failed Logins': failed,
+            'Avg Access Hour': np.divide(hour_sum, events, out=np.full(n, np.nan), where=events > 0),
+            'Unique T-Codes': np.rint(self.tcodes.estimate(start, np.arange(n))).astype(np.int64),
+        })
+        return frame[events > 0].reset_index(drop=True) if active_only else frame
+
+    def nbytes(self):
+        return self.counters.nbytes + self.tcodes.nbytes
+
+
+# ============================================================================
+# SYNTHETIC LOG
+# ============================================================================
+
+# T-codes synthetic users draw from: everyday transactions and a wider sensitive pool
+_COMMON_TCODES = ['FB03', 'FBL1N', 'FBL3N', 'FBL5N', 'ME23N', 'VA03', 'MM03', 'FS10N', 'MB52', 'ME2N',
+                  'VA05', 'FB60', 'MIRO', 'ME21N', 'VA01', 'MIGO', 'F-02', 'FB50', 'XK03', 'XD03']
+_WIDE_TCODES = [f'{prefix}{i:02d}' for prefix in ('SE', 'SU', 'SM', 'PA', 'PC') for i in range(1, 17)]
+
+ANOMALY_TYPES = ('high_activity', 'off_hours', 'wide_access')
+
+
+def generate_access_log(n_users, days=DEFAULT_WINDOW_DAYS, anomaly_share=0.1, end=None, seed=None):
+    """
+    Synthetic SAP audit events, sorted by time.
+
+    Normal users log on about once per working day around 08:00 and run a few
+    transactions from a personal pool of ~15 T-codes. A share of users is
+    anomalous: high activity, off-hours access with failed logons, or wide
+    access across many T-codes with failed logons.
+
+    Returns:
+        (events, anomalies): the event log and a Series user → anomaly type
+    """
+    rng = np.random.default_rng(seed)
+    users = sap_user_ids(n_users, rng)
+    end = pd.Timestamp(end if end is not None else '2026-01-31').normalize()
+    day0 = (end - pd.Timedelta(days=days - 1)).value // _DAY_NS
+
+    kind = np.full(n_users, -1)
+    anomalous = rng.choice(n_users, max(1, int(n_users * anomaly_share)), replace=False)
+    kind[anomalous] = rng.integers(len(ANOMALY_TYPES), size=len(anomalous))
+
+    # Logon sessions: active user-days, 1-2 logons each (four times as many for high activity)
+    active = rng.random((n_users, days)) < 0.75
+    user_day = np.argwhere(active)
+    sessions = 1 + rng.poisson(0.2, len(user_day))
+    sessions[kind[user_day[:, 0]] == 0] *= 4
+    s_user = np.repeat(user_day[:, 0], sessions)
+    s_day = np.repeat(user_day[:, 1], sessions)
+    off_hours = kind[s_user] == 1
+    hour = np.where(off_hours, rng.uniform(0, 4, len(s_user)), rng.normal(8, 1, len(s_user)).clip(6, 10))
+    s_start = (day0 + s_day) * _DAY_NS + (hour * _HOUR_NS).astype(np.int64)
+
+    # Failed attempts just before some sessions
+    p_fail = np.where(kind[s_user] >= 1, 0.6, 0.03)
+    failed = rng.random(len(s_user)) < p_fail
+    n_failed = np.where(failed, 1 + rng.poisson(np.where(kind[s_user] >= 1, 1.0, 0.0)), 0)
+    f_user = np.repeat(s_user, n_failed)
+    f_time = np.repeat(s_start, n_failed) - rng.integers(1, 600, n_failed.sum()) * 10**9
+
+    # Transactions within ~2 hours of the logon, from the user's T-code pool
+    tx = rng.poisson(6, len(s_user))
+    t_user = np.repeat(s_user, tx)
+    t_time = np.repeat(s_start, tx) + rng.integers(0, 2 * _HOUR_NS, tx.sum())
+    pools = np.argsort(rng.random((n_users, len(_COMMON_TCODES))), axis=1)[:, :15]
+    common = np.array(_COMMON_TCODES)[pools[t_user, rng.integers(15, size=len(t_user))]]
+    wide = np.array(_WIDE_TCODES)[rng.integers(len(_WIDE_TCODES), size=len(t_user))]
+    t_code = np.where((kind[t_user] == 2) & (rng.random(len(t_user)) < 0.7), wide, common)
+
+    events = pd.DataFrame({
+        'user': users[np.concatenate([s_user, f_user, t_user])],
+        'timestamp': pd.to_datetime(np.concatenate([s_start, f_time, t_time])),
+        'tcode': np.concatenate([np.full(len(s_user) + len(f_user), LOGON_TCODE), t_code]),
+        'success': np.concatenate([np.ones(len(s_user), bool), np.zeros(len(f_user), bool),
+                                   np.ones(len(t_user), bool)]),
+    })
+    events = events.sort_values('timestamp', kind='stable', ignore_index=True)
+    anomalies = pd.Series(np.array(ANOMALY_TYPES)[kind[anomalous]], index=users[anomalous], name='Anomaly Type')
+    return events, anomalies
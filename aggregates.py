@@ -0,0 +1,292 @@
+"""
+Score Aggregates
+Multi-resolution summaries of anomaly-score histories for constant-size chart payloads
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# AGGREGATE PYRAMID
+# ============================================================================
+
+_HOUR_NS = 3_600 * 10**9
+_DAY_NS = 24 * _HOUR_NS
+
+# (name, bucket width, offset) from finest to coarsest; the weekly offset moves
+# bucket edges from the epoch's Thursday to Monday
+PYRAMID_LEVELS = (
+    ('hourly', _HOUR_NS, 0),
+    ('daily', _DAY_NS, 0),
+    ('weekly', 7 * _DAY_NS, 3 * _DAY_NS),
+)
+
+
+def _to_ns(value):
+    return np.datetime64(pd.Timestamp(value), 'ns').view(np.int64)
+
+
+def _aggregate(ts, scores, alerts, width, offset):
+    """One pyramid level; `ts` must be sorted int64 nanoseconds"""
+    bucket = (ts + offset) // width
+    first = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    count = np.diff(np.r_[first, len(ts)])
+    return {
+        'start': bucket[first] * width - offset,
+        'min': np.minimum.reduceat(scores, first),
+        'max': np.maximum.reduceat(scores, first),
+        'mean': np.add.reduceat(scores.astype(np.float64), first) / count,
+        'count': count,
+        'alerts': np.add.reduceat(alerts.astype(np.int64), first),
+    }
+
+
+class AggregatePyramid:
+    """
+    Min / max / mean / alert-count buckets at hourly, daily and weekly resolution.
+
+    Built once per (bus, alert definition) in O(n). A query picks the finest
+    level whose bucket count in the requested window fits the point budget, and
+    slices it with binary search on the sorted bucket starts, so the chart
+    payload stays bounded however long the history grows.
+    """
+
+    def __init__(self, timestamps, scores, alerts=None, levels=PYRAMID_LEVELS):
+        ts = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+        scores = np.asarray(scores)
+        alerts = np.zeros(len(ts), dtype=bool) if alerts is None else np.asarray(alerts, dtype=bool)
+        if len(ts) == 0:
+            raise ValueError("Cannot build an aggregate pyramid from an empty history")
+        self.n_rows = len(ts)
+        self.level_names = [name for name, _, _ in levels]
+        self.levels = {name: _aggregate(ts, scores, alerts, width, offset) for name, width, offset in levels}
+
+    def _window(self, name, start, end):
+        """[lo, hi) buckets overlapping start <= t < end"""
+        starts = self.levels[name]['start']
+        lo = 0 if start is None else max(int(np.searchsorted(starts, _to_ns(start), 'right')) - 1, 0)
+        hi = len(starts) if end is None else int(np.searchsorted(starts, _to_ns(end), 'left'))
+        return lo, hi
+
+    def choose_level(self, start=None, end=None, max_buckets=1_500):
+        """Finest level with at most `max_buckets` buckets in the window (else the coarsest)"""
+        for name in self.level_names:
+            lo, hi = self._window(name, start, end)
+            if hi - lo <= max_buckets:
+                return name
+        return self.level_names[-1]
+
+    def query(self, start=None, end=None, max_buckets=1_500, level=None):
+        """
+        Buckets of one level within [start, end).
+
+        Returns:
+            DataFrame with timestamp, min, max, mean, count and alerts columns;
+            the chosen level is in `.attrs['level']`
+        """
+        level = level or self.choose_level(start, end, max_buckets)
+        lo, hi = self._window(level, start, end)
+        agg = self.levels[level]
+        out = pd.DataFrame({
+            'timestamp': agg['start'][lo:hi].view('datetime64[ns]'),
+            'min': agg['min'][lo:hi],
+            'max': agg['max'][lo:hi],
+            'mean': agg['mean'][lo:hi],
+            'count': agg['count'][lo:hi],
+            'alerts': agg['alerts'][lo:hi],
+        })
+        out.attrs['level'] = level
+        return out
+
+
+# ============================================================================
+# ALERT EPISODES
+# ============================================================================
+
+def alert_episodes(alert_rows, timestamps, scores, types=None, max_gap=1):
+    """
+    Run-length encode alerting rows into episodes in one O(k) pass over the k alerts.
+
+    Args:
+        alert_rows: Ascending row indices of alerting readings
+        timestamps, scores: Full-length columns of the history
+        types: Optional full-length pd.Categorical (e.g. maintenance type); the
+            most frequent non-'Normal' category becomes the episode's type
+        max_gap: Alerts at most this many rows apart belong to the same episode
+            (1 = strictly consecutive readings)
+
+    Returns:
+        DataFrame in time order with start, end, duration, readings, peak_score
+        and (if types were given) type columns, plus start_row / end_row
+    """
+    alert_rows = np.asarray(alert_rows, dtype=np.int64)
+    columns = ['start', 'end', 'duration', 'readings', 'peak_score', 'start_row', 'end_row']
+    if len(alert_rows) == 0:
+        return pd.DataFrame(columns=columns + (['type'] if types is not None else []))
+
+    first = np.flatnonzero(np.r_[True, np.diff(alert_rows) > max_gap])
+    last = np.r_[first[1:], len(alert_rows)] - 1
+    timestamps = np.asarray(timestamps)
+    start = timestamps[alert_rows[first]]
+    end = timestamps[alert_rows[last]]
+
+    out = pd.DataFrame({
+        'start': start,
+        'end': end,
+        'duration': end - start,
+        'readings': last - first + 1,
+        'peak_score': np.maximum.reduceat(np.asarray(scores)[alert_rows], first),
+        'start_row': alert_rows[first],
+        'end_row': alert_rows[last],
+    })
+
+    if types is not None:
+        categories = types.categories
+        codes = np.asarray(types.codes)[alert_rows]
+        one_hot = np.zeros((len(alert_rows), len(categories)), dtype=np.int32)
+        one_hot[np.arange(len(alert_rows)), codes] = 1
+        counts = np.add.reduceat(one_hot, first, axis=0)
+        if 'Normal' in categories:
+            normal = categories.get_loc('Normal')
+            # Only fall back to 'Normal' when an episode has no other category
+            counts[:, normal] = np.where(counts.sum(axis=1) > counts[:, normal], 0, counts[:, normal])
+        out['type'] = pd.Categorical.from_codes(np.argmax(counts, axis=1), categories=categories)
+    return out
+
+
+def top_episodes(episodes, k, by='recent'):
+    """
+    The k most recent (or highest-peak) episodes without sorting all of them.
+
+    Episodes come out of `alert_episodes` in time order, so the most recent k
+    are a tail slice; the highest peaks are selected with argpartition and
+    only those k are ordered.
+    """
+    if len(episodes) <= k:
+        selected = np.arange(len(episodes))
+    elif by == 'recent':
+        selected = np.arange(len(episodes) - k, len(episodes))
+    else:
+        selected = np.argpartition(episodes['peak_score'].to_numpy(), -k)[-k:]
+    if by == 'recent':
+        selected = selected[::-1]
+    else:
+        selected = selected[np.argsort(-episodes['peak_score'].to_numpy()[selected], kind='stable')]
+    return episodes.iloc[selected]
+
+
+# ============================================================================
+# FLEET DAILY ROLLUPS
+# ============================================================================
+
+_ROLLUP_FIELDS = ('max', 'alerts', 'count')
+
+
+class DailyRollup:
+    """
+    Per-bus daily max score, alert count and reading count, maintained incrementally.
+
+    `update` only aggregates readings newer than the last one it has seen for
+    that bus; a partial last day is merged with the new readings of the same
+    day. Thread-safe, so one instance can be shared by every session.
+    """
+
+    def __init__(self):
+        self._buses = {}
+        self._lock = threading.Lock()
+
+    def update(self, bus_id, timestamps, scores, alerts):
+        """
+        Fold a bus's time-ordered history into its rollup.
+
+        The full history can be passed on every call: the already-seen prefix is
+        skipped with a binary search.
+
+        Returns:
+            Number of new readings aggregated
+        """
+        ts = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+        with self._lock:
+            state = self._buses.get(bus_id)
+            first_new = 0 if state is None else int(np.searchsorted(ts, state['last_ts'], 'right'))
+            if first_new >= len(ts):
+                return 0
+            new = _aggregate(ts[first_new:], np.asarray(scores)[first_new:],
+                             np.asarray(alerts, dtype=bool)[first_new:], _DAY_NS, 0)
+            days = new['start'] // _DAY_NS
+            fields = {'max': new['max'].astype(np.float32), 'alerts': new['alerts'], 'count': new['count']}
+            if state is not None:
+                old = {field: state[field] for field in _ROLLUP_FIELDS}
+                old_days = state['days']
+                if len(old_days) and old_days[-1] == days[0]:
+                    # The first new day continues the stored partial day: merge into a copy
+                    old = {field: values.copy() for field, values in old.items()}
+                    old['max'][-1] = max(old['max'][-1], fields['max'][0])
+                    old['alerts'][-1] += fields['alerts'][0]
+                    old['count'][-1] += fields['count'][0]
+                    days = days[1:]
+                    fields = {field: values[1:] for field, values in fields.items()}
+                days = np.concatenate([old_days, days])
+                fields = {field: np.concatenate([old[field], fields[field].astype(old[field].dtype)])
+                          for field in _ROLLUP_FIELDS}
+            # Readers hold on to whole state dicts, so a new one is swapped in rather than edited
+            self._buses[bus_id] = {'days': days, **fields, 'last_ts': ts[-1]}
+            return len(ts) - first_new
+
+    def _states(self, bus_ids=None):
+        """Consistent snapshot of the given buses' states (missing buses are None)"""
+        with self._lock:
+            return [self._buses.get(b) for b in (self._buses if bus_ids is None else bus_ids)]
+
+    def day_range(self, bus_ids=None):
+        """(first, last) day covered by the given buses, as datetime64[D]"""
+        return self._day_range(self._states(bus_ids or None))
+
+    @staticmethod
+    def _day_range(states):
+        states = [st for st in states if st is not None]
+        first = min(int(st['days'][0]) for st in states)
+        last = max(int(st['days'][-1]) for st in states)
+        return np.datetime64(first, 'D'), np.datetime64(last, 'D')
+
+    def matrix(self, bus_ids, field='max', start=None, end=None):
+        """
+        Dense (buses × days) matrix of one field; days without readings are NaN.
+
+        Args:
+            start, end: Inclusive day range (defaults to the buses' full range)
+
+        Returns:
+            (matrix, days) with days as a datetime64[D] array
+        """
+        if field not in _ROLLUP_FIELDS:
+            raise ValueError(f"field must be one of {_ROLLUP_FIELDS}, got {field!r}")
+        states = self._states(bus_ids)
+        default_start, default_end = self._day_range(states)
+        first = (default_start if start is None else np.datetime64(start, 'D')).astype(np.int64)
+        last = (default_end if end is None else np.datetime64(end, 'D')).astype(np.int64)
+        n_days = int(last - first) + 1
+        out = np.full((len(bus_ids), n_days), np.nan, dtype=np.float32)
+        for row, state in enumerate(states):
+            if state is None:
+                continue
+            lo = int(np.searchsorted(state['days'], first, 'left'))
+            hi = int(np.searchsorted(state['days'], last, 'right'))
+            out[row, state['days'][lo:hi] - first] = state[field][lo:hi]
+        days = np.arange(first, first + n_days).astype('datetime64[D]')
+        return out, days
+
+    @property
+    def bus_ids(self):
+        with self._lock:
+            return list(self._buses)
+
+    @property
+    def n_buses(self):
+        with self._lock:
+            return len(self._buses)
+
+    def nbytes(self):
+        return sum(st[f].nbytes for st in self._states() for f in ('days',) + _ROLLUP_FIELDS)
@@ -10,13 +10,30 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
+import os
 import random
+import functools
 import hashlib
 import time
+import threading
+from collections import OrderedDict
 
 # Import configuration
 from config import PROFILE, SUMMARY, SKILLS, PROJECTS, EXPERIENCE, CERTIFICATIONS, DEMO_CONFIG, EDUCATION
+from telemetry import (GENERATOR_VERSION, SENSOR_NAMES, fleet_bus_ids,
+                       generate_bus_history, generate_fleet, score_digest, stable_seed)
+from quantiles import DEFAULT_PERCENTILES, SeasonalThresholds, SortedScores, StreamingThresholds, TDigest
+from sensor_store import SensorStore
+from charts import downsample_indices, scatter_trace
+from aggregates import AggregatePyramid, DailyRollup, alert_episodes, top_episodes
+from autoencoder import AutoencoderScorer
+from replay import OnlinePipeline, TelemetryReplay
+from isolation_forest import IsolationForest
+from role_recommender import RoleRecommender
+from access_log import FEATURE_COLUMNS, AccessAggregator, generate_access_log
+from sod_engine import IncrementalSodEngine, SodEngine, generate_access_assignments, role_catalog
+from features import ATTRIBUTION_CATEGORIES, category_errors, extract_features, sensor_errors, top_sensors
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -410,14 +427,66 @@ def mask_user_id(user_id):
     prefixes = ["JSMITH", "MJONES", "ABROWN", "KWILSON", "RGARCIA", "TLEE", "DCHEN", "PKIM", "NWANG", "SZHOU"]
     return f"{random.choice(prefixes)}{random.randint(100, 999)}"
 
+# ============================================================================
+# AUTOENCODER SCORING
+# ============================================================================
+
+@st.cache_resource
+def get_pdm_model():
+    """
+    Autoencoder weights from the configured .npz, shared by every session.
+    
+    Returns:
+        (scorer, model_id): scorer is None when the file does not exist (each
+        bus then gets a PCA reference model, see bus_scorer); model_id is kept
+        with stored histories, so new weights rescore them
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEMO_CONFIG['anomaly_detection']['model_path'])
+    if not os.path.exists(path):
+        return None, 'pca-reference'
+    with open(path, 'rb') as f:
+        model_id = hashlib.sha256(f.read()).hexdigest()[:16]
+    return AutoencoderScorer.load(path), model_id
+
+def bus_scorer(features, df):
+    """The configured autoencoder, else a PCA reference fitted on the bus's normal readings"""
+    scorer, _ = get_pdm_model()
+    if scorer is None:
+        # Generator labels: unlike 'Anomaly Score', they are kept when the history is rescored
+        normal = (df['Maintenance Type'] == 'Normal').to_numpy()
+        scorer = AutoencoderScorer.from_pca(features[normal])
+    return scorer
+
+def apply_autoencoder_scores(df):
+    """
+    Score a generated history with the autoencoder.
+    
+    'Anomaly Score' becomes the reconstruction error of each reading's rolling
+    features, and 'Is Anomaly' / 'Threshold_95' are recomputed from it; the
+    sensor readings and maintenance labels are kept.
+    """
+    features = extract_features(df)
+    df = df.assign(**{'Anomaly Score': bus_scorer(features, df).score(features).astype(np.float64)})
+    threshold_95 = float(score_digest(df).percentile(95))
+    df['Is Anomaly'] = df['Anomaly Score'] > threshold_95
+    df['Threshold_95'] = threshold_95
+    return df
+
 # ============================================================================
 # SAMPLE DATA GENERATORS FOR DEMOS
 # ============================================================================
 
-def generate_anomaly_detection_data():
+def generate_anomaly_detection_data(seed=42, freq='4h', bus_id=None):
     """
     Generate sample IoT sensor data for anomaly detection demo - 10 months of data
     
+    Args:
+        seed: Seed of the single np.random.Generator behind all sampling, so the
+            same (seed, freq, bus_id) always yields the same data
+        freq: Sampling interval of the generated history (pandas offset alias)
+        bus_id: Vehicle to generate; each bus gets its own stable seed and
+            shifted anomaly periods (None = the original single-bus series)
+    
     Model Architecture (Autoencoder):
     - Input: 51 engineered features (17 sensors × 3 features: trend, std, residual)
     - Encoder: 51 → 32 → 16 → 8 (latent space)
@@ -426,191 +495,44 @@ def generate_anomaly_detection_data():
     - Loss: Mean Squared Error (MSE)
     - Training: 50 epochs, batch size 32
     
-    Note: Idling state (RPM < 700) is filtered out for cleaner trend analysis
+    Note: Idling state (RPM < 700) is filtered out for cleaner trend analysis;
+    'Anomaly Score' is the autoencoder's reconstruction error (see apply_autoencoder_scores)
     """
-    np.random.seed(42)
-    # Generate 10 months of data (like the reference: 2024-11 to 2025-09)
-    # Generate more points initially to account for filtering
-    dates = pd.date_range(start='2024-11-01', end='2025-09-15', freq='4h')
-    n_points = len(dates)
-    
-    # 17 IoT Sensors monitored
-    sensor_names = [
-        'Engine Temperature', 'Engine Load', 'Fuel Rate', 'Vibration X', 'Vibration Y', 
-        'Vibration Z', 'Board Voltage', 'RPM', 'Oil Pressure', 'Coolant Temp',
-        'Intake Air Temp', 'Exhaust Temp', 'Throttle Position', 'Battery Voltage',
-        'Transmission Temp', 'Brake Pressure', 'Wheel Speed'
-    ]
-    
-    # Generate base anomaly scores (reconstruction errors) with realistic patterns
-    base_scores = np.random.exponential(0.15, n_points)
-    
-    # Add some periodic patterns and drift
-    time_idx = np.arange(n_points)
-    seasonal = 0.1 * np.sin(2 * np.pi * time_idx / (24 * 7))  # Weekly pattern
-    base_scores = base_scores + seasonal + 0.1
-    
-    # Inject anomaly periods with maintenance type indicators
-    # Period 1: Jan 2025 - Mechanical issues (vibration-related)
-    jan_start = int(n_points * 0.25)
-    jan_end = int(n_points * 0.35)
-    for i in range(jan_start, jan_end):
-        if random.random() > 0.7:
-            base_scores[i] = random.uniform(1.0, 1.5)
-    
-    # Period 2: Feb-Mar 2025 - Engine Performance issues
-    feb_start = int(n_points * 0.38)
-    feb_end = int(n_points * 0.55)
-    for i in range(feb_start, feb_end):
-        if random.random() > 0.5:
-            base_scores[i] = random.uniform(0.9, 2.5)
-    spike_idx = int(n_points * 0.45)
-    base_scores[spike_idx] = 3.75
-    
-    # Period 3: Mar-Apr 2025 - Electrical issues
-    mar_start = int(n_points * 0.50)
-    mar_end = int(n_points * 0.62)
-    for i in range(mar_start, mar_end):
-        if random.random() > 0.6:
-            base_scores[i] = random.uniform(0.9, 2.2)
-    
-    # Quiet period: May-Jul 2025
-    quiet_start = int(n_points * 0.65)
-    quiet_end = int(n_points * 0.82)
-    base_scores[quiet_start:quiet_end] = np.random.uniform(0.02, 0.15, quiet_end - quiet_start)
-    
-    # Period 4: Aug-Sep 2025 - Mixed issues
-    aug_start = int(n_points * 0.85)
-    for i in range(aug_start, n_points):
-        if random.random() > 0.4:
-            base_scores[i] = random.uniform(0.9, 2.0)
-    
-    base_scores[-1] = 1.2732
-    base_scores = np.clip(base_scores, 0, 4)
-    
-    # Generate RPM with operating state simulation
-    # Normal operating RPM: 800-2500, Idling: 400-700
-    rpm_base = np.random.normal(1500, 300, n_points)
-    # Add some idling periods (about 15% of data)
-    idling_mask = np.random.random(n_points) < 0.15
-    rpm_base[idling_mask] = np.random.uniform(400, 650, idling_mask.sum())
-    rpm = rpm_base + base_scores * 200
-    
-    # Generate raw sensor data (17 sensors)
-    data = {
-        'timestamp': dates,
-        'Anomaly Score': base_scores,
-        'RPM': rpm,
-    }
-    
-    # Add sensor readings with anomaly type signatures
-    sensor_configs = {
-        'Engine Temperature': (75, 8, 15),
-        'Engine Load': (45, 15, 20),
-        'Fuel Rate': (25, 5, 8),
-        'Vibration X': (0.5, 0.2, 0.8),
-        'Vibration Y': (0.4, 0.15, 0.6),
-        'Vibration Z': (0.3, 0.1, 0.5),
-        'Board Voltage': (26, 1.5, -2),
-        'Oil Pressure': (45, 8, 10),
-        'Coolant Temp': (85, 5, 12),
-        'Intake Air Temp': (35, 8, 5),
-        'Exhaust Temp': (450, 50, 80),
-        'Throttle Position': (30, 15, 10),
-        'Battery Voltage': (12.6, 0.3, -0.5),
-        'Transmission Temp': (80, 10, 15),
-        'Brake Pressure': (100, 20, 25),
-        'Wheel Speed': (45, 15, 10),
-    }
-    
-    for sensor, (mean, std, anomaly_factor) in sensor_configs.items():
-        data[sensor] = mean + base_scores * anomaly_factor + np.random.normal(0, std, n_points)
-    
-    df = pd.DataFrame(data)
-    
-    # Filter out idling state (RPM < 700) for cleaner trend analysis
-    df = df[df['RPM'] >= 700].reset_index(drop=True)
-    
-    # Determine maintenance type based on sensor patterns for anomalies
-    def get_maintenance_type(row):
-        if row['Anomaly Score'] < 0.5:
-            return 'Normal'
-        
-        # Calculate deviation scores for each category
-        vibration_score = (abs(row['Vibration X'] - 0.5) + abs(row['Vibration Y'] - 0.4) + abs(row['Vibration Z'] - 0.3)) / 3
-        electrical_score = abs(row['Board Voltage'] - 26) / 3 + abs(row['Battery Voltage'] - 12.6) / 1
-        engine_score = (abs(row['Engine Temperature'] - 75) / 20 + abs(row['Engine Load'] - 45) / 30 + 
-                       abs(row['Exhaust Temp'] - 450) / 100 + abs(row['Oil Pressure'] - 45) / 15) / 4
-        
-        scores = {
-            '🔧 Mechanical': vibration_score,
-            '⚡ Electrical': electrical_score,
-            '🔥 Engine Performance': engine_score
-        }
-        return max(scores, key=scores.get)
-    
-    df['Maintenance Type'] = df.apply(get_maintenance_type, axis=1)
-    
-    # Calculate 95th percentile threshold on filtered data
-    threshold_95 = np.percentile(df['Anomaly Score'], 95)
-    df['Is Anomaly'] = df['Anomaly Score'] > threshold_95
-    df['Threshold_95'] = threshold_95
-    
-    return df
+    periods = DEMO_CONFIG['anomaly_detection']['anomaly_periods']
+    if bus_id is None:
+        return apply_autoencoder_scores(generate_bus_history(seed, periods, freq=freq))
+    return apply_autoencoder_scores(generate_bus_history(
+        stable_seed(seed, bus_id), periods, freq=freq,
+        period_jitter=DEMO_CONFIG['anomaly_detection']['period_jitter']
+    ))
 
-def generate_sod_data():
-    """Generate sample SoD violation data with random user IDs"""
-    # Generate truly random user IDs
-    first_initials = ["J", "M", "A", "K", "R", "T", "D", "P", "N", "S", "L", "C", "B", "E", "W"]
-    last_names = ["SMITH", "JONES", "BROWN", "WILSON", "GARCIA", "LEE", "CHEN", "KIM", "WANG", "ZHOU", 
-                  "DAVIS", "MILLER", "TAYLOR", "ANDERSON", "THOMAS"]
-    
-    users = []
-    for _ in range(50):
-        user_id = f"{random.choice(first_initials)}{random.choice(last_names)}{random.randint(10, 99)}"
-        users.append(user_id)
-    
-    violations = []
-    
-    sod_rules = [
-        ("AP01", "Create Vendor vs Pay Vendor", "Critical"),
-        ("GL01", "Create GL Account vs Post to GL", "High"),
-        ("MM01", "Create PO vs Goods Receipt", "Medium"),
-        ("SD01", "Create Customer vs Process Sales", "High"),
-        ("HR01", "Maintain Employee vs Payroll Processing", "Critical"),
-    ]
-    
-    for _ in range(100):
-        user = random.choice(users)
-        rule = random.choice(sod_rules)
-        violations.append({
-            'User ID': user,
-            'Rule ID': rule[0],
-            'Description': rule[1],
-            'Risk Level': rule[2],
-            'Function 1': rule[1].split(' vs ')[0],
-            'Function 2': rule[1].split(' vs ')[1],
-            'Detection Date': datetime.now() - timedelta(days=random.randint(0, 90))
-        })
-    
-    return pd.DataFrame(violations)
+def generate_sod_data(n_users=50, roles_per_user=3, seed=None):
+    """Synthetic SAP user → role assignments for the SoD demo"""
+    user_roles, _ = generate_access_assignments(DEMO_CONFIG['sod']['rules'], n_users, roles_per_user, seed=seed)
+    return user_roles
 
-def generate_ridership_data():
+def generate_access_log_data(n_users=50, seed=None):
+    """Synthetic SAP audit log (logons and transaction starts) for the access anomaly demo"""
+    events, _ = generate_access_log(n_users, days=DEMO_CONFIG['sod']['window_days'], seed=seed)
+    return events
+
+def generate_ridership_data(n_routes=10, seed=None):
     """Generate sample ridership prediction data"""
+    rnd = random.Random(seed)
     hours = list(range(24))
-    routes = [mask_route(f"ROUTE{i}") for i in range(10)]
+    routes = [mask_route(f"ROUTE{i}") for i in range(n_routes)]
     
     data = []
     for route in routes:
         for hour in hours:
             # Simulate realistic ridership patterns
-            base = random.randint(50, 200)
+            base = rnd.randint(50, 200)
             if 7 <= hour <= 9 or 17 <= hour <= 19:  # Peak hours
-                actual = base * random.uniform(1.5, 2.5)
+                actual = base * rnd.uniform(1.5, 2.5)
             else:
-                actual = base * random.uniform(0.5, 1.0)
+                actual = base * rnd.uniform(0.5, 1.0)
             
-            predicted = actual * random.uniform(0.9, 1.1)
+            predicted = actual * rnd.uniform(0.9, 1.1)
             
             data.append({
                 'Route': route,
@@ -622,24 +544,518 @@ def generate_ridership_data():
     
     return pd.DataFrame(data)
 
-def generate_bus_speed_data():
+def generate_bus_speed_data(n_segments=20, seed=None):
     """Generate sample bus speed prediction data"""
-    segments = [f"Segment {i+1}" for i in range(20)]
+    rnd = random.Random(seed)
+    segments = [f"Segment {i+1}" for i in range(n_segments)]
     
     data = []
     for seg in segments:
-        actual_speed = random.uniform(15, 45)
-        predicted_speed = actual_speed * random.uniform(0.92, 1.08)
+        actual_speed = rnd.uniform(15, 45)
+        predicted_speed = actual_speed * rnd.uniform(0.92, 1.08)
         data.append({
             'Segment': seg,
             'Actual Speed (km/h)': round(actual_speed, 1),
             'Predicted Speed (km/h)': round(predicted_speed, 1),
-            'Traffic Level': random.choice(['Light', 'Moderate', 'Heavy']),
-            'Weather': random.choice(['Clear', 'Rainy', 'Cloudy']),
+            'Traffic Level': rnd.choice(['Light', 'Moderate', 'Heavy']),
+            'Weather': rnd.choice(['Clear', 'Rainy', 'Cloudy']),
         })
     
     return pd.DataFrame(data)
 
+# ============================================================================
+# DATASET CACHE
+# ============================================================================
+
+class DatasetCache:
+    """
+    Process-wide LRU cache for the demo datasets.
+    
+    Entries are keyed by generator name, seed and scale parameters, so a rerun
+    triggered by a control (selectbox, slider, ...) never regenerates data.
+    The least recently used entry is evicted once `max_entries` is exceeded.
+    
+    A key can also have a registered loader (e.g. reopening a bus from the
+    sensor store); a miss on it reloads through the loader and only falls
+    back to the generator if the loader can no longer find the data.
+    """
+    
+    def __init__(self, generators, max_entries=16):
+        self.generators = generators
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._loaders = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(name, seed, params):
+        return (name, seed, tuple(sorted(params.items())))
+    
+    def get(self, name, seed=None, **params):
+        """Return the dataset for (name, seed, params), generating it on a miss"""
+        key = self.make_key(name, seed, params)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                # Shallow copy: callers may add columns without touching the cached frame
+                return self._entries[key].copy(deep=False)
+            self.misses += 1
+            loader = self._loaders.get(key)
+        
+        df = None
+        if loader is not None:
+            try:
+                df = loader()
+            except (KeyError, OSError):
+                df = None  # Backing data is gone: regenerate
+        if df is None:
+            df = self.generators[name](seed=seed, **params)
+        self.put(name, df, seed=seed, **params)
+        return df.copy(deep=False)
+    
+    def register_loader(self, name, loader, seed=None, **params):
+        """Reload (name, seed, params) with `loader()` instead of its generator after eviction"""
+        with self._lock:
+            self._loaders[self.make_key(name, seed, params)] = loader
+    
+    def put(self, name, df, seed=None, **params):
+        """Store a dataset produced outside `get` (e.g. by a parallel batch)"""
+        key = self.make_key(name, seed, params)
+        with self._lock:
+            self._entries[key] = df
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self):
+        """Hit/miss counters for the performance panel"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+    
+    def clear(self):
+        """Drop cached entries and counters (registered loaders are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+DATASET_GENERATORS = {
+    'anomaly_detection': generate_anomaly_detection_data,
+    'sod': generate_sod_data,
+    'access_log': generate_access_log_data,
+    'ridership': generate_ridership_data,
+    'speed': generate_bus_speed_data,
+}
+
+@st.cache_resource
+def get_dataset_cache():
+    """Single DatasetCache shared by every session of this server process"""
+    return DatasetCache(DATASET_GENERATORS, max_entries=DEMO_CONFIG['cache']['max_entries'])
+
+def load_dataset(name, **params):
+    """Fetch a demo dataset through the cache, using the seed from DEMO_CONFIG"""
+    if 'seed' not in params:
+        params['seed'] = DEMO_CONFIG[name]['seed']
+    return get_dataset_cache().get(name, **params)
+
+@st.cache_resource
+def get_sensor_store():
+    """On-disk columnar store holding the fleet's sensor histories"""
+    path = DEMO_CONFIG['anomaly_detection']['store_path']
+    return SensorStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), path))
+
+def fleet_store_attrs(seed, freq):
+    """Generator settings a stored bus history must match to be reused"""
+    cfg = DEMO_CONFIG['anomaly_detection']
+    return {
+        'generator_version': GENERATOR_VERSION,
+        'seed': seed,
+        'freq': freq,
+        'period_jitter': cfg['period_jitter'],
+        'anomaly_periods': [list(p) for p in cfg['anomaly_periods']],
+        'model': get_pdm_model()[1],
+    }
+
+@st.cache_resource
+def warm_fleet_cache(n_buses, seed, freq):
+    """
+    Make every bus of the fleet available to the dataset cache once per server.
+    
+    Buses missing from the sensor store (or written with other generator
+    settings or autoencoder weights) are generated in parallel, scored with the
+    autoencoder and written to it; every bus is then
+    opened from the store as a memory-mapped frame, so cold-start heap usage
+    stays flat as the fleet grows. If the store is not writable the generated
+    frames are cached in memory instead.
+    
+    Each stored bus keeps its score t-digest in its attrs, so the fleet-wide
+    sketch merges every bus whether it was generated now or on an earlier start.
+    
+    Returns the generation stats (bus-months/sec etc.), with score_digest
+    covering the whole fleet.
+    """
+    cfg = DEMO_CONFIG['anomaly_detection']
+    bus_ids = fleet_bus_ids(n_buses)
+    attrs = fleet_store_attrs(seed, freq)
+    store = get_sensor_store()
+    missing = [bus_id for bus_id in bus_ids if not store.has_bus(bus_id, attrs)]
+    
+    histories = {}
+    stats = {'n_buses': 0, 'workers': 0, 'seconds': 0.0, 'bus_months': 0.0, 'bus_months_per_sec': 0.0}
+    store_ok = True
+    if missing:
+        histories, stats = generate_fleet(
+            missing, seed, cfg['anomaly_periods'], freq=freq,
+            period_jitter=cfg['period_jitter'], max_workers=cfg['fleet_workers']
+        )
+        histories = {bus_id: apply_autoencoder_scores(df) for bus_id, df in histories.items()}
+        stats['bus_digests'] = {bus_id: score_digest(df) for bus_id, df in histories.items()}
+        try:
+            for bus_id, df in histories.items():
+                digest = stats['bus_digests'][bus_id].to_dict()
+                store.write_bus(bus_id, df, attrs={**attrs, 'score_digest': digest})
+        except OSError:
+            store_ok = False
+    
+    cache = get_dataset_cache()
+    digests = []
+    for bus_id in bus_ids:
+        if bus_id in histories and not store_ok:
+            df = histories[bus_id]
+            digests.append(stats['bus_digests'][bus_id])
+        else:
+            df = store.open_bus(bus_id)
+            stored = store.meta(bus_id)['attrs'].get('score_digest')
+            digests.append(TDigest.from_dict(stored) if stored else score_digest(df))
+            # Evicted buses are reopened from the store, not regenerated
+            cache.register_loader('anomaly_detection', functools.partial(store.open_bus, bus_id),
+                                  seed=seed, bus_id=bus_id, freq=freq)
+        cache.put('anomaly_detection', df, seed=seed, bus_id=bus_id, freq=freq)
+    stats['memory_mapped'] = store_ok
+    stats['score_digest'] = TDigest.merge_all(digests)
+    return stats
+
+# ============================================================================
+# STREAMING THRESHOLDS
+# ============================================================================
+
+def get_streaming_tracker():
+    """Per-session P² threshold tracker shared by all buses"""
+    if 'streaming_thresholds' not in st.session_state:
+        st.session_state['streaming_thresholds'] = StreamingThresholds(DEFAULT_PERCENTILES)
+        st.session_state['streaming_threshold_traces'] = {}
+    return st.session_state['streaming_thresholds']
+
+def get_streaming_thresholds(history_key, scores):
+    """
+    Running thresholds and alert flags for every reading of a bus.
+    
+    `history_key` identifies the history (bus, seed, freq) and also keys the
+    tracker's estimators. Only readings not yet seen by them are streamed
+    through, so each new reading costs O(1) and reruns cost nothing. If the
+    already-streamed prefix no longer matches (e.g. a regenerated store), the
+    history starts over.
+    """
+    tracker = get_streaming_tracker()
+    traces = st.session_state['streaming_threshold_traces']
+    empty = (np.empty(0), np.empty((0, len(DEFAULT_PERCENTILES))), np.empty((0, len(DEFAULT_PERCENTILES)), dtype=bool))
+    streamed, thresholds, alerts = traces.get(history_key, empty)
+    overlap = min(len(streamed), len(scores))
+    if overlap and (streamed[[0, overlap - 1]] != scores[[0, overlap - 1]]).any():
+        tracker.reset(history_key)
+        streamed, thresholds, alerts = empty
+    seen = len(thresholds)
+    if seen < len(scores):
+        new_thresholds, new_alerts = tracker.feed(history_key, scores[seen:])
+        streamed = np.concatenate([streamed, scores[seen:]])
+        thresholds = np.concatenate([thresholds, new_thresholds])
+        alerts = np.concatenate([alerts, new_alerts])
+        traces[history_key] = (streamed, thresholds, alerts)
+    return thresholds[:len(scores)], alerts[:len(scores)]
+
+@st.cache_resource
+def get_seasonal_thresholds(n_buses, seed, freq):
+    """
+    Per-bus, per-hour-of-week thresholds for the whole fleet (one grouped pass).
+    
+    Call after warm_fleet_cache so every bus is served from the dataset cache.
+    """
+    histories = {}
+    for bus_id in fleet_bus_ids(n_buses):
+        df = load_dataset('anomaly_detection', seed=seed, bus_id=bus_id, freq=freq)
+        histories[bus_id] = (df['timestamp'].to_numpy(), df['Anomaly Score'].to_numpy())
+    return SeasonalThresholds.fit(
+        histories, DEFAULT_PERCENTILES, DEMO_CONFIG['anomaly_detection']['seasonal_min_readings']
+    )
+
+# ============================================================================
+# SCORE AGGREGATES
+# ============================================================================
+
+# Timeline windows (months back from the latest reading; None = full history)
+TIME_WINDOWS = {'1M': 1, '3M': 3, '6M': 6, 'All': None}
+
+def get_score_index(bus_id, df):
+    """
+    Sorted scores of a bus's history; any percentile then resolves by binary search.
+    
+    One index per bus is kept, rebuilt when the history length changes.
+    """
+    indexes = st.session_state.setdefault('score_indexes', {})
+    if bus_id not in indexes or indexes[bus_id][0] != len(df):
+        indexes[bus_id] = (len(df), SortedScores(df['Anomaly Score'].to_numpy()))
+    return indexes[bus_id][1]
+
+def get_score_pyramid(bus_id, mode, percentile, df, alert_rows):
+    """
+    Hourly/daily/weekly aggregates of a bus's scores and alerts.
+    
+    Built once per (threshold mode, percentile, history length) and kept for
+    the session until those change; window changes only slice the pyramid.
+    Only each bus's latest pyramid is kept, so slider moves do not pile up.
+    """
+    pyramids = st.session_state.setdefault('score_pyramids', {})
+    key = (mode, percentile, len(df))
+    if bus_id not in pyramids or pyramids[bus_id][0] != key:
+        alerts = np.zeros(len(df), dtype=bool)
+        alerts[alert_rows] = True
+        pyramid = AggregatePyramid(df['timestamp'].to_numpy(), df['Anomaly Score'].to_numpy(), alerts)
+        pyramids[bus_id] = (key, pyramid)
+    return pyramids[bus_id][1]
+
+@st.cache_resource
+def get_fleet_rollup():
+    """Daily per-bus rollups shared by all sessions, and the history length folded per bus"""
+    return DailyRollup(), {}
+
+def update_fleet_rollup(bus_ids, seed, freq):
+    """
+    Fold any readings not yet rolled up into the fleet's daily rollups.
+    
+    Stored buses are read as memmapped columns, and skipped without reading
+    when their length has not changed since the last fold; the dataset cache
+    is only used for buses the store does not hold.
+    """
+    rollup, folded = get_fleet_rollup()
+    store = get_sensor_store()
+    attrs = fleet_store_attrs(seed, freq)
+    columns = ['timestamp', 'Anomaly Score', 'Is Anomaly']
+    new_readings = 0
+    for bus_id in bus_ids:
+        meta = store.meta(bus_id)
+        if meta is not None and store.has_bus(bus_id, attrs):
+            key = (bus_id, seed, freq)
+            if folded.get(key) == meta['n_rows']:
+                continue
+            data = store.open_columns(bus_id, columns)
+            folded[key] = meta['n_rows']
+        else:
+            data = load_dataset('anomaly_detection', seed=seed, bus_id=bus_id, freq=freq)
+        new_readings += rollup.update(
+            bus_id, np.asarray(data['timestamp']), np.asarray(data['Anomaly Score']), np.asarray(data['Is Anomaly'])
+        )
+    return rollup, new_readings
+
+def render_fleet_heatmap(bus_ids, seed, freq):
+    """Buses × days heatmap of daily max score or alert count"""
+    rollup, new_readings = update_fleet_rollup(bus_ids, seed, freq)
+    metric = st.radio("Fleet Metric", ["Max Score", "Alert Count"], horizontal=True, key='fleet_heatmap_metric')
+    field = 'max' if metric == "Max Score" else 'alerts'
+    z, days = rollup.matrix(bus_ids, field)
+    
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=days,
+        y=bus_ids,
+        colorscale='YlOrRd',
+        colorbar=dict(title=metric),
+        hovertemplate='<b>%{y}</b><br>%{x}<br>' + metric + ': %{z:.3f}<extra></extra>',
+        hoverongaps=False
+    ))
+    fig.update_layout(
+        template='plotly_white',
+        height=min(800, 120 + 24 * len(bus_ids)),
+        margin=dict(t=20, b=40, l=80, r=20),
+        yaxis=dict(autorange='reversed', showticklabels=len(bus_ids) <= 60)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{len(bus_ids):,} buses × {len(days):,} days from incremental daily rollups "
+        f"({new_readings:,} new readings folded in this run; alerts use each bus's 95th percentile)"
+    )
+
+# ============================================================================
+# ERROR ATTRIBUTION
+# ============================================================================
+
+@st.cache_resource(max_entries=DEMO_CONFIG['cache']['max_entries'])
+def get_bus_autoencoder(history_key, n_rows, _df):
+    """
+    Feature matrix of a bus's history and the autoencoder that scored it.
+    
+    Keyed by the history (bus, seed, freq) and its length, like the other
+    per-history caches.
+    
+    Without configured weights the model is fitted (PCA-equivalent weights) on
+    the bus's normal readings, so reconstruction error isolates what deviates
+    from its usual behaviour.
+    """
+    features = extract_features(_df)
+    return features, bus_scorer(features, _df)
+
+def get_sensor_attribution(history_key, df, rows):
+    """
+    Per-sensor squared reconstruction error (len(rows) × 17) for ascending `rows`.
+    
+    Rows already attributed in this session are looked up; only new ones go
+    through the autoencoder, as one batch.
+    """
+    cache = st.session_state.setdefault('sensor_attributions', {})
+    key = (history_key, len(df))
+    known_rows, known_errors = cache.get(key, (np.empty(0, dtype=np.int64), np.empty((0, len(SENSOR_NAMES)))))
+    missing = np.setdiff1d(rows, known_rows, assume_unique=True)
+    if len(missing):
+        features, scorer = get_bus_autoencoder(history_key, len(df), df)
+        new_errors = sensor_errors(scorer.squared_errors(features[missing]))
+        merged_rows = np.concatenate([known_rows, missing])
+        order = np.argsort(merged_rows, kind='stable')
+        known_rows = merged_rows[order]
+        known_errors = np.concatenate([known_errors, new_errors])[order]
+        cache[key] = (known_rows, known_errors)
+    return known_errors[np.searchsorted(known_rows, rows)]
+
+# ============================================================================
+# LIVE REPLAY
+# ============================================================================
+
+def start_live_replay(history_key, df, rate, percentile):
+    """Replay a bus's stored history through the online pipeline from the first reading"""
+    _, scorer = get_bus_autoencoder(history_key, len(df), df)
+    replay = TelemetryReplay(history_key[0], df, OnlinePipeline(scorer), rate, percentile=percentile)
+    replay.start()
+    st.session_state['live_replay'] = replay
+
+def render_live_replay():
+    """
+    Live replay view. While a replay runs, only this fragment reruns on a timer:
+    it scores the readings that came due and redraws a bounded window of points.
+    """
+    replay = st.session_state.get('live_replay')
+    tick = DEMO_CONFIG['anomaly_detection']['replay_tick_seconds']
+    running = replay is not None and replay.running
+    
+    @st.fragment(run_every=tick if running else None)
+    def replay_fragment():
+        if replay is None:
+            st.caption("Press ▶️ Start to replay the selected bus's history reading by reading.")
+            return
+        was_running = replay.running
+        replay.step(max_batch=int(replay.rate * tick * 2) + 1)
+        stats = replay.stats()
+        
+        st.line_chart(replay.chart_frame()[['Score', 'Threshold']], height=260, color=['#38BDF8', '#EF4444'])
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Readings", f"{stats['events']:,} / {len(replay):,}")
+        r2.metric("Events/sec", f"{stats['events_per_sec']:,.0f}",
+                  help=f"Pipeline capacity: {stats['capacity_per_sec']:,.0f} readings/s")
+        r3.metric("Latency (mean / p99)", f"{stats['latency_mean_ms']:.2f} / {stats['latency_p99_ms']:.2f} ms",
+                  help="Features → autoencoder → threshold, per reading")
+        r4.metric("Alerts", f"{stats['alerts']:,}")
+        st.progress(stats['progress'])
+        
+        if was_running and not replay.running:
+            st.rerun()  # Finished: full rerun so the fragment stops polling
+    
+    replay_fragment()
+
+# ============================================================================
+# SOD MONITORING
+# ============================================================================
+
+def get_sod_monitor():
+    """Per-session incremental SoD engine; access changes stay in this session"""
+    if 'sod_monitor' not in st.session_state:
+        cfg = DEMO_CONFIG['sod']
+        user_roles = load_dataset('sod', n_users=cfg['n_users'], roles_per_user=cfg['roles_per_user'])
+        st.session_state['sod_monitor'] = IncrementalSodEngine(SodEngine(cfg['rules']), user_roles,
+                                                               role_catalog(cfg['rules']))
+        st.session_state['sod_changes'] = 0
+    return st.session_state['sod_monitor']
+
+def record_sod_delta(label, added, resolved):
+    st.session_state['sod_last_change'] = (label, added, resolved)
+    st.session_state['sod_changes'] += 1
+
+def apply_access_change(action):
+    """Grant / Revoke button callback (runs before the rerun renders the counters)"""
+    monitor = get_sod_monitor()
+    user, role = st.session_state['sod_change_user'], st.session_state['sod_change_role']
+    added, resolved = getattr(monitor, action)(user, role)
+    record_sod_delta(f"{action.title()} {role} → {user}", added, resolved)
+
+def simulate_access_review(n_changes):
+    """Apply a batch of random grants and revocations, keeping the net delta"""
+    monitor = get_sod_monitor()
+    rnd = random.Random(st.session_state['sod_changes'])
+    net = {}
+    for _ in range(n_changes):
+        user = rnd.choice(monitor.users)
+        held = monitor.roles_of(user)
+        if held and rnd.random() < 0.4:
+            added, resolved = monitor.revoke(user, rnd.choice(held))
+        else:
+            added, resolved = monitor.grant(user, rnd.choice(monitor.roles))
+        for violation in added:
+            net[violation] = net.get(violation, 0) + 1
+        for violation in resolved:
+            net[violation] = net.get(violation, 0) - 1
+    record_sod_delta(f"Access review batch of {n_changes} changes",
+                     [v for v, n in net.items() if n > 0], [v for v, n in net.items() if n < 0])
+
+def get_role_recommender():
+    """Role recommender over the session's current assignments, refitted after each access change"""
+    monitor = get_sod_monitor()
+    fitted = st.session_state.get('role_recommender')
+    if fitted is None or fitted[0] != st.session_state['sod_changes']:
+        user_roles, role_tcodes = monitor.assignments()
+        recommender = RoleRecommender(DEMO_CONFIG['sod']['recommend_neighbors']).fit(
+            user_roles, monitor.engine, role_tcodes)
+        fitted = (st.session_state['sod_changes'], recommender)
+        st.session_state['role_recommender'] = fitted
+    return fitted[1]
+
+def grant_recommendation(user, role):
+    """'Grant' callback for a recommended role"""
+    added, resolved = get_sod_monitor().grant(user, role)
+    record_sod_delta(f"Grant recommended {role} → {user}", added, resolved)
+
+@st.cache_resource
+def get_access_features(n_users, seed):
+    """Window features of every user, aggregated from the cached audit log in chunks"""
+    cfg = DEMO_CONFIG['sod']
+    events = load_dataset('access_log', n_users=n_users, seed=seed)
+    aggregator = AccessAggregator(cfg['window_days'])
+    for start in range(0, len(events), cfg['log_chunk_rows']):
+        aggregator.update(events.iloc[start:start + cfg['log_chunk_rows']])
+    return aggregator.features()
+
+@st.cache_resource(max_entries=8)
+def get_access_forest(features):
+    """Isolation Forest fitted on a (users × features) access matrix"""
+    cfg = DEMO_CONFIG['sod']
+    return IsolationForest(cfg['iforest_trees'], cfg['iforest_sample_size'], seed=cfg['seed']).fit(features)
+
 # ============================================================================
 # PORTFOLIO SECTIONS
 # ============================================================================
@@ -910,11 +1326,13 @@ def demo_anomaly_detection():
         - Sensitive to subtle deviations from normal behavior
         """)
     
-    # Interactive Demo
-    st.markdown("### 📊 Anomaly Score Timeline")
+    # Interactive Demo: generate the fleet once (in parallel), then serve each bus from the cache
+    pdm_cfg = DEMO_CONFIG['anomaly_detection']
+    fleet_stats = warm_fleet_cache(pdm_cfg['n_buses'], pdm_cfg['seed'], pdm_cfg['freq'])
     
-    # Generate data
-    df = generate_anomaly_detection_data()
+    # Fleet triage first: which buses need a closer look
+    st.markdown("### 🗺️ Fleet Health Overview")
+    render_fleet_heatmap(fleet_bus_ids(pdm_cfg['n_buses']), pdm_cfg['seed'], pdm_cfg['freq'])
     
     col1, col2 = st.columns([1, 3])
     
@@ -922,35 +1340,78 @@ def demo_anomaly_detection():
         st.markdown("### 🎛️ Controls")
         
         # Bus selector with masked IDs like screenshot
-        bus_options = ['WA7230M', 'WA9479M', 'WB8743F', 'WB915L', 'WB946L', 'WWB872U']
+        bus_options = fleet_bus_ids(pdm_cfg['n_buses'])
         selected_bus = st.selectbox("Select Vehicle", bus_options)
-        
-        # Reseed based on bus selection for variety
-        bus_seed = hash(selected_bus) % 100
-        np.random.seed(bus_seed)
-        
-        # Percentile threshold selector
-        percentile = st.selectbox(
-            "Threshold Percentile",
-            [90, 95, 99],
-            index=1,
-            help="Percentile for anomaly threshold"
+        if fleet_stats['n_buses']:
+            st.caption(
+                f"Generated {fleet_stats['n_buses']} buses in {fleet_stats['seconds']:.2f} s "
+                f"on {fleet_stats['workers']} worker(s) · {fleet_stats['bus_months_per_sec']:,.0f} bus-months/s"
+            )
+        st.caption(f"Fleet 95th percentile {fleet_stats['score_digest'].percentile(95):.3f} "
+                   f"(merged per-bus sketches, {len(bus_options)} buses)")
+        if fleet_stats['memory_mapped']:
+            st.caption(f"History memory-mapped from the sensor store ({len(bus_options)} buses)")
+        
+        # Each bus has its own deterministic history (cached across reruns)
+        df = load_dataset('anomaly_detection', bus_id=selected_bus, freq=pdm_cfg['freq'])
+        # Identifies this history in the per-session and per-server caches below
+        history_key = (selected_bus, pdm_cfg['seed'], pdm_cfg['freq'])
+        
+        threshold_mode = st.radio(
+            "Threshold Mode",
+            ["Batch", "Streaming (P²)", "Seasonal"],
+            horizontal=True,
+            help="Batch: percentile over the full history. "
+                 "Streaming: per-bus P² estimate updated in O(1) as each reading arrives. "
+                 "Seasonal: per-bus percentile for each hour of the week."
         )
+        streaming = threshold_mode == "Streaming (P²)"
+        seasonal = threshold_mode == "Seasonal"
+        
+        # Percentile threshold selector: P² and the seasonal table hold fixed percentiles, batch takes any
+        if streaming or seasonal:
+            percentile = st.selectbox(
+                "Threshold Percentile",
+                list(DEFAULT_PERCENTILES),
+                index=1,
+                help="Percentile for anomaly threshold"
+            )
+        else:
+            percentile = st.slider(
+                "Threshold Percentile",
+                80.0, 99.9, 95.0, 0.1,
+                help="Percentile for anomaly threshold"
+            )
         
-        # Calculate threshold based on percentile
-        threshold = np.percentile(df['Anomaly Score'], percentile)
-        df['Is Anomaly'] = df['Anomaly Score'] > threshold
+        # Calculate threshold and alerting rows (ascending row indices, no full-length mask in batch mode);
+        # streaming and seasonal modes also give every reading its own threshold
+        reading_thresholds = None
+        if streaming:
+            reading_thresholds, running_alerts = get_streaming_thresholds(history_key, df['Anomaly Score'].to_numpy())
+            p_idx = DEFAULT_PERCENTILES.index(percentile)
+            threshold = get_streaming_tracker().threshold(history_key, percentile)
+            alert_rows = np.flatnonzero(running_alerts[:, p_idx])
+        elif seasonal:
+            seasonal_thresholds = get_seasonal_thresholds(pdm_cfg['n_buses'], pdm_cfg['seed'], pdm_cfg['freq'])
+            reading_thresholds = seasonal_thresholds.lookup(selected_bus, df['timestamp'].to_numpy())
+            p_idx = DEFAULT_PERCENTILES.index(percentile)
+            threshold = float(reading_thresholds[-1, p_idx])
+            alert_rows = np.flatnonzero(df['Anomaly Score'].to_numpy() > reading_thresholds[:, p_idx])
+        else:
+            score_index = get_score_index(selected_bus, df)
+            threshold = score_index.threshold(percentile)
+            alert_rows = score_index.rows_above(threshold)
         
         st.markdown("---")
         st.markdown("### 📈 Statistics")
         
-        alert_count = df['Is Anomaly'].sum()
+        alert_count = len(alert_rows)
         current_value = df['Anomaly Score'].iloc[-1]
-        is_alert = current_value > threshold
+        is_alert = alert_count > 0 and alert_rows[-1] == len(df) - 1
         
         st.markdown(f"""
         <div style="background: #F0F7FF; padding: 12px; border-radius: 8px; margin-bottom: 8px;">
-            <div style="font-size: 0.85rem; color: #6B7280;">Threshold ({percentile}th %ile)</div>
+            <div style="font-size: 0.85rem; color: #6B7280;">Threshold ({percentile:g}th %ile)</div>
             <div style="font-size: 1.3rem; font-weight: 700; color: #1D1D1F;">{threshold:.3f}</div>
         </div>
         """, unsafe_allow_html=True)
@@ -978,6 +1439,10 @@ def demo_anomaly_detection():
             <strong>Batch Size:</strong> 32
         </div>
         """, unsafe_allow_html=True)
+        if get_pdm_model()[0] is not None:
+            st.caption(f"Scores from the trained weights in `{pdm_cfg['model_path']}`")
+        else:
+            st.caption(f"No `{pdm_cfg['model_path']}`: scores from a PCA reference model fitted per bus")
         
         st.markdown("---")
         st.markdown("### 🚫 Data Filtering")
@@ -990,40 +1455,117 @@ def demo_anomaly_detection():
         """, unsafe_allow_html=True)
     
     with col2:
+        st.markdown("### 📊 Anomaly Score Timeline")
+        
+        # Time window is applied server-side: only the visible slice is reduced and sent
+        window = st.radio("Time Window", list(TIME_WINDOWS), index=len(TIME_WINDOWS) - 1,
+                          horizontal=True, key='pdm_time_window')
+        timestamps = df['timestamp'].to_numpy()
+        window_start = None
+        if TIME_WINDOWS[window] is not None:
+            window_start = pd.Timestamp(timestamps[-1]) - pd.DateOffset(months=TIME_WINDOWS[window])
+        lo = 0 if window_start is None else int(np.searchsorted(timestamps, np.datetime64(window_start, 'ns')))
+        view_df = df.iloc[lo:]
+        window_first_alert = int(np.searchsorted(alert_rows, lo))
+        window_alerts = alert_count - window_first_alert
+        
         # Main Anomaly Score Timeline Chart (like the screenshot)
         fig = go.Figure()
-        
-        # Anomaly score line (light blue)
-        fig.add_trace(go.Scatter(
-            x=df['timestamp'],
-            y=df['Anomaly Score'],
-            mode='lines',
-            name='Anomaly Score',
-            line=dict(color='#38BDF8', width=1.5),
-            hovertemplate='<b>Date:</b> %{x}<br><b>Score:</b> %{y:.4f}<extra></extra>'
-        ))
-        
-        # Threshold line (red dashed)
+        webgl_threshold = DEMO_CONFIG['charts']['webgl_threshold']
+        use_pyramid = len(view_df) > pdm_cfg['pyramid_min_rows']
+        
+        if use_pyramid:
+            # Long windows: min/max/mean buckets from the aggregate pyramid (bounded payload)
+            pyramid = get_score_pyramid(selected_bus, threshold_mode, percentile, df, alert_rows)
+            buckets = pyramid.query(window_start, None, pdm_cfg['max_plot_points'])
+            line_x = buckets['timestamp']
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([line_x, line_x[::-1]]),
+                y=np.concatenate([buckets['max'], buckets['min'][::-1]]),
+                fill='toself',
+                fillcolor='rgba(56, 189, 248, 0.2)',
+                line=dict(width=0),
+                name=f'{buckets.attrs["level"].title()} min-max',
+                hoverinfo='skip'
+            ))
+            fig.add_trace(scatter_trace(
+                webgl_threshold=webgl_threshold,
+                x=line_x,
+                y=buckets['mean'],
+                mode='lines',
+                name=f'Anomaly Score ({buckets.attrs["level"]} mean)',
+                line=dict(color='#38BDF8', width=1.5),
+                customdata=buckets[['max', 'count']],
+                hovertemplate='<b>Date:</b> %{x}<br><b>Mean:</b> %{y:.4f}<br>'
+                              '<b>Max:</b> %{customdata[0]:.4f} (%{customdata[1]} readings)<extra></extra>'
+            ))
+            line_rows = np.minimum(np.searchsorted(timestamps, line_x.to_numpy()), len(df) - 1)
+        else:
+            # Downsample the line server-side (LTTB); alerts and the current value always stay
+            plot_idx = downsample_indices(
+                view_df['timestamp'].to_numpy(), view_df['Anomaly Score'].to_numpy(),
+                pdm_cfg['max_plot_points'], keep=alert_rows[window_first_alert:] - lo
+            )
+            plot_df = view_df.iloc[plot_idx]
+            line_x = plot_df['timestamp']
+            
+            # Anomaly score line (light blue)
+            fig.add_trace(scatter_trace(
+                webgl_threshold=webgl_threshold,
+                x=line_x,
+                y=plot_df['Anomaly Score'],
+                mode='lines',
+                name='Anomaly Score',
+                line=dict(color='#38BDF8', width=1.5),
+                hovertemplate='<b>Date:</b> %{x}<br><b>Score:</b> %{y:.4f}<extra></extra>'
+            ))
+            line_rows = lo + plot_idx
+        
+        # Threshold line (red dashed); streaming and seasonal lines follow each reading's threshold
+        if reading_thresholds is not None:
+            threshold_x = line_x
+            threshold_y = reading_thresholds[line_rows, p_idx]
+            threshold_name = f'{percentile:g}th Percentile ({"P²" if streaming else "hour-of-week"}): {threshold:.3f}'
+        else:
+            threshold_x = [view_df['timestamp'].iloc[0], view_df['timestamp'].iloc[-1]]
+            threshold_y = [threshold, threshold]
+            threshold_name = f'{percentile:g}th Percentile: {threshold:.3f}'
         fig.add_trace(go.Scatter(
-            x=[df['timestamp'].min(), df['timestamp'].max()],
-            y=[threshold, threshold],
+            x=threshold_x,
+            y=threshold_y,
             mode='lines',
-            name=f'{percentile}th Percentile: {threshold:.3f}',
-            line=dict(color='#EF4444', width=2, dash='dash'),
+            name=threshold_name,
+            line=dict(color='#EF4444', width=2, dash='dash', shape='hv'),
             hoverinfo='skip'
         ))
         
-        # Alert points (red dots for anomalies)
-        anomaly_df = df[df['Is Anomaly']]
-        fig.add_trace(go.Scatter(
-            x=anomaly_df['timestamp'],
-            y=anomaly_df['Anomaly Score'],
-            mode='markers',
-            name=f'Alerts: {len(anomaly_df)}',
-            marker=dict(color='#EF4444', size=8, symbol='circle',
-                       line=dict(color='#DC2626', width=1)),
-            hovertemplate='<b>🚨 ALERT</b><br>Date: %{x}<br>Score: %{y:.4f}<extra></extra>'
-        ))
+        # Alert points (red dots for anomalies; one per alerting bucket on long windows)
+        anomaly_df = df.iloc[alert_rows]
+        if use_pyramid:
+            alert_buckets = buckets[buckets['alerts'] > 0]
+            fig.add_trace(scatter_trace(
+                webgl_threshold=webgl_threshold,
+                x=alert_buckets['timestamp'],
+                y=alert_buckets['max'],
+                mode='markers',
+                name=f'Alerts: {window_alerts}',
+                marker=dict(color='#EF4444', size=8, symbol='circle',
+                           line=dict(color='#DC2626', width=1)),
+                customdata=alert_buckets['alerts'],
+                hovertemplate='<b>🚨 %{customdata} ALERT(S)</b><br>Date: %{x}<br>Max: %{y:.4f}<extra></extra>'
+            ))
+        else:
+            window_anomaly_df = df.iloc[alert_rows[window_first_alert:]]
+            fig.add_trace(scatter_trace(
+                webgl_threshold=webgl_threshold,
+                x=window_anomaly_df['timestamp'],
+                y=window_anomaly_df['Anomaly Score'],
+                mode='markers',
+                name=f'Alerts: {window_alerts}',
+                marker=dict(color='#EF4444', size=8, symbol='circle',
+                           line=dict(color='#DC2626', width=1)),
+                hovertemplate='<b>🚨 ALERT</b><br>Date: %{x}<br>Score: %{y:.4f}<extra></extra>'
+            ))
         
         # Add current status annotation (bottom right like screenshot)
         current_color = '#EF4444' if is_alert else '#10B981'
@@ -1047,7 +1589,7 @@ def demo_anomaly_detection():
         
         fig.update_layout(
             title=dict(
-                text=f'Bus {selected_bus} - Anomaly Score Timeline ({percentile}th Percentile)',
+                text=f'Bus {selected_bus} - Anomaly Score Timeline ({percentile:g}th Percentile)',
                 font=dict(size=18, color='#1D1D1F')
             ),
             xaxis_title='Date/Time',
@@ -1065,22 +1607,15 @@ def demo_anomaly_detection():
             hovermode='x unified'
         )
         
-        # Add range slider
-        fig.update_xaxes(
-            rangeslider_visible=False,
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=1, label="1M", step="month", stepmode="backward"),
-                    dict(count=3, label="3M", step="month", stepmode="backward"),
-                    dict(count=6, label="6M", step="month", stepmode="backward"),
-                    dict(step="all", label="All")
-                ]),
-                bgcolor='#F3F4F6',
-                activecolor='#007AFF'
-            )
-        )
+        fig.update_xaxes(rangeslider_visible=False)
         
         st.plotly_chart(fig, use_container_width=True)
+        if use_pyramid:
+            st.caption(f"Plotted {len(buckets):,} {buckets.attrs['level']} buckets covering {len(view_df):,} readings "
+                       f"(aggregate pyramid). Statistics below use every reading.")
+        elif len(plot_df) < len(view_df):
+            st.caption(f"Plotted {len(plot_df):,} of {len(view_df):,} points (LTTB downsampling; all alerts kept). "
+                       f"Statistics below use every reading.")
         
         # Summary metrics row
         m1, m2, m3, m4 = st.columns(4)
@@ -1094,7 +1629,7 @@ def demo_anomaly_detection():
             st.markdown("### 🔧 Recommended Maintenance Actions")
             
             # Get maintenance type distribution for anomalies
-            maint_df = anomaly_df.groupby('Maintenance Type').size().reset_index(name='Count')
+            maint_df = anomaly_df.groupby('Maintenance Type', observed=True).size().reset_index(name='Count')
             maint_df = maint_df[maint_df['Maintenance Type'] != 'Normal']
             
             if len(maint_df) > 0:
@@ -1136,18 +1671,58 @@ def demo_anomaly_detection():
             
             st.markdown("<br>", unsafe_allow_html=True)
             
-            # Anomaly details table with maintenance type
+            # Alert episodes: consecutive alerting readings collapsed into one incident each
             st.markdown("### 🚨 Recent High Reconstruction Error Events")
-            anomaly_details = anomaly_df[['timestamp', 'Anomaly Score', 'Maintenance Type', 'RPM']].copy()
-            anomaly_details['Severity'] = anomaly_details['Anomaly Score'].apply(
-                lambda x: '🔴 Critical' if x > 2 else ('🟠 High' if x > 1.5 else '🟡 Medium')
+            episodes = alert_episodes(
+                alert_rows, df['timestamp'].to_numpy(), df['Anomaly Score'].to_numpy(),
+                types=df['Maintenance Type'].array, max_gap=pdm_cfg['episode_max_gap']
             )
-            anomaly_details = anomaly_details.sort_values('timestamp', ascending=False).head(10)
-            anomaly_details.columns = ['Timestamp', 'Reconstruction Error', 'Maintenance Type', 'RPM', 'Severity']
-            st.dataframe(anomaly_details, use_container_width=True)
+            episode_order = st.radio("Order Events By", ["Most Recent", "Highest Peak"], horizontal=True)
+            shown = top_episodes(episodes, 10, by='recent' if episode_order == "Most Recent" else 'peak')
+            
+            # Sum the per-sensor error over each shown episode's alerting readings
+            bounds_lo = np.searchsorted(alert_rows, shown['start_row'].to_numpy())
+            bounds_hi = np.searchsorted(alert_rows, shown['end_row'].to_numpy(), side='right')
+            episode_rows = np.concatenate([alert_rows[a:b] for a, b in zip(bounds_lo, bounds_hi)])
+            offsets = np.r_[0, np.cumsum(bounds_hi - bounds_lo)[:-1]]
+            attributed_rows = np.unique(episode_rows)
+            row_errors = get_sensor_attribution(history_key, df, attributed_rows)
+            row_errors = row_errors[np.searchsorted(attributed_rows, episode_rows)]
+            episode_errors = np.add.reduceat(row_errors, offsets, axis=0)
+            top_idx, top_share = top_sensors(episode_errors, k=3)
+            top_labels = [', '.join(f"{SENSOR_NAMES[i]} {share:.0%}" for i, share in zip(idx, shares))
+                          for idx, shares in zip(top_idx, top_share)]
+            ae_category = np.asarray(ATTRIBUTION_CATEGORIES)[np.argmax(category_errors(episode_errors), axis=1)]
+            episode_details = pd.DataFrame({
+                'Start': shown['start'],
+                'End': shown['end'],
+                'Duration': shown['duration'],
+                'Readings': shown['readings'],
+                'Peak Error': shown['peak_score'],
+                'Maintenance Type': shown['type'],
+                'Top Sensors (AE error)': top_labels,
+                'AE Category': ae_category,
+                'Severity': np.select([shown['peak_score'] > 2, shown['peak_score'] > 1.5],
+                                      ['🔴 Critical', '🟠 High'], '🟡 Medium'),
+            })
+            st.dataframe(episode_details, use_container_width=True, hide_index=True)
+            st.caption(f"{alert_count:,} alerting readings grouped into {len(episodes):,} episodes")
             
             # Add note about filtering
             st.info("ℹ️ **Note:** Data filtered to exclude idling state (RPM < 700) for cleaner trend analysis. This removes noise from stationary periods and focuses on operational anomalies.")
+    
+    # Live replay: the same history, streamed through the online scoring pipeline
+    st.markdown("### 📡 Live Replay")
+    rc1, rc2, rc3 = st.columns([2, 1, 1])
+    with rc1:
+        replay_rate = st.slider("Replay Rate (readings/sec)", 10, pdm_cfg['replay_max_rate'],
+                                pdm_cfg['replay_rate'], 10)
+    replay_percentile = min(DEFAULT_PERCENTILES, key=lambda p: abs(p - percentile))
+    if rc2.button("▶️ Start", use_container_width=True):
+        start_live_replay(history_key, df, replay_rate, replay_percentile)
+    if rc3.button("⏹️ Stop", use_container_width=True) and 'live_replay' in st.session_state:
+        st.session_state['live_replay'].stop()
+    render_live_replay()
 
 def demo_sod_violations():
     """Interactive SoD Violations Demo"""
@@ -1205,7 +1780,10 @@ def demo_sod_violations():
     # Interactive Demo
     st.markdown("### 🎮 Interactive Demo: SoD Violation Analysis")
     
-    df = generate_sod_data()
+    monitor = get_sod_monitor()
+    df = monitor.violations()
+    rule_risk = dict(zip(monitor.engine.rule_ids, monitor.engine.rule_table['Risk Level']))
+    last_change = st.session_state.get('sod_last_change')
     
     col1, col2 = st.columns([1, 3])
     
@@ -1220,23 +1798,49 @@ def demo_sod_violations():
         
         rule_filter = st.multiselect(
             "Rule Category",
-            df['Rule ID'].unique().tolist(),
-            default=df['Rule ID'].unique().tolist()[:3]
+            monitor.engine.rule_ids,
+            default=monitor.engine.rule_ids[:3],
+            key='sod_rule_filter'
         )
         
         st.markdown("---")
         st.markdown("### 📊 Risk Summary")
         
+        # Counters are maintained from the engine's added/resolved deltas
         for risk in ['Critical', 'High', 'Medium']:
-            count = len(df[df['Risk Level'] == risk])
+            count = monitor.risk_counts.get(risk, 0)
+            change = ''
+            if last_change:
+                diff = (sum(rule_risk[r] == risk for _, r in last_change[1])
+                        - sum(rule_risk[r] == risk for _, r in last_change[2]))
+                change = f' <span style="font-weight: 400; color: #8E8E93;">({diff:+d})</span>' if diff else ''
             color = {'Critical': '#FF3B30', 'High': '#FF9500', 'Medium': '#FFCC00'}[risk]
             st.markdown(f"""
             <div style="display: flex; justify-content: space-between; padding: 8px 12px; 
                         background: {color}22; border-radius: 8px; margin-bottom: 8px;">
                 <span>{risk}</span>
-                <span style="font-weight: 700;">{count}</span>
+                <span style="font-weight: 700;">{count}{change}</span>
             </div>
             """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        st.markdown("### 🔁 Access Changes")
+        st.selectbox("User", sorted(monitor.users), key='sod_change_user')
+        st.selectbox("Role", sorted(monitor.roles), key='sod_change_role')
+        g1, g2 = st.columns(2)
+        g1.button("Grant", on_click=apply_access_change, args=('grant',), use_container_width=True)
+        g2.button("Revoke", on_click=apply_access_change, args=('revoke',), use_container_width=True)
+        st.button("🎲 Simulate Review Batch", on_click=simulate_access_review, args=(20,),
+                  use_container_width=True)
+        
+        if last_change:
+            label, added, resolved = last_change
+            st.caption(f"{label}: {len(added)} added, {len(resolved)} resolved "
+                       f"(only the affected users and rules were re-checked)")
+            for user, rule in added[:5]:
+                st.markdown(f"➕ `{user}` · {rule}")
+            for user, rule in resolved[:5]:
+                st.markdown(f"✅ `{user}` · {rule}")
     
     with col2:
         # Filter data
@@ -1260,6 +1864,24 @@ def demo_sod_violations():
         st.markdown("### 📋 Violation Details")
         display_df = df_filtered[['User ID', 'Rule ID', 'Description', 'Risk Level', 'Function 1', 'Function 2']].head(15)
         st.dataframe(display_df, use_container_width=True)
+        
+        # Item-item collaborative filtering, screened against the SoD rules
+        st.markdown("### 🤝 Role Recommendations")
+        recommender = get_role_recommender()
+        rec_user = st.selectbox("Recommend roles for", sorted(monitor.users), key='sod_recommend_user')
+        picks, withheld = recommender.recommend(rec_user, DEMO_CONFIG['sod']['recommend_top_k'])
+        st.caption(f"Holds: {', '.join(monitor.roles_of(rec_user)) or 'no roles'}. Scores sum the "
+                   f"cosine similarity of each candidate to the roles already held.")
+        r1, r2 = st.columns(2)
+        with r1:
+            st.markdown("**Recommended (SoD-safe)**")
+            st.dataframe(picks.round({'Score': 3}), use_container_width=True, hide_index=True)
+            if len(picks):
+                st.button(f"Grant {picks['Role'].iloc[0]}", on_click=grant_recommendation,
+                          args=(rec_user, picks['Role'].iloc[0]), use_container_width=True)
+        with r2:
+            st.markdown("**Withheld (would create a conflict)**")
+            st.dataframe(withheld.round({'Score': 3}), use_container_width=True, hide_index=True)
     
     # ML Anomaly Detection Section
     st.markdown("---")
@@ -1275,80 +1897,29 @@ def demo_sod_violations():
     </div>
     """, unsafe_allow_html=True)
     
-    # Generate anomaly data
-    np.random.seed(42)
-    n_users = 50
-    
-    first_names = ['JOHN', 'JANE', 'MIKE', 'SARAH', 'DAVID', 'EMMA', 'CHRIS', 'LISA', 'JAMES', 'ANNA',
-                   'ROBERT', 'MARIA', 'WILLIAM', 'JENNIFER', 'RICHARD', 'MICHELLE', 'JOSEPH', 'KAREN',
-                   'THOMAS', 'NANCY', 'DANIEL', 'BETTY', 'PAUL', 'HELEN', 'MARK']
-    last_names = ['SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS', 
-                  'MARTINEZ', 'ANDERSON', 'TAYLOR', 'THOMAS', 'MOORE', 'JACKSON', 'MARTIN']
-    
-    user_ids = []
-    for i in range(n_users):
-        first = random.choice(first_names)
-        last = random.choice(last_names)
-        num = random.randint(10, 99)
-        user_ids.append(f"{first[0]}{last[:5].upper()}{num}")
-    
-    # Normal users have consistent patterns
-    login_count = np.random.normal(25, 5, n_users).clip(10, 50)
-    transactions = np.random.normal(150, 30, n_users).clip(50, 300)
-    failed_logins = np.random.exponential(1, n_users).clip(0, 5)
-    access_hours = np.random.normal(8, 1, n_users).clip(6, 10)  # Normal business hours
-    unique_tcodes = np.random.normal(15, 3, n_users).clip(5, 30)
-    
-    # Inject anomalies (10% of users)
-    anomaly_indices = np.random.choice(n_users, size=5, replace=False)
-    for idx in anomaly_indices:
-        anomaly_type = random.choice(['high_activity', 'off_hours', 'suspicious'])
-        if anomaly_type == 'high_activity':
-            login_count[idx] = np.random.uniform(80, 150)
-            transactions[idx] = np.random.uniform(500, 1000)
-        elif anomaly_type == 'off_hours':
-            access_hours[idx] = np.random.uniform(0, 4)  # Late night access
-            failed_logins[idx] = np.random.uniform(5, 15)
-        else:
-            unique_tcodes[idx] = np.random.uniform(50, 80)  # Accessing too many tcodes
-            failed_logins[idx] = np.random.uniform(8, 20)
-    
-    # Calculate anomaly scores (simulating Isolation Forest output)
-    anomaly_scores = (
-        (login_count - login_count.mean()) / login_count.std() * 0.3 +
-        (transactions - transactions.mean()) / transactions.std() * 0.2 +
-        (failed_logins - failed_logins.mean()) / failed_logins.std() * 0.25 +
-        np.abs(access_hours - 8) / 2 * 0.15 +
-        (unique_tcodes - unique_tcodes.mean()) / unique_tcodes.std() * 0.1
-    )
-    anomaly_scores = (anomaly_scores - anomaly_scores.min()) / (anomaly_scores.max() - anomaly_scores.min())
-    
-    is_anomaly = anomaly_scores > 0.7
-    
-    access_df = pd.DataFrame({
-        'User ID': user_ids,
-        'Login Count': login_count.astype(int),
-        'Transactions': transactions.astype(int),
-        'Failed Logins': failed_logins.astype(int),
-        'Avg Access Hour': access_hours.round(1),
-        'Unique T-Codes': unique_tcodes.astype(int),
-        'Anomaly Score': anomaly_scores.round(3),
-        'Status': ['🚨 Anomaly' if a else '✅ Normal' for a in is_anomaly]
+    # Per-user 30-day features, folded chunk by chunk from the SAP audit log
+    access_df = get_access_features(DEMO_CONFIG['sod']['n_users'], DEMO_CONFIG['sod']['seed'])
+    features = access_df[FEATURE_COLUMNS].to_numpy(np.float64)
+    forest = get_access_forest(features)
+    access_df = access_df.assign(**{
+        'Avg Access Hour': access_df['Avg Access Hour'].round(1),
+        'Anomaly Score': forest.score(features).round(3),
     })
+    # Sorted once; every sensitivity value is then a binary search
+    score_index = SortedScores(access_df['Anomaly Score'].to_numpy())
     
     col_ml1, col_ml2 = st.columns([1, 2])
     
     with col_ml1:
         st.markdown("### 🎛️ Detection Settings")
         
-        sensitivity = st.slider("Anomaly Sensitivity", 0.5, 0.9, 0.7, 0.05,
-                               help="Lower = more strict, flags more users")
+        sensitivity = st.slider("Anomaly Sensitivity", 0.4, 0.8, 0.55, 0.05,
+                               help="Isolation Forest score cut-off (scores above 0.5 are easier than "
+                                    "average to isolate). Lower = more strict, flags more users")
         
         # Recalculate based on sensitivity
-        access_df['Status'] = ['🚨 Anomaly' if s > sensitivity else '✅ Normal' for s in access_df['Anomaly Score']]
-        
-        anomaly_count = (access_df['Status'] == '🚨 Anomaly').sum()
-        normal_count = (access_df['Status'] == '✅ Normal').sum()
+        anomaly_count = score_index.count_above(sensitivity)
+        normal_count = len(score_index) - anomaly_count
         
         st.markdown(f"""
         <div style="background: linear-gradient(135deg, #FEE2E2, #FECACA); padding: 1rem; border-radius: 12px; margin-bottom: 1rem;">
@@ -1366,12 +1937,12 @@ def demo_sod_violations():
         
         st.markdown("---")
         st.markdown("### 🧠 Model Info")
-        st.markdown("""
+        st.markdown(f"""
         <div style="background: #F5F3FF; padding: 12px; border-radius: 8px; font-size: 0.85rem;">
             <strong>Algorithm:</strong> Isolation Forest<br>
             <strong>Features:</strong> 5 behavioral<br>
             <strong>Training:</strong> 30-day history<br>
-            <strong>Contamination:</strong> 10%
+            <strong>Trees:</strong> {forest.n_trees} × ψ = {forest.psi_} ({forest.n_nodes:,} nodes)
         </div>
         """, unsafe_allow_html=True)
     
@@ -1379,10 +1950,11 @@ def demo_sod_violations():
         # Scatter plot showing anomalies
         fig = go.Figure()
         
-        normal_df = access_df[access_df['Status'] == '✅ Normal']
-        anomaly_df = access_df[access_df['Status'] == '🚨 Anomaly']
+        normal_df = access_df.iloc[score_index.rows_at_or_below(sensitivity)]
+        anomaly_df = access_df.iloc[score_index.rows_above(sensitivity, by='score')]
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_trace(
+            webgl_threshold=DEMO_CONFIG['charts']['webgl_threshold'],
             x=normal_df['Login Count'],
             y=normal_df['Transactions'],
             mode='markers',
@@ -1392,7 +1964,8 @@ def demo_sod_violations():
             hovertemplate='<b>%{text}</b><br>Logins: %{x}<br>Transactions: %{y}<extra></extra>'
         ))
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_trace(
+            webgl_threshold=DEMO_CONFIG['charts']['webgl_threshold'],
             x=anomaly_df['Login Count'],
             y=anomaly_df['Transactions'],
             mode='markers',
@@ -1415,9 +1988,9 @@ def demo_sod_violations():
         # Anomaly details table
         st.markdown("### 🚨 Flagged Users for Review")
         if anomaly_count > 0:
-            flagged_df = access_df[access_df['Status'] == '🚨 Anomaly'][
+            flagged_df = anomaly_df[
                 ['User ID', 'Login Count', 'Transactions', 'Failed Logins', 'Avg Access Hour', 'Anomaly Score']
-            ].sort_values('Anomaly Score', ascending=False)
+            ].copy()
             flagged_df['Risk Reason'] = flagged_df.apply(
                 lambda x: 'High Activity' if x['Transactions'] > 400 else (
                     'Off-Hours Access' if x['Avg Access Hour'] < 6 else (
@@ -1485,7 +2058,7 @@ def demo_ridership():
     # Interactive Demo
     st.markdown("### 🎮 Interactive Demo: Disruption Scenario")
     
-    df = generate_ridership_data()
+    df = load_dataset('ridership', n_routes=DEMO_CONFIG['ridership']['n_routes'])
     
     col1, col2 = st.columns([1, 3])
     
@@ -1648,7 +2221,7 @@ def demo_speed_prediction():
     # Interactive Demo
     st.markdown("### 🎮 Interactive Demo: Speed Optimization")
     
-    df = generate_bus_speed_data()
+    df = load_dataset('speed', n_segments=DEMO_CONFIG['speed']['n_segments'])
     
     col1, col2 = st.columns([1, 3])
     
@@ -1775,11 +2348,62 @@ def render_contact():
     </div>
     """, unsafe_allow_html=True)
 
+def render_performance_panel(rerun_seconds=None, active_section=None):
+    """Render cache counters and rerun timings in the sidebar"""
+    stats = get_dataset_cache().stats()
+    with st.sidebar:
+        st.markdown("### ⚙️ Performance")
+        c1, c2 = st.columns(2)
+        c1.metric("Cache Hits", f"{stats['hits']:,}")
+        c2.metric("Cache Misses", f"{stats['misses']:,}")
+        st.caption(
+            f"{stats['entries']} cached datasets · {stats['evictions']} evicted · "
+            f"{stats['hit_rate']:.0%} hit rate"
+        )
+        
+        if rerun_seconds is not None:
+            st.metric("Last Rerun", f"{rerun_seconds * 1000:,.0f} ms")
+        
+        if active_section is not None:
+            # Time saved = last measured cost of every section that was not rendered
+            timings = st.session_state.get('section_render_times', {})
+            skipped = {name: t for name, t in timings.items() if name != active_section}
+            saved_ms = sum(skipped.values()) * 1000
+            unmeasured = len(NAV_SECTIONS) - 1 - len(skipped)
+            st.metric("Saved by Lazy Rendering", f"~{saved_ms:,.0f} ms")
+            if unmeasured:
+                st.caption(f"{unmeasured} section(s) not opened yet, so not counted")
+            for name, t in timings.items():
+                marker = "▶" if name == active_section else "⏸"
+                st.caption(f"{marker} {name}: {t * 1000:,.0f} ms")
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
+def render_overview():
+    """Render the overview tab content"""
+    render_skills()
+    st.markdown("<br>", unsafe_allow_html=True)
+    render_projects()
+
+NAV_SECTIONS = {
+    "🏠 Overview": render_overview,
+    "🔧 Predictive Maintenance": demo_anomaly_detection,
+    "🔐 SAP Access Governance": demo_sod_violations,
+    "🚌 Route Recommendation": demo_ridership,
+    "⏱️ Speed Predictor": demo_speed_prediction,
+}
+
+def render_section(name):
+    """Run one navigation section and record how long it took"""
+    start = time.perf_counter()
+    NAV_SECTIONS[name]()
+    st.session_state.setdefault('section_render_times', {})[name] = time.perf_counter() - start
+
 def main():
+    rerun_start = time.perf_counter()
+    
     # Hero Section
     render_hero()
     
@@ -1788,31 +2412,23 @@ def main():
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Main Navigation Tabs
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "🏠 Overview",
-        "🔧 Predictive Maintenance", 
-        "🔐 SAP Access Governance",
-        "🚌 Route Recommendation",
-        "⏱️ Speed Predictor"
-    ])
-    
-    with tab1:
-        render_skills()
-        st.markdown("<br>", unsafe_allow_html=True)
-        render_projects()
-    
-    with tab2:
-        demo_anomaly_detection()
-    
-    with tab3:
-        demo_sod_violations()
-    
-    with tab4:
-        demo_ridership()
-    
-    with tab5:
-        demo_speed_prediction()
+    # Main Navigation
+    active_section = None
+    if DEMO_CONFIG['navigation']['lazy']:
+        # Only the selected section is built; the choice survives reruns via its key
+        active_section = st.radio(
+            "Navigation",
+            list(NAV_SECTIONS),
+            horizontal=True,
+            key='active_section',
+            label_visibility='collapsed'
+        )
+        render_section(active_section)
+    else:
+        tabs = st.tabs(list(NAV_SECTIONS))
+        for tab, name in zip(tabs, NAV_SECTIONS):
+            with tab:
+                render_section(name)
     
     st.markdown("<br><br>", unsafe_allow_html=True)
     
@@ -1826,6 +2442,8 @@ def main():
         <p style="opacity: 0.7;">Happy coding! ❤️</p>
     </div>
     """, unsafe_allow_html=True)
+    
+    render_performance_panel(time.perf_counter() - rerun_start, active_section)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,180 @@
+"""
+Autoencoder Inference Engine
+Pure NumPy forward pass for the PdM anomaly detector (51 → 32 → 16 → 8 → 16 → 32 → 51)
+"""
+
+import numpy as np
+
+# ============================================================================
+# ARCHITECTURE
+# ============================================================================
+
+LAYER_SIZES = (51, 32, 16, 8, 16, 32, 51)
+N_ENCODER_LAYERS = 3  # ReLU layers; the decoder layers are linear
+
+# Rows scored per chunk; small enough for the activations to stay in CPU cache
+DEFAULT_BATCH_SIZE = 4_096
+
+
+# ============================================================================
+# INFERENCE ENGINE
+# ============================================================================
+
+class AutoencoderScorer:
+    """
+    Batched autoencoder scorer (ReLU encoder, linear decoder, MSE reconstruction error).
+
+    Weights are stored as W0..W5 with shape (fan_in, fan_out) and biases b0..b5.
+    Optional `feature_mean` / `feature_std` standardize raw features before the
+    forward pass, exactly as during training.
+
+    Because every decoder layer is linear, the three decoder matmuls are folded
+    into a single (8 × 51) map at load time; scoring a chunk costs four matmuls.
+    """
+
+    def __init__(self, weights, biases, feature_mean=None, feature_std=None, dtype=np.float32):
+        if len(weights) != len(LAYER_SIZES) - 1 or len(biases) != len(weights):
+            raise ValueError(f"Expected {len(LAYER_SIZES) - 1} weight matrices and biases")
+        for i, (w, b) in enumerate(zip(weights, biases)):
+            expected = (LAYER_SIZES[i], LAYER_SIZES[i + 1])
+            if w.shape != expected or b.shape != (expected[1],):
+                raise ValueError(f"Layer {i}: expected W{expected} / b({expected[1]},), "
+                                 f"got W{w.shape} / b{b.shape}")
+
+        self.dtype = np.dtype(dtype)
+        self.weights = [np.asarray(w, dtype=self.dtype) for w in weights]
+        self.biases = [np.asarray(b, dtype=self.dtype) for b in biases]
+        n_in = LAYER_SIZES[0]
+        self.feature_mean = np.zeros(n_in, self.dtype) if feature_mean is None else np.asarray(feature_mean, self.dtype)
+        self.feature_std = np.ones(n_in, self.dtype) if feature_std is None else np.asarray(feature_std, self.dtype)
+
+        # Fold the linear decoder: (z W3 + b3) W4 + b4 ... == z W_dec + b_dec
+        w_dec = np.asarray(weights[N_ENCODER_LAYERS], dtype=np.float64)
+        b_dec = np.asarray(biases[N_ENCODER_LAYERS], dtype=np.float64)
+        for w, b in zip(weights[N_ENCODER_LAYERS + 1:], biases[N_ENCODER_LAYERS + 1:]):
+            w = np.asarray(w, dtype=np.float64)
+            w_dec, b_dec = w_dec @ w, b_dec @ w + np.asarray(b, dtype=np.float64)
+        self._w_dec = w_dec.astype(self.dtype)
+        self._b_dec = b_dec.astype(self.dtype)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path, dtype=np.float32):
+        """Load weights from a local .npz file (keys W0..W5, b0..b5, optional feature_mean/std)"""
+        with np.load(path) as npz:
+            n_layers = len(LAYER_SIZES) - 1
+            missing = [k for i in range(n_layers) for k in (f'W{i}', f'b{i}') if k not in npz]
+            if missing:
+                raise KeyError(f"{path} is missing arrays: {', '.join(missing)}")
+            return cls(
+                [npz[f'W{i}'] for i in range(n_layers)],
+                [npz[f'b{i}'] for i in range(n_layers)],
+                feature_mean=npz['feature_mean'] if 'feature_mean' in npz else None,
+                feature_std=npz['feature_std'] if 'feature_std' in npz else None,
+                dtype=dtype,
+            )
+
+    def save(self, path):
+        """Write weights in the format read by `load`"""
+        arrays = {f'W{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, feature_mean=self.feature_mean, feature_std=self.feature_std, **arrays)
+
+    @classmethod
+    def from_pca(cls, features, dtype=np.float32):
+        """
+        Build reference weights from normal-operation features without a training loop.
+
+        The 8-dim bottleneck holds the top principal components, shifted by a bias
+        so they stay positive through the ReLU layers; the linear decoder undoes the
+        shift. The result reconstructs exactly like PCA with 8 components, which is
+        the optimum of a linear-bottleneck autoencoder trained with MSE.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        mean = features.mean(axis=0)
+        std = features.std(axis=0)
+        std[std == 0] = 1.0
+        z = (features - mean) / std
+
+        latent = LAYER_SIZES[N_ENCODER_LAYERS]
+        _, _, vt = np.linalg.svd(z, full_matrices=False)
+        components = vt[:latent].T                          # (51, 8)
+        codes = z @ components
+        shift = np.abs(codes).max(axis=0) * 4 + 1.0       # margin for unseen, larger deviations
+
+        def passthrough(n_in, n_out):
+            w = np.zeros((n_in, n_out))
+            w[:latent, :latent] = np.eye(latent)
+            return w
+
+        weights, biases = [], []
+        for i in range(len(LAYER_SIZES) - 1):
+            n_in, n_out = LAYER_SIZES[i], LAYER_SIZES[i + 1]
+            if i == 0:
+                w = np.zeros((n_in, n_out))
+                w[:, :latent] = components
+                b = np.zeros(n_out)
+                b[:latent] = shift
+            elif i == len(LAYER_SIZES) - 2:
+                w = np.zeros((n_in, n_out))
+                w[:latent] = components.T
+                b = -shift @ components.T
+            else:
+                w, b = passthrough(n_in, n_out), np.zeros(n_out)
+            weights.append(w)
+            biases.append(b)
+        return cls(weights, biases, feature_mean=mean, feature_std=std, dtype=dtype)
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def _standardize(self, x):
+        return (np.asarray(x, dtype=self.dtype) - self.feature_mean) / self.feature_std
+
+    def _forward(self, z):
+        """Reconstruct a standardized chunk"""
+        h = z
+        for w, b in zip(self.weights[:N_ENCODER_LAYERS], self.biases[:N_ENCODER_LAYERS]):
+            h = h @ w
+            h += b
+            np.maximum(h, 0, out=h)
+        out = h @ self._w_dec
+        out += self._b_dec
+        return out
+
+    def encode(self, x):
+        """8-dim latent representation of raw feature rows"""
+        h = self._standardize(x)
+        for w, b in zip(self.weights[:N_ENCODER_LAYERS], self.biases[:N_ENCODER_LAYERS]):
+            h = np.maximum(h @ w + b, 0)
+        return h
+
+    def reconstruct(self, x):
+        """Reconstruction of raw feature rows, in standardized feature space"""
+        return self._forward(self._standardize(x))
+
+    def squared_errors(self, x):
+        """Per-feature squared reconstruction error, shape (rows × 51)"""
+        z = self._standardize(x)
+        err = self._forward(z)
+        err -= z
+        np.square(err, out=err)
+        return err
+
+    def score(self, x, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        MSE reconstruction error for every row of `x`.
+
+        Rows are processed in chunks of `batch_size`, so any array-like that
+        supports slicing (including np.memmap) can be scored with bounded memory.
+        """
+        n_rows = len(x)
+        scores = np.empty(n_rows, dtype=self.dtype)
+        for start in range(0, n_rows, batch_size):
+            stop = min(start + batch_size, n_rows)
+            scores[start:stop] = self.squared_errors(x[start:stop]).mean(axis=1)
+        return scores
@@ -0,0 +1,63 @@
+"""
+Benchmark: Autoencoder Inference
+Scores N feature windows with the NumPy engine across dtypes and batch sizes
+
+Usage:
+    python benchmarks/bench_autoencoder.py [--rows 1000000] [--batch-sizes 1024 4096 65536]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autoencoder import LAYER_SIZES, N_ENCODER_LAYERS, AutoencoderScorer
+
+
+def reference_score(model, x):
+    """Unfolded layer-by-layer forward pass in float64, for a correctness check"""
+    z = (x.astype(np.float64) - model.feature_mean) / model.feature_std
+    h = z
+    for i, (w, b) in enumerate(zip(model.weights, model.biases)):
+        h = h @ w.astype(np.float64) + b
+        if i < N_ENCODER_LAYERS:
+            h = np.maximum(h, 0)
+    return ((h - z) ** 2).mean(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1_024, 4_096, 65_536])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_features = LAYER_SIZES[0]
+    mixing = rng.normal(size=(12, n_features))
+    x = (rng.normal(size=(args.rows, 12)) @ mixing + rng.normal(0, 0.1, (args.rows, n_features))).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pdm_autoencoder.npz')
+        AutoencoderScorer.from_pca(x[:20_000]).save(path)
+        models = {dtype: AutoencoderScorer.load(path, dtype=dtype) for dtype in (np.float32, np.float64)}
+
+    check = x[:5_000]
+    max_err = np.abs(models[np.float32].score(check) - reference_score(models[np.float64], check)).max()
+    print(f"max |float32 - float64 reference| on 5k rows: {max_err:.2e}\n")
+
+    print(f"{'dtype':>8} {'batch':>9} {'seconds':>9} {'rows/s':>14}")
+    for dtype, model in models.items():
+        for batch_size in args.batch_sizes:
+            start = time.perf_counter()
+            model.score(x, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{np.dtype(dtype).name:>8} {batch_size:>9,} {elapsed:>9.3f} {args.rows / elapsed:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: Feature Extraction
+Batch rolling features against chunked extraction at several chunk sizes
+
+Chunked extraction carries each bus's last `window - 1` readings into its next
+chunk; every chunk size, including ones shorter than the window, must
+reproduce extract_features on the whole history.
+
+Usage:
+    python benchmarks/bench_feature_extraction.py [--rows 200000] [--buses 50] [--chunk-rows 1 7 23 250 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DEFAULT_WINDOW, ChunkedFeatureExtractor, extract_features
+from telemetry import SENSOR_NAMES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--buses', type=int, default=50)
+    parser.add_argument('--chunk-rows', type=int, nargs='+', default=[1, 7, DEFAULT_WINDOW - 1, 250, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(args.rows, len(SENSOR_NAMES))).cumsum(axis=0)
+    bus = rng.integers(args.buses, size=args.rows)  # interleaved, as in a fleet-wide archive
+
+    start = time.perf_counter()
+    expected = np.empty((args.rows, 3 * len(SENSOR_NAMES)), dtype=np.float32)
+    for b in range(args.buses):
+        rows = np.flatnonzero(bus == b)
+        expected[rows] = extract_features(pd.DataFrame(values[rows], columns=SENSOR_NAMES))
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{args.rows:,} readings of {args.buses} interleaved buses, window {DEFAULT_WINDOW}\n")
+    print(f"{'batch (per bus)':<22} {batch_seconds:>8.3f} s")
+    for chunk_rows in args.chunk_rows:
+        # Tiny chunks are checked on a prefix to keep the run short
+        n = min(args.rows, chunk_rows * 200)
+        extractor = ChunkedFeatureExtractor()
+        got = np.empty((n, expected.shape[1]), dtype=np.float32)
+        start = time.perf_counter()
+        for i in range(0, n, chunk_rows):
+            chunk_bus = bus[i:min(i + chunk_rows, n)]
+            for b in np.unique(chunk_bus):
+                rows = i + np.flatnonzero(chunk_bus == b)
+                got[rows] = extractor.transform(b, values[rows])
+        seconds = time.perf_counter() - start
+        assert np.allclose(got, expected[:n], atol=1e-4), f"chunks of {chunk_rows} differ from extract_features"
+        print(f"{f'chunks of {chunk_rows:,}':<22} {seconds:>8.3f} s   ({n:,} rows, identical to batch)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Benchmark: Fleet Generation
+Bus-months/sec of synthetic fleet generation for different process-pool sizes
+
+Usage:
+    python benchmarks/bench_fleet_generation.py [--buses 200] [--freq 1h] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEMO_CONFIG
+from telemetry import fleet_bus_ids, generate_fleet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buses', type=int, default=200)
+    parser.add_argument('--freq', default='1h')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    cfg = DEMO_CONFIG['anomaly_detection']
+    bus_ids = fleet_bus_ids(args.buses)
+    print(f"{args.buses} buses at {args.freq} ({os.cpu_count()} CPUs)\n")
+    print(f"{'workers':>8} {'seconds':>9} {'bus-months':>11} {'bus-months/s':>13}")
+    for workers in sorted(set(args.workers)):
+        _, stats = generate_fleet(bus_ids, cfg['seed'], cfg['anomaly_periods'], freq=args.freq,
+                                  period_jitter=cfg['period_jitter'], max_workers=workers)
+        print(f"{stats['workers']:>8} {stats['seconds']:>9.2f} {stats['bus_months']:>11,.0f} "
+              f"{stats['bus_months_per_sec']:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
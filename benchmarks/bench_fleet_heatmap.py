@@ -0,0 +1,69 @@
+"""
+Benchmark: Fleet Health Heatmap
+Daily rollup build, one-day incremental append and heatmap payload for a large fleet
+
+Scores are random hourly readings (not the full telemetry generator), so the
+numbers isolate the rollup and rendering cost.
+
+Usage:
+    python benchmarks/bench_fleet_heatmap.py [--buses 1000] [--days 365]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import DailyRollup
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buses', type=int, default=1_000)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_hours = args.days * 24
+    timestamps = np.datetime64('2024-11-01T00:00', 'ns') + np.arange(n_hours + 24).astype('timedelta64[h]')
+    bus_ids = [f'BUS{i:05d}' for i in range(args.buses)]
+    scores = {bus: rng.exponential(0.2, n_hours + 24).astype(np.float32) for bus in bus_ids}
+
+    rollup = DailyRollup()
+    start = time.perf_counter()
+    for bus in bus_ids:
+        s = scores[bus][:n_hours]
+        rollup.update(bus, timestamps[:n_hours], s, s > 0.6)
+    build = time.perf_counter() - start
+    print(f"{args.buses:,} buses × {args.days} days ({args.buses * n_hours / 1e6:.1f}M hourly readings)\n")
+    print(f"{'initial rollup':<28} {build:>8.3f} s")
+
+    # Next day arrives: the full history is passed again, only the new day is aggregated
+    start = time.perf_counter()
+    for bus in bus_ids:
+        rollup.update(bus, timestamps, scores[bus], scores[bus] > 0.6)
+    print(f"{'append one day (all buses)':<28} {time.perf_counter() - start:>8.3f} s")
+
+    (z, days), seconds = timed(rollup.matrix, bus_ids, 'max')
+    print(f"{'matrix ' + str(z.shape):<28} {seconds:>8.3f} s")
+
+    fig, seconds = timed(lambda: go.Figure(go.Heatmap(z=z, x=days, y=bus_ids, colorscale='YlOrRd')))
+    payload, json_seconds = timed(fig.to_json)
+    print(f"{'figure build':<28} {seconds:>8.3f} s")
+    print(f"{'figure to_json':<28} {json_seconds:>8.3f} s   ({len(payload) / 1e6:.1f} MB)")
+    print(f"{'rollup memory':<28} {rollup.nbytes() / 1e6:>8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
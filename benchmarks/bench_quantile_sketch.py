@@ -0,0 +1,79 @@
+"""
+Benchmark: Mergeable Quantile Sketch
+Accuracy vs memory of merged per-worker t-digests against the exact np.percentile
+
+Scores mimic the PdM fleet: an exponential baseline with a few percent of
+injected high anomaly scores, split into shards as separate workers would see
+them. Errors are reported both in score units and in rank (percentile points).
+
+Usage:
+    python benchmarks/bench_quantile_sketch.py [--values 10000000] [--shards 64] [--compression 50 100 200 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantiles import TDigest
+
+PERCENTILES = [50, 90, 95, 99, 99.9]
+
+
+def fleet_like_scores(n, rng):
+    n_anomalies = n // 20
+    scores = np.concatenate([rng.exponential(0.15, n - n_anomalies) + 0.1, rng.uniform(0.9, 2.5, n_anomalies)])
+    rng.shuffle(scores)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--values', type=int, default=10_000_000)
+    parser.add_argument('--shards', type=int, default=64)
+    parser.add_argument('--compression', type=int, nargs='+', default=[50, 100, 200, 500])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scores = fleet_like_scores(args.values, rng)
+    shards = np.array_split(scores, args.shards)
+
+    start = time.perf_counter()
+    exact = np.percentile(scores, PERCENTILES)
+    exact_seconds = time.perf_counter() - start
+    sorted_scores = np.sort(scores)
+
+    print(f"{args.values:,} scores in {args.shards} shards; exact np.percentile: "
+          f"{exact_seconds:.3f} s over {scores.nbytes / 1e6:.0f} MB held in one place\n")
+    header = ' '.join(f"{'p' + format(p, 'g'):>9}" for p in PERCENTILES)
+    print(f"{'compression':>11} {'bytes':>8} {'sketch s':>9} {'merge s':>8}  |error| in score units / rank error in percentile points")
+    print(f"{'':>40} {header}")
+
+    for compression in args.compression:
+        start = time.perf_counter()
+        digests = [TDigest(compression).update(shard) for shard in shards]
+        sketch_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merged = TDigest.merge_all(digests)
+        merge_seconds = time.perf_counter() - start
+
+        estimate = merged.percentile(PERCENTILES)
+        abs_error = np.abs(estimate - exact)
+        rank_error = np.abs(np.searchsorted(sorted_scores, estimate) / len(scores) * 100 - PERCENTILES)
+
+        # Merging is order-independent up to float rounding
+        reordered = TDigest.merge_all(digests[::-1]).percentile(PERCENTILES)
+        assert np.allclose(reordered, estimate, rtol=1e-9, atol=1e-12)
+
+        print(f"{compression:>11} {merged.nbytes:>8,} {sketch_seconds:>9.3f} {merge_seconds:>8.4f}  "
+              + ' '.join(f"{e:>9.5f}" for e in abs_error))
+        print(f"{'':>40} " + ' '.join(f"{e:>9.5f}" for e in rank_error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: SoD Rule Engine
+Bitset evaluation of every user against every SoD rule, checked against a per-user set-based scan,
+and incremental re-evaluation of a stream of role grants and revocations
+
+Assignments come from the synthetic generator of the SAP Access Governance demo
+with the rules of DEMO_CONFIG['sod'].
+
+Usage:
+    python benchmarks/bench_sod_engine.py [--users 100000] [--roles-per-user 3] [--check-users 2000] [--changes 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEMO_CONFIG
+from sod_engine import IncrementalSodEngine, SodEngine, generate_access_assignments
+
+
+def set_scan(user_roles, role_tcodes, rules):
+    """Reference: T-code set per user, intersected with both functions of every rule"""
+    access = user_roles.merge(role_tcodes, on='Role').groupby('User ID', sort=False)['T-code'].agg(set)
+    return {(user, rule[0]) for user, tcodes in access.items() for rule in rules
+            if tcodes.intersection(rule[3]) and tcodes.intersection(rule[4])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--roles-per-user', type=int, default=3)
+    parser.add_argument('--check-users', type=int, default=2_000, help='Users verified against the set scan')
+    parser.add_argument('--changes', type=int, default=5_000, help='Streamed grants / revocations')
+    args = parser.parse_args()
+
+    rules = DEMO_CONFIG['sod']['rules']
+    user_roles, role_tcodes = generate_access_assignments(rules, args.users, args.roles_per_user, seed=0)
+    engine = SodEngine(rules)
+    print(f"{args.users:,} users, {len(user_roles):,} role assignments, {engine.n_rules} rules, "
+          f"{len(engine.tcodes)} rule T-codes → {engine.n_words} word(s) per bitset\n")
+
+    start = time.perf_counter()
+    roles, role_bits = engine.role_bits(role_tcodes)
+    users, user_bits = engine.user_bits(user_roles, roles, role_bits)
+    access_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = engine.check(user_bits)
+    check_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    violations = engine.violations(user_roles, role_tcodes)
+    total_seconds = time.perf_counter() - start
+
+    print(f"{'access bitsets':<24} {access_seconds:>8.3f} s")
+    print(f"{'rule check (AND tests)':<24} {check_seconds:>8.3f} s   ({hits.size:,} user × rule tests)")
+    print(f"{'violations end to end':<24} {total_seconds:>8.3f} s   "
+          f"({len(violations):,} violations, {violations['User ID'].nunique():,} users)")
+
+    sample = set(np.asarray(users)[:args.check_users])
+    subset = user_roles[user_roles['User ID'].isin(sample)]
+    start = time.perf_counter()
+    expected = set_scan(subset, role_tcodes, rules)
+    scan_seconds = time.perf_counter() - start
+    found = {(u, r) for u, r in zip(violations['User ID'], violations['Rule ID']) if u in sample}
+    assert found == expected, "bitset engine disagrees with the set scan"
+    print(f"{'set scan':<24} {scan_seconds:>8.3f} s   ({len(sample):,} users, matches the engine)")
+
+    start = time.perf_counter()
+    live = IncrementalSodEngine(engine, user_roles, role_tcodes)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(live.users), size=args.changes)
+    grants = rng.random(args.changes) < 0.5
+    role_picks = rng.integers(len(live.roles), size=args.changes)
+    n_added = n_resolved = 0
+    start = time.perf_counter()
+    for u, grant, r in zip(picks, grants, role_picks):
+        user = live.users[u]
+        if grant:
+            added, resolved = live.grant(user, live.roles[r])
+        else:
+            held = live.roles_of(user)
+            added, resolved = live.revoke(user, held[r % len(held)]) if held else ([], [])
+        n_added += len(added)
+        n_resolved += len(resolved)
+    stream_seconds = time.perf_counter() - start
+
+    print(f"\n{'incremental state build':<24} {build_seconds:>8.3f} s")
+    print(f"{'grant / revoke stream':<24} {stream_seconds:>8.3f} s   ({args.changes:,} changes, "
+          f"{stream_seconds / args.changes * 1e3:.3f} ms each; +{n_added:,} / -{n_resolved:,} violations)")
+    current = live.violations()
+    assert len(current) == sum(live.risk_counts.values())
+    expected = {(u, r) for u, r in zip(current['User ID'], current['Rule ID'])}
+    live_roles = [(user, live.roles[r]) for u, user in enumerate(live.users) for r in live.user_roles[u]]
+    final = engine.violations(pd.DataFrame(live_roles, columns=['User ID', 'Role']), role_tcodes)
+    assert expected == set(zip(final['User ID'], final['Rule ID'])), "incremental state drifted"
+    print(f"{'':<24} {'':>8}     final state matches a full re-evaluation")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: SVG vs WebGL Scatter Figures
+Figure build time and serialized payload size for go.Scatter and go.Scattergl
+
+Payload size is nearly identical for both trace types (same data); the WebGL
+win is browser-side draw time, which grows with the point count for SVG.
+Compare with and without LTTB downsampling to see the payload reduction.
+
+Usage:
+    python benchmarks/bench_webgl_rendering.py [--sizes 10000 100000 1000000] [--budget 1500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import downsample_indices, scatter_trace
+
+
+def build_figure(x, y, alerts, trace_cls):
+    """Timeline figure shaped like the PdM demo: score line plus alert markers"""
+    fig = go.Figure()
+    fig.add_trace(trace_cls(
+        x=x, y=y, mode='lines', name='Anomaly Score',
+        line=dict(color='#38BDF8', width=1.5),
+        hovertemplate='<b>Date:</b> %{x}<br><b>Score:</b> %{y:.4f}<extra></extra>'
+    ))
+    fig.add_trace(trace_cls(
+        x=x[alerts], y=y[alerts], mode='markers', name='Alerts',
+        marker=dict(color='#EF4444', size=8, line=dict(color='#DC2626', width=1)),
+        hovertemplate='<b>🚨 ALERT</b><br>Date: %{x}<br>Score: %{y:.4f}<extra></extra>'
+    ))
+    return fig
+
+
+def measure(x, y, alerts, trace_cls):
+    start = time.perf_counter()
+    fig = build_figure(x, y, alerts, trace_cls)
+    payload = fig.to_json()
+    return time.perf_counter() - start, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--budget', type=int, default=1_500, help='LTTB point budget')
+    args = parser.parse_args()
+
+    variants = [('Scatter (SVG)', go.Scatter), ('Scattergl', go.Scattergl), ('auto', scatter_trace)]
+
+    print(f"{'points':>10} {'variant':>18} {'build+json (s)':>15} {'payload (MB)':>13}")
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        x = np.datetime64('2024-11-01T00:00') + np.arange(n).astype('timedelta64[m]')
+        y = rng.exponential(0.2, n)
+        alerts = y > np.percentile(y, 99)
+        for name, trace_cls in variants:
+            seconds, size = measure(x, y, alerts, trace_cls)
+            print(f"{n:>10,} {name:>18} {seconds:>15.3f} {size / 1e6:>13.2f}")
+
+        start = time.perf_counter()
+        idx = downsample_indices(x, y, args.budget, keep=alerts)
+        _, size = measure(x[idx], y[idx], alerts[idx], scatter_trace)
+        seconds = time.perf_counter() - start  # includes the downsampling itself
+        print(f"{n:>10,} {'LTTB + auto':>18} {seconds:>15.3f} {size / 1e6:>13.2f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
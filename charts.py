@@ -0,0 +1,94 @@
+"""
+Chart Helpers
+Server-side reduction of large series and trace selection before they are sent to Plotly
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+# ============================================================================
+# LTTB DOWNSAMPLING
+# ============================================================================
+
+def _as_float(x):
+    """Numeric view of an x axis (datetimes become int64 nanoseconds)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').view(np.int64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that preserve the
+    visual shape of the line (first and last points are always kept).
+
+    Each bucket is processed with vectorized NumPy; the loop runs n_out times.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Average of the next bucket is the third triangle vertex
+        nlo, nhi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        px, py = x[prev], y[prev]
+        area = np.abs((px - avg_x) * (y[lo:hi] - py) - (px - x[lo:hi]) * (avg_y - py))
+        prev = lo + int(np.argmax(area))
+        selected[b + 1] = prev
+    return selected
+
+
+def downsample_indices(x, y, max_points, keep=None):
+    """
+    Indices to plot for a line capped at roughly `max_points`.
+
+    Args:
+        keep: Boolean mask or index array of points that must survive (e.g.
+            alerts); they are merged into the LTTB selection, so the result can
+            exceed max_points by their count
+
+    Returns:
+        Sorted, unique int64 indices
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    idx = lttb_indices(x, y, max_points)
+    if keep is not None:
+        keep = np.asarray(keep)
+        keep = np.flatnonzero(keep) if keep.dtype == bool else keep.astype(np.int64)
+        idx = np.union1d(idx, keep)
+    return idx
+
+
+# ============================================================================
+# WEBGL TRACE SELECTION
+# ============================================================================
+
+# Above this many points SVG scatter rendering becomes the bottleneck
+WEBGL_THRESHOLD = 10_000
+
+
+def scatter_trace(webgl_threshold=WEBGL_THRESHOLD, **kwargs):
+    """
+    go.Scatter for small traces, go.Scattergl once the trace exceeds `webgl_threshold` points.
+
+    Takes the same keyword arguments as go.Scatter (hovertemplate, marker, line, ...),
+    which Scattergl accepts as well, so styling is identical in both modes.
+    """
+    n_points = len(kwargs['x']) if kwargs.get('x') is not None else 0
+    trace_cls = go.Scattergl if n_points > webgl_threshold else go.Scatter
+    return trace_cls(**kwargs)
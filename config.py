@@ -293,9 +293,39 @@ CERTIFICATIONS = [
 # ============================================================================
 
 DEMO_CONFIG = {
+    "navigation": {
+        "lazy": True,  # Build only the selected demo instead of all tabs on every rerun
+    },
+    "cache": {
+        "max_entries": 32,  # LRU capacity of the shared dataset cache
+    },
+    "charts": {
+        "webgl_threshold": 10_000,  # Traces with more points render with Scattergl
+    },
     "anomaly_detection": {
+        "seed": 42,
+        "freq": "4h",
         "n_records": 1000,
         "n_buses": 6,
+        "fleet_workers": None,   # Process pool size for fleet generation (None = all cores)
+        "period_jitter": 0.05,   # Per-bus shift of the anomaly periods (fraction of history)
+        "store_path": "data/sensor_store",  # Columnar on-disk history (see sensor_store.py)
+        "model_path": "data/pdm_autoencoder.npz",  # Autoencoder weights (.npz); missing → per-bus PCA reference
+        "max_plot_points": 1500,  # Point budget of the timeline line (LTTB downsampled)
+        "pyramid_min_rows": 20_000,  # Windows longer than this plot hourly/daily/weekly aggregates instead
+        "episode_max_gap": 3,  # Alerts at most this many readings apart form one episode
+        "seasonal_min_readings": 20,  # Hour-of-week buckets with fewer readings use the bus-wide threshold
+        "replay_rate": 100,          # Live replay speed (readings/sec)
+        "replay_max_rate": 2000,
+        "replay_tick_seconds": 0.5,  # Refresh interval of the live replay fragment
+        # Injected anomaly periods: (start_frac, end_frac, probability, low, high)
+        "anomaly_periods": [
+            (0.25, 0.35, 0.3, 1.0, 1.5),    # Jan 2025 - Mechanical issues (vibration-related)
+            (0.38, 0.55, 0.5, 0.9, 2.5),    # Feb-Mar 2025 - Engine Performance issues
+            (0.50, 0.62, 0.4, 0.9, 2.2),    # Mar-Apr 2025 - Electrical issues
+            (0.65, 0.82, 1.0, 0.02, 0.15),  # May-Jul 2025 - Quiet period
+            (0.85, 1.00, 0.6, 0.9, 2.0),    # Aug-Sep 2025 - Mixed issues
+        ],
         "anomaly_rate": 0.05,
         "sensors": [
             'Engine Temperature (°C)',
@@ -307,22 +337,65 @@ DEMO_CONFIG = {
         ]
     },
     "sod": {
+        "seed": 7,
         "n_users": 50,
-        "n_violations": 100,
+        "roles_per_user": 3,
+        "window_days": 30,  # Access features cover this many trailing days of the audit log
+        "log_chunk_rows": 2_000,  # Audit log rows folded into the aggregates per chunk
+        "iforest_trees": 100,
+        "iforest_sample_size": 256,  # ψ: users sub-sampled per tree
+        "recommend_neighbors": 10,  # Most similar roles kept per role by the recommender
+        "recommend_top_k": 5,
+        # (rule ID, "Function 1 vs Function 2", risk, Function 1 T-codes, Function 2 T-codes)
         "rules": [
-            ("AP01", "Create Vendor vs Pay Vendor", "Critical"),
-            ("GL01", "Create GL Account vs Post to GL", "High"),
-            ("MM01", "Create PO vs Goods Receipt", "Medium"),
-            ("SD01", "Create Customer vs Process Sales", "High"),
-            ("HR01", "Maintain Employee vs Payroll Processing", "Critical"),
+            ("AP01", "Create Vendor vs Pay Vendor", "Critical",
+             ("XK01", "XK02", "FK01", "FK02"), ("F110", "F-53", "F-58", "FBZ2")),
+            ("AP02", "Post Vendor Invoice vs Pay Vendor", "High",
+             ("FB60", "MIRO", "F-43"), ("F110", "F-53", "F-58")),
+            ("AP03", "Create Vendor vs Post Vendor Invoice", "High",
+             ("XK01", "FK01"), ("FB60", "MIRO", "F-43")),
+            ("GL01", "Create GL Account vs Post to GL", "High",
+             ("FS00", "FSP0", "FSS0"), ("FB50", "F-02", "FB01")),
+            ("GL02", "Post to GL vs Period Close", "Medium",
+             ("FB50", "F-02", "FB01"), ("OB52", "FAGLGVTR")),
+            ("AR01", "Create Customer vs Post Customer Payment", "High",
+             ("XD01", "XD02", "FD01", "FD02"), ("F-28", "F-26")),
+            ("AR02", "Customer Credit Limit vs Create Sales Order", "High",
+             ("FD32", "UKM_BP"), ("VA01", "VA02")),
+            ("MM01", "Create PO vs Goods Receipt", "Medium",
+             ("ME21N", "ME22N"), ("MIGO", "MB01")),
+            ("MM02", "Create PO vs Post Vendor Invoice", "Critical",
+             ("ME21N", "ME22N"), ("MIRO", "FB60")),
+            ("MM03", "Release PO vs Create PO", "High",
+             ("ME28", "ME29N"), ("ME21N", "ME22N")),
+            ("MM04", "Maintain Vendor vs Create PO", "High",
+             ("XK02", "MK02"), ("ME21N",)),
+            ("MM05", "Post Inventory Differences vs Enter Inventory Count", "Medium",
+             ("MI07", "MI10"), ("MI04", "MI09")),
+            ("SD01", "Create Customer vs Process Sales", "High",
+             ("XD01", "VD01"), ("VA01", "VF01")),
+            ("SD02", "Pricing Maintenance vs Create Sales Order", "Medium",
+             ("VK11", "VK12"), ("VA01", "VA02")),
+            ("SD03", "Create Billing vs Post Customer Payment", "High",
+             ("VF01", "VF02"), ("F-28",)),
+            ("HR01", "Maintain Employee vs Payroll Processing", "Critical",
+             ("PA30", "PA40"), ("PC00_M99_CALC", "PC00_M99_CIPE")),
+            ("HR02", "Maintain Time Data vs Payroll Processing", "Medium",
+             ("PA61", "CAT2"), ("PC00_M99_CALC",)),
+            ("BC01", "Maintain Users vs Maintain Roles", "Critical",
+             ("SU01", "SU10"), ("PFCG",)),
+            ("BC02", "Develop Programs vs Transport to Production", "High",
+             ("SE38", "SE80", "SE24"), ("STMS",)),
         ]
     },
     "ridership": {
+        "seed": 11,
         "n_routes": 10,
         "hours": list(range(24)),
         "peak_hours": [(7, 9), (17, 19)]
     },
     "speed": {
+        "seed": 23,
         "n_segments": 20,
         "traffic_levels": ['Light', 'Moderate', 'Heavy'],
         "weather_conditions": ['Clear', 'Rainy', 'Cloudy']
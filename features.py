@@ -0,0 +1,234 @@
+"""
+PdM Feature Engineering
+Trend / std / residual features for the 17 bus sensors (17 × 3 = 51 autoencoder inputs)
+"""
+
+import numpy as np
+import pandas as pd
+
+from telemetry import MAINTENANCE_TYPES, SENSOR_CATEGORIES, SENSOR_NAMES
+
+# ============================================================================
+# FEATURE LAYOUT
+# ============================================================================
+
+FEATURE_KINDS = ('trend', 'std', 'residual')
+
+# Sensor-major order: features [3*i, 3*i + 3) belong to SENSOR_NAMES[i]
+FEATURE_NAMES = [f'{sensor} {kind}' for sensor in SENSOR_NAMES for kind in FEATURE_KINDS]
+
+# Rolling window length in samples
+DEFAULT_WINDOW = 24
+
+
+def _interleave(trend, std, residual):
+    """Stack (rows × sensors) blocks into the sensor-major (rows × 3·sensors) layout"""
+    return np.stack([trend, std, residual], axis=-1).reshape(*trend.shape[:-1], -1)
+
+
+# ============================================================================
+# BATCH EXTRACTION
+# ============================================================================
+
+def extract_features(df, window=DEFAULT_WINDOW, sensors=SENSOR_NAMES):
+    """
+    Rolling features over a whole (time-ordered) history, for offline scoring.
+
+    Uses the same definitions as RollingFeatureExtractor: trailing mean, sample
+    std (0 until two readings are in the window) and value minus trend.
+
+    Returns:
+        float32 array of shape (rows × 3·len(sensors))
+    """
+    return _rolling_features(df[list(sensors)].to_numpy(np.float64), window)
+
+
+def _rolling_features(values, window):
+    """Features of a (rows × sensors) float64 block, in time order"""
+    rolling = pd.DataFrame(values).rolling(window, min_periods=1)
+    trend = rolling.mean().to_numpy()
+    std = rolling.std().fillna(0.0).to_numpy()
+    residual = values - trend
+    return _interleave(trend, std, residual).astype(np.float32)
+
+
+class ChunkedFeatureExtractor:
+    """
+    Batch features for histories that arrive in chunks (e.g. archive files read
+    with a bounded chunk size).
+
+    The last `window - 1` readings of each bus are carried into its next chunk,
+    so concatenating the per-chunk outputs gives the same features as
+    extract_features on the whole history, while memory stays bounded by the
+    chunk size.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, sensors=SENSOR_NAMES):
+        self.window = window
+        self.sensors = list(sensors)
+        self._tails = {}
+
+    def transform(self, bus_id, values):
+        """
+        Args:
+            values: (rows × sensors) readings of one bus, continuing its previous chunk
+
+        Returns:
+            float32 array of shape (rows × 3·len(sensors))
+        """
+        values = np.asarray(values, dtype=np.float64)
+        block = self.carry(bus_id, values)
+        return _rolling_features(block, self.window)[len(block) - len(values):]
+
+    def tail(self, bus_id):
+        """Readings carried into the bus's next chunk (at most `window - 1`)"""
+        tail = self._tails.get(bus_id)
+        return np.empty((0, len(self.sensors))) if tail is None else tail
+
+    def carry(self, bus_id, values):
+        """
+        Advance a bus's carried tail past `values` without computing features
+        (e.g. readings scored elsewhere). Returns the carried tail plus `values`.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        tail = self._tails.get(bus_id)
+        block = values if tail is None else np.concatenate([tail, values])
+        # A chunk shorter than the window keeps part of the previous tail too
+        self._tails[bus_id] = block[max(0, len(block) - (self.window - 1)):] if self.window > 1 else block[:0]
+        return block
+
+
+# ============================================================================
+# ONLINE EXTRACTION
+# ============================================================================
+
+class _BusWindow:
+    """Ring buffer plus sliding Welford state for one bus (all sensors at once)"""
+
+    __slots__ = ('ring', 'pos', 'count', 'mean', 'm2')
+
+    def __init__(self, window, n_sensors):
+        self.ring = np.zeros((window, n_sensors))
+        self.pos = 0
+        self.count = 0
+        self.mean = np.zeros(n_sensors)
+        self.m2 = np.zeros(n_sensors)
+
+    def push(self, x):
+        window = len(self.ring)
+        if self.count < window:
+            # Warm-up: plain Welford insert
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Full window: replace the oldest reading in O(1)
+            old = self.ring[self.pos]
+            old_mean = self.mean.copy()
+            self.mean += (x - old) / window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            np.maximum(self.m2, 0.0, out=self.m2)
+        self.ring[self.pos] = x
+        self.pos = (self.pos + 1) % window
+
+    def std(self):
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class RollingFeatureExtractor:
+    """
+    Incremental 51-dim feature extractor for live telemetry.
+
+    Keeps one fixed-size window per bus, so each reading costs O(1) per sensor
+    and memory stays at `window × n_sensors` floats per bus no matter how long
+    the stream runs.
+
+    Example:
+        extractor = RollingFeatureExtractor()
+        for bus_id, reading in stream:           # reading: 17 sensor values
+            features = extractor.update(bus_id, reading)
+            score = model.score(features[None])[0]
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, sensors=SENSOR_NAMES):
+        self.window = window
+        self.sensors = list(sensors)
+        self._buses = {}
+
+    def update(self, bus_id, reading):
+        """
+        Add one reading for `bus_id` and return its feature vector.
+
+        Args:
+            reading: Sequence of sensor values ordered like `self.sensors`, or a
+                mapping (dict / pd.Series) keyed by sensor name
+        """
+        if isinstance(reading, (dict, pd.Series)):
+            reading = [reading[s] for s in self.sensors]
+        x = np.asarray(reading, dtype=np.float64)
+
+        state = self._buses.get(bus_id)
+        if state is None:
+            state = self._buses[bus_id] = _BusWindow(self.window, len(self.sensors))
+        state.push(x)
+        return _interleave(state.mean, state.std(), x - state.mean).astype(np.float32)
+
+    def reset(self, bus_id=None):
+        """Forget one bus (or all buses)"""
+        if bus_id is None:
+            self._buses.clear()
+        else:
+            self._buses.pop(bus_id, None)
+
+    @property
+    def n_buses(self):
+        return len(self._buses)
+
+    def memory_bytes(self):
+        """Bytes held by the rolling state of all tracked buses"""
+        per_bus = self.window * len(self.sensors) * 8 + 2 * len(self.sensors) * 8
+        return per_bus * len(self._buses)
+
+
+# ============================================================================
+# ERROR ATTRIBUTION
+# ============================================================================
+
+# Categories the per-sensor errors roll up to (MAINTENANCE_TYPES without 'Normal')
+ATTRIBUTION_CATEGORIES = MAINTENANCE_TYPES[1:]
+
+
+def sensor_errors(squared_errors):
+    """Roll a (rows × 3·sensors) squared-error matrix up to (rows × sensors)"""
+    squared_errors = np.asarray(squared_errors)
+    return squared_errors.reshape(len(squared_errors), -1, len(FEATURE_KINDS)).sum(axis=2)
+
+
+def category_errors(per_sensor, sensors=SENSOR_NAMES):
+    """Roll (rows × sensors) errors up to (rows × ATTRIBUTION_CATEGORIES) with one matmul"""
+    membership = np.zeros((len(sensors), len(ATTRIBUTION_CATEGORIES)), dtype=np.float32)
+    for i, sensor in enumerate(sensors):
+        membership[i, ATTRIBUTION_CATEGORIES.index(SENSOR_CATEGORIES[sensor])] = 1.0
+    return np.asarray(per_sensor) @ membership
+
+
+def top_sensors(per_sensor, k=3, sensors=SENSOR_NAMES):
+    """
+    The k largest contributors of each row.
+
+    Returns:
+        (indices, shares): int arrays into `sensors` and each contributor's
+        fraction of the row's total error, both (rows × k), largest first
+    """
+    per_sensor = np.asarray(per_sensor)
+    k = min(k, per_sensor.shape[1])
+    idx = np.argpartition(-per_sensor, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(per_sensor, idx, axis=1)
+    order = np.argsort(-values, axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    totals = per_sensor.sum(axis=1, keepdims=True)
+    shares = np.take_along_axis(per_sensor, idx, axis=1) / np.where(totals > 0, totals, 1)
+    return idx, shares
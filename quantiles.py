@@ -0,0 +1,455 @@
+"""
+Streaming Quantile Estimation
+Constant-memory percentile thresholds for live anomaly scores
+"""
+
+import numpy as np
+
+# ============================================================================
+# P² SINGLE-QUANTILE ESTIMATOR
+# ============================================================================
+
+class P2Quantile:
+    """
+    P² estimator (Jain & Chlamtac, 1985) for one quantile.
+
+    Tracks five markers whose heights approximate the min, p/2, p, (1+p)/2 and
+    max quantiles, adjusting them with piecewise-parabolic interpolation. Each
+    update is O(1) and the state never grows.
+    """
+
+    __slots__ = ('p', 'n', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f"p must be in (0, 1), got {p}")
+        self.p = p
+        self.n = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, x):
+        x = float(x)
+        self.n += 1
+        q = self.heights
+        if self.n <= 5:
+            q.append(x)
+            if self.n == 5:
+                q.sort()
+            return
+
+        # Find the cell containing x, widening the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        pos = self.positions
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        desired = self.desired
+        for i in range(5):
+            desired[i] += self.increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = q[i] + step / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + step) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i]) +
+                    (pos[i + 1] - pos[i] - step) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1])
+                )
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + step * (q[i + step] - q[i]) / (pos[i + step] - pos[i])
+                pos[i] += step
+
+    def value(self):
+        """Current estimate (exact while fewer than five samples were seen)"""
+        if self.n == 0:
+            return float('nan')
+        if self.n < 5:
+            return float(np.percentile(self.heights, self.p * 100))
+        return self.heights[2]
+
+
+# ============================================================================
+# PER-BUS STREAMING THRESHOLDS
+# ============================================================================
+
+DEFAULT_PERCENTILES = (90, 95, 99)
+
+# Readings seen before a bus's thresholds are trusted for alerting
+WARMUP_READINGS = 20
+
+
+class StreamingThresholds:
+    """
+    Per-bus percentile thresholds maintained incrementally with P² estimators.
+
+    Each reading is first compared with the bus's current thresholds (so a score
+    never raises the bar it is judged against) and then folded into them.
+    """
+
+    def __init__(self, percentiles=DEFAULT_PERCENTILES, warmup=WARMUP_READINGS):
+        self.percentiles = tuple(percentiles)
+        self.warmup = warmup
+        self._estimators = {}
+
+    def _bus(self, bus_id):
+        estimators = self._estimators.get(bus_id)
+        if estimators is None:
+            estimators = self._estimators[bus_id] = [P2Quantile(p / 100) for p in self.percentiles]
+        return estimators
+
+    def update(self, bus_id, score):
+        """
+        Score one new reading in O(1).
+
+        Returns:
+            (thresholds, is_alert): arrays with one entry per percentile, where
+            thresholds are the values the reading was compared against
+        """
+        estimators = self._bus(bus_id)
+        thresholds = np.array([e.value() for e in estimators])
+        warmed_up = estimators[0].n >= self.warmup
+        is_alert = (score > thresholds) & warmed_up
+        for e in estimators:
+            e.update(score)
+        return thresholds, is_alert
+
+    def feed(self, bus_id, scores):
+        """
+        Stream a sequence of readings through `update`.
+
+        Returns:
+            (thresholds, is_alert): arrays of shape (len(scores), n_percentiles)
+        """
+        n = len(scores)
+        thresholds = np.empty((n, len(self.percentiles)))
+        is_alert = np.zeros((n, len(self.percentiles)), dtype=bool)
+        for i, score in enumerate(np.asarray(scores, dtype=np.float64)):
+            thresholds[i], is_alert[i] = self.update(bus_id, score)
+        return thresholds, is_alert
+
+    def thresholds(self, bus_id):
+        """Current threshold per percentile for one bus"""
+        return np.array([e.value() for e in self._bus(bus_id)])
+
+    def threshold(self, bus_id, percentile):
+        return self._bus(bus_id)[self.percentiles.index(percentile)].value()
+
+    def reset(self, bus_id):
+        """Forget a bus's estimators (its history was replaced)"""
+        self._estimators.pop(bus_id, None)
+
+    def n_seen(self, bus_id):
+        estimators = self._estimators.get(bus_id)
+        return estimators[0].n if estimators else 0
+
+
+# ============================================================================
+# SORTED SCORE INDEX
+# ============================================================================
+
+class SortedScores:
+    """
+    Scores of a fixed history sorted once, with the argsort back to row order.
+
+    Afterwards any percentile or score cut-off resolves by binary search:
+    the threshold in O(1), the alert count in O(log n) and the alerting rows
+    in O(log n + k log k) for k alerts, without building a full-length mask.
+    """
+
+    def __init__(self, scores):
+        scores = np.asarray(scores)
+        if scores.ndim != 1 or len(scores) == 0:
+            raise ValueError("SortedScores needs a non-empty 1D score array")
+        self.order = np.argsort(scores, kind='stable')
+        self.sorted = scores[self.order]
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def threshold(self, percentile):
+        """Same value as np.percentile(scores, percentile) (linear interpolation)"""
+        pos = percentile / 100 * (len(self.sorted) - 1)
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, len(self.sorted) - 1)
+        low, high = float(self.sorted[lo]), float(self.sorted[hi])
+        return low + (pos - lo) * (high - low)
+
+    def _first_above(self, threshold):
+        return int(np.searchsorted(self.sorted, threshold, side='right'))
+
+    def count_above(self, threshold):
+        """Number of scores strictly greater than `threshold`"""
+        return len(self.sorted) - self._first_above(threshold)
+
+    def rows_above(self, threshold, by='row'):
+        """
+        Row indices of scores strictly greater than `threshold`.
+
+        Args:
+            by: 'row' for ascending row order (time order for a history),
+                'score' for descending score
+        """
+        rows = self.order[self._first_above(threshold):]
+        return np.sort(rows) if by == 'row' else rows[::-1]
+
+    def rows_at_or_below(self, threshold):
+        """Row indices (ascending) of scores not above `threshold`"""
+        return np.sort(self.order[:self._first_above(threshold)])
+
+
+# ============================================================================
+# SEASONAL (HOUR-OF-WEEK) THRESHOLDS
+# ============================================================================
+
+HOURS_PER_WEEK = 168
+
+# Buckets with fewer readings than this fall back to the bus-wide threshold
+MIN_BUCKET_READINGS = 20
+
+_HOUR_NS = 3_600 * 10**9
+
+
+def hour_of_week(timestamps):
+    """Hour of the week (Monday 00:00 = 0 ... Sunday 23:00 = 167) of datetime64 timestamps"""
+    hours = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64) // _HOUR_NS
+    return ((hours + 72) % HOURS_PER_WEEK).astype(np.int64)  # the epoch was a Thursday
+
+
+def grouped_percentiles(groups, values, n_groups, percentiles):
+    """
+    np.percentile of `values` within every group, from a single lexsort.
+
+    Args:
+        groups: Integer group id per value, in [0, n_groups)
+        values: Non-empty array of values
+
+    Returns:
+        (table, counts): table of shape (n_groups × len(percentiles)), NaN for
+        empty groups, and the number of values per group
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    pos = (counts[:, None] - 1) * (np.asarray(percentiles, dtype=np.float64)[None, :] / 100)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, counts[:, None] - 1)
+    # Empty groups index out of range; clip them and blank them below
+    low = sorted_values[np.clip(starts[:, None] + lo, 0, len(values) - 1)]
+    high = sorted_values[np.clip(starts[:, None] + hi, 0, len(values) - 1)]
+    table = low + (pos - lo) * (high - low)
+    table[counts == 0] = np.nan
+    return table, counts
+
+
+class SeasonalThresholds:
+    """
+    Percentile thresholds per bus and hour of the week, as one lookup array.
+
+    `table[b, h, p]` is the `percentiles[p]` threshold of bus `bus_ids[b]` at
+    hour-of-week `h`. It is fitted over the whole fleet with one grouped
+    quantile pass; scoring is a vectorized gather into the table.
+    """
+
+    def __init__(self, bus_ids, table, counts, percentiles=DEFAULT_PERCENTILES):
+        self.bus_ids = list(bus_ids)
+        self.percentiles = tuple(percentiles)
+        self.table = table
+        self.counts = counts
+        self._bus_index = {bus: i for i, bus in enumerate(self.bus_ids)}
+
+    @classmethod
+    def fit(cls, histories, percentiles=DEFAULT_PERCENTILES, min_readings=MIN_BUCKET_READINGS):
+        """
+        Args:
+            histories: Mapping of bus_id -> (timestamps, scores)
+            min_readings: Buckets with fewer readings use the bus-wide threshold
+        """
+        bus_ids = list(histories)
+        groups = np.concatenate([
+            i * HOURS_PER_WEEK + hour_of_week(ts) for i, (ts, _) in enumerate(histories.values())
+        ])
+        scores = np.concatenate([np.asarray(s, dtype=np.float64) for _, s in histories.values()])
+
+        table, counts = grouped_percentiles(groups, scores, len(bus_ids) * HOURS_PER_WEEK, percentiles)
+        table = table.reshape(len(bus_ids), HOURS_PER_WEEK, len(percentiles))
+        counts = counts.reshape(len(bus_ids), HOURS_PER_WEEK)
+
+        bus_wide, _ = grouped_percentiles(groups // HOURS_PER_WEEK, scores, len(bus_ids), percentiles)
+        sparse = counts < min_readings
+        table = np.where(sparse[:, :, None], bus_wide[:, None, :], table)
+        return cls(bus_ids, table.astype(np.float32), counts, percentiles)
+
+    def lookup(self, bus_id, timestamps):
+        """Thresholds each reading is judged against, shape (readings × percentiles)"""
+        return self.table[self._bus_index[bus_id], hour_of_week(timestamps)]
+
+    def alerts(self, bus_id, timestamps, scores, percentile):
+        """Boolean alert flag per reading for one percentile"""
+        p = self.percentiles.index(percentile)
+        return np.asarray(scores) > self.lookup(bus_id, timestamps)[:, p]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+
+# ============================================================================
+# MERGEABLE QUANTILE SKETCH
+# ============================================================================
+
+DEFAULT_COMPRESSION = 200
+
+# Raw values buffered (as a multiple of the compression) before they are clustered
+_BUFFER_FACTOR = 10
+
+
+def _cluster(means, weights, compression):
+    """
+    Collapse weighted points into at most compression + 1 centroids.
+
+    Points are sorted and cut wherever the k1 scale function
+    k(q) = compression · (asin(2q - 1) / π + 1/2) crosses an integer, so
+    centroids are small near the tails and large around the median.
+    """
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+    cum = np.cumsum(weights)
+    q_mid = (cum - weights / 2) / cum[-1]
+    k = np.floor(compression * (np.arcsin(2 * q_mid - 1) / np.pi + 0.5)).astype(np.int64)
+    first = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+    cluster_weights = np.add.reduceat(weights, first)
+    cluster_means = np.add.reduceat(means * weights, first) / cluster_weights
+    return cluster_means, cluster_weights
+
+
+class TDigest:
+    """
+    Mergeable, serializable quantile sketch (t-digest, Dunning & Ertl 2019).
+
+    Memory stays O(compression) however many values are added, tail
+    percentiles (95th, 99th) are the most accurate, and two digests merge by
+    re-clustering their centroids, so workers can sketch their own buses and a
+    reducer combines the sketches in any order.
+
+    Example:
+        digests = [TDigest().update(scores) for scores in per_worker_scores]
+        threshold = TDigest.merge_all(digests).percentile(95)
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored); returns self"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= _BUFFER_FACTOR * self.compression:
+            self._compress()
+        return self
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means, *self._buffer])
+        weights = np.concatenate([self.weights, np.ones(self._buffered)])
+        self._buffer, self._buffered = [], 0
+        self.means, self.weights = _cluster(means, weights, self.compression)
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + self._buffered
+
+    @property
+    def nbytes(self):
+        self._compress()
+        return self.means.nbytes + self.weights.nbytes
+
+    def merge(self, *others):
+        """New digest summarizing this one and `others`"""
+        merged = TDigest(max([self.compression] + [o.compression for o in others]))
+        digests = [self, *others]
+        for d in digests:
+            d._compress()
+        merged.min = min(d.min for d in digests)
+        merged.max = max(d.max for d in digests)
+        means = np.concatenate([d.means for d in digests])
+        if len(means):
+            merged.means, merged.weights = _cluster(
+                means, np.concatenate([d.weights for d in digests]), merged.compression
+            )
+        return merged
+
+    @classmethod
+    def merge_all(cls, digests, compression=DEFAULT_COMPRESSION):
+        digests = list(digests)
+        return digests[0].merge(*digests[1:]) if digests else cls(compression)
+
+    def percentile(self, p):
+        """
+        Estimated np.percentile(values, p) (linear interpolation); exact while every
+        centroid still holds a single value. `p` may be a scalar or an array.
+        """
+        self._compress()
+        if len(self.means) == 0:
+            return np.full(np.shape(p), np.nan)[()]
+        total = self.weights.sum()
+        # Rank (0-based) at the centre of each centroid, pinned to the exact min / max
+        centres = np.cumsum(self.weights) - self.weights / 2 - 0.5
+        ranks = np.r_[0.0, centres, total - 1]
+        values = np.r_[self.min, self.means, self.max]
+        return np.interp(np.asarray(p, dtype=np.float64) / 100 * (total - 1), ranks, values)[()]
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_dict(self):
+        """JSON-serializable state"""
+        self._compress()
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min if self.weights.size else None,
+            'max': self.max if self.weights.size else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        digest = cls(state['compression'])
+        digest.means = np.asarray(state['means'], dtype=np.float64)
+        digest.weights = np.asarray(state['weights'], dtype=np.float64)
+        if digest.weights.size:
+            digest.min, digest.max = state['min'], state['max']
+        return digest
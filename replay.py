@@ -0,0 +1,148 @@
+"""
+Live Telemetry Replay
+Paced reading-by-reading replay through the online PdM pipeline (features → autoencoder → thresholds)
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from features import DEFAULT_WINDOW, RollingFeatureExtractor
+from quantiles import DEFAULT_PERCENTILES, P2Quantile, StreamingThresholds, WARMUP_READINGS
+from telemetry import SENSOR_NAMES
+
+# ============================================================================
+# ONLINE PIPELINE
+# ============================================================================
+
+class OnlinePipeline:
+    """
+    Per-reading scoring: rolling features, autoencoder reconstruction error and
+    per-bus P² thresholds, all O(1) in the length of the history.
+    """
+
+    def __init__(self, scorer, window=DEFAULT_WINDOW, percentiles=DEFAULT_PERCENTILES, warmup=WARMUP_READINGS):
+        self.scorer = scorer
+        self.extractor = RollingFeatureExtractor(window)
+        self.thresholds = StreamingThresholds(percentiles, warmup)
+
+    def process(self, bus_id, reading):
+        """
+        Score one reading (17 sensor values ordered like SENSOR_NAMES).
+
+        Returns:
+            (score, thresholds, is_alert) with one threshold / flag per percentile
+        """
+        features = self.extractor.update(bus_id, reading)
+        score = float(self.scorer.squared_errors(features[None]).mean())
+        thresholds, is_alert = self.thresholds.update(bus_id, score)
+        return score, thresholds, is_alert
+
+
+# ============================================================================
+# PACED REPLAY
+# ============================================================================
+
+# Points kept for the live chart; older points scroll out
+DEFAULT_CHART_POINTS = 500
+
+
+class TelemetryReplay:
+    """
+    Replays a recorded bus history at `rate` readings per second of wall time.
+
+    Each `step` processes every reading that has come due since the last call
+    (capped at `max_batch`), so the replay keeps its rate however often it is
+    polled. Latency is measured per reading from the moment it is pulled from
+    the source until its alert decision is made.
+
+    Example:
+        replay = TelemetryReplay('WA7230M', df, OnlinePipeline(scorer), rate=200)
+        replay.start()
+        while replay.running:
+            replay.step()
+            chart_rows = replay.chart_frame()
+    """
+
+    def __init__(self, bus_id, df, pipeline, rate, percentile=95, chart_points=DEFAULT_CHART_POINTS):
+        self.bus_id = bus_id
+        self.pipeline = pipeline
+        self.rate = float(rate)
+        self.p_idx = pipeline.thresholds.percentiles.index(percentile)
+        self.timestamps = df['timestamp'].to_numpy()
+        self.readings = df[SENSOR_NAMES].to_numpy(dtype=np.float64)
+        self.position = 0
+        self.running = False
+        self.started_at = None
+        self.finished_at = None
+        self.busy_seconds = 0.0
+        self.alerts = 0
+        self.latency_sum = 0.0
+        self.latency_p99 = P2Quantile(0.99)
+        self._points = deque(maxlen=chart_points)
+
+    def __len__(self):
+        return len(self.readings)
+
+    def start(self, now=None):
+        self.started_at = time.perf_counter() if now is None else now
+        self.finished_at = None
+        self.running = True
+
+    def stop(self, now=None):
+        if self.running:
+            self.finished_at = time.perf_counter() if now is None else now
+        self.running = False
+
+    def step(self, now=None, max_batch=None):
+        """Process the readings due by `now`; returns how many were processed"""
+        if not self.running:
+            return 0
+        now = time.perf_counter() if now is None else now
+        due = min(int((now - self.started_at) * self.rate) + 1, len(self.readings))
+        if max_batch is not None:
+            due = min(due, self.position + max_batch)
+
+        batch_start = time.perf_counter()
+        for i in range(self.position, due):
+            t0 = time.perf_counter()
+            score, thresholds, is_alert = self.pipeline.process(self.bus_id, self.readings[i])
+            latency = time.perf_counter() - t0
+            self.latency_sum += latency
+            self.latency_p99.update(latency)
+            alert = bool(is_alert[self.p_idx])
+            self.alerts += alert
+            self._points.append((self.timestamps[i], score, thresholds[self.p_idx], alert))
+        self.busy_seconds += time.perf_counter() - batch_start
+
+        processed = due - self.position
+        self.position = due
+        if self.position >= len(self.readings):
+            self.stop(now)
+        return processed
+
+    def chart_frame(self):
+        """Most recent points as a DataFrame indexed by timestamp"""
+        if not self._points:
+            return pd.DataFrame(columns=['Score', 'Threshold', 'Alert'])
+        timestamps, scores, thresholds, alerts = zip(*self._points)
+        return pd.DataFrame({'Score': scores, 'Threshold': thresholds, 'Alert': alerts},
+                            index=pd.DatetimeIndex(timestamps, name='timestamp'))
+
+    def stats(self, now=None):
+        """Sustained events/sec (wall clock), pipeline capacity and per-reading latency"""
+        now = time.perf_counter() if now is None else now
+        end = self.finished_at if self.finished_at is not None else now
+        elapsed = max(end - self.started_at, 1e-9) if self.started_at is not None else 0.0
+        n = self.position
+        return {
+            'events': n,
+            'alerts': self.alerts,
+            'events_per_sec': n / elapsed if elapsed else 0.0,
+            'capacity_per_sec': n / self.busy_seconds if self.busy_seconds else 0.0,
+            'latency_mean_ms': self.latency_sum / n * 1e3 if n else 0.0,
+            'latency_p99_ms': self.latency_p99.value() * 1e3 if n else 0.0,
+            'progress': n / len(self.readings) if len(self.readings) else 1.0,
+        }
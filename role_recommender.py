@@ -0,0 +1,245 @@
+"""
+Role Recommender
+Item-item collaborative filtering over a sparse user × role matrix, with SoD screening
+"""
+
+import numpy as np
+import pandas as pd
+
+from sod_engine import sap_user_ids
+
+# ============================================================================
+# SPARSE MATRIX
+# ============================================================================
+
+class BinaryCSR:
+    """
+    Boolean sparse matrix in CSR form: row `i` holds columns
+    `indices[indptr[i]:indptr[i + 1]]`, sorted and unique.
+    """
+
+    def __init__(self, indptr, indices, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.shape = shape
+
+    @classmethod
+    def from_pairs(cls, rows, cols, shape):
+        keys = np.unique(np.asarray(rows, dtype=np.int64) * shape[1] + np.asarray(cols, dtype=np.int64))
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // shape[1], minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, keys % shape[1], shape)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def row(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def column_counts(self):
+        return np.bincount(self.indices, minlength=self.shape[1])
+
+    def gram(self):
+        """
+        Dense (cols × cols) co-occurrence counts Rᵀ R.
+
+        Sparse-sparse product: only the column pairs within each row are
+        generated (Σ row_length² pairs), then counted with one bincount.
+        """
+        lengths = np.diff(self.indptr)
+        entry_row = np.repeat(np.arange(self.shape[0]), lengths)
+        repeats = lengths[entry_row]  # every entry pairs with each entry of its row
+        left = np.repeat(self.indices, repeats)
+        block_start = np.repeat(np.cumsum(repeats) - repeats, repeats)
+        offset = np.arange(len(left)) - block_start
+        right = self.indices[np.repeat(self.indptr[entry_row], repeats) + offset]
+        n = self.shape[1]
+        return np.bincount(left * n + right, minlength=n * n).reshape(n, n)
+
+
+# ============================================================================
+# RECOMMENDER
+# ============================================================================
+
+DEFAULT_NEIGHBORS = 50
+
+
+class RoleRecommender:
+    """
+    Item-item collaborative filtering for role requests.
+
+    Fitting builds the user × role CSR matrix, the role-role cosine
+    similarity cos(a, b) = |users(a) ∩ users(b)| / sqrt(|users(a)| |users(b)|)
+    from Rᵀ R, and keeps each role's `n_neighbors` most similar roles
+    (argpartition). A user's candidates are scored by summing the neighbor
+    lists of the roles they hold, so a request touches a few hundred numbers
+    regardless of the number of users.
+
+    With an SoD engine, candidates whose T-codes would give the user a
+    violation they do not already have are withheld before the top-k pick.
+
+    Example:
+        recommender = RoleRecommender().fit(user_roles, SodEngine(rules), role_tcodes)
+        picks, withheld = recommender.recommend('JSMITH42', k=5)
+    """
+
+    def __init__(self, n_neighbors=DEFAULT_NEIGHBORS):
+        self.n_neighbors = n_neighbors
+
+    def fit(self, user_roles, engine=None, role_tcodes=None):
+        """
+        Args:
+            user_roles: DataFrame with 'User ID' and 'Role' columns
+            engine, role_tcodes: SodEngine and its 'Role' / 'T-code' table, for screening
+        """
+        user_codes, users = pd.factorize(user_roles['User ID'])
+        role_codes, roles = pd.factorize(user_roles['Role'])
+        self.users = pd.Index(users)
+        self.roles = pd.Index(roles)
+        self.user_index = {user: i for i, user in enumerate(users)}
+        self.role_names = np.asarray(roles, dtype=object)
+        self.matrix = BinaryCSR.from_pairs(user_codes, role_codes, (len(users), len(roles)))
+
+        counts = self.matrix.column_counts()
+        self.popularity = counts
+        norms = np.sqrt(np.maximum(counts, 1)).astype(np.float32)
+        similarity = self.matrix.gram().astype(np.float32) / norms[:, None] / norms[None, :]
+        np.fill_diagonal(similarity, 0)
+
+        k = min(self.n_neighbors, len(roles) - 1)
+        if k > 0:
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        else:
+            top = np.zeros((len(roles), 0), dtype=np.int64)
+        self.neighbors = top
+        self.weights = np.take_along_axis(similarity, top, axis=1)
+
+        self.engine = engine
+        if engine is not None:
+            role_names, bits = engine.role_bits(role_tcodes)
+            position = pd.Index(role_names).get_indexer(self.roles)
+            self.role_bits = np.where((position >= 0)[:, None], bits[np.maximum(position, 0)], 0).astype(np.uint64)
+        return self
+
+    def scores(self, held):
+        """Summed neighbor similarity of every role for a user holding role indices `held`"""
+        if len(held) == 0:
+            return self.popularity / max(self.popularity.max(), 1)  # cold start: most common roles
+        return np.bincount(self.neighbors[held].ravel(), weights=self.weights[held].ravel(),
+                           minlength=len(self.roles))
+
+    def new_conflicts(self, held, candidates):
+        """Boolean (candidates × rules): violations each candidate would add for the user"""
+        access = np.bitwise_or.reduce(self.role_bits[held], axis=0) if len(held) else \
+            np.zeros(self.engine.n_words, dtype=np.uint64)
+        before = self.engine.check(access[None, :])[0]
+        after = self.engine.check(self.role_bits[candidates] | access[None, :])
+        return after & ~before
+
+    def top_k(self, user_id, k=5):
+        """
+        Top-k roles for `user_id` that create no new SoD violation, as arrays.
+
+        Returns:
+            (scores, picks, withheld, conflicts): scores of every role, the
+            picked role indices best first, the higher-scoring candidates
+            screened out, and their (withheld × rules) new-violation matrix
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        u = self.user_index.get(user_id, -1)
+        held = self.matrix.row(u) if u >= 0 else self.matrix.indices[:0]
+        scores = self.scores(held)
+        scores[held] = 0
+        candidates = np.flatnonzero(scores > 0)
+
+        if self.engine is not None and len(candidates):
+            conflicts = self.new_conflicts(held, candidates)
+        else:
+            conflicts = np.zeros((len(candidates), 0), dtype=bool)
+        blocked = conflicts.any(axis=1)
+
+        picks = candidates[~blocked]
+        if len(picks) > k:
+            picks = picks[np.argpartition(-scores[picks], k - 1)[:k]]
+        picks = picks[np.argsort(-scores[picks], kind='stable')]
+
+        cutoff = scores[picks[-1]] if len(picks) == k else 0
+        above = np.flatnonzero(blocked & (scores[candidates] > cutoff))
+        above = above[np.argsort(-scores[candidates[above]], kind='stable')]
+        return scores, picks, candidates[above], conflicts[above]
+
+    def recommend(self, user_id, k=5):
+        """
+        Returns:
+            (picks, withheld): picks has 'Role' and 'Score' columns; withheld
+            lists higher-scoring candidates screened out, with the rules they
+            would break
+        """
+        scores, picks, withheld, conflicts = self.top_k(user_id, k)
+        rule_ids = np.array(self.engine.rule_ids if self.engine is not None else [], dtype=object)
+        return (
+            pd.DataFrame({'Role': self.role_names[picks], 'Score': scores[picks]}),
+            pd.DataFrame({
+                'Role': self.role_names[withheld],
+                'Score': scores[withheld],
+                'Conflicts': [', '.join(rule_ids[row]) for row in conflicts],
+            }),
+        )
+
+    def nbytes(self):
+        return (self.matrix.indptr.nbytes + self.matrix.indices.nbytes
+                + self.neighbors.nbytes + self.weights.nbytes)
+
+
+# ============================================================================
+# SYNTHETIC ROLE LANDSCAPE
+# ============================================================================
+
+def generate_role_landscape(rules, n_users, n_roles, roles_per_user=6, roles_per_department=25, seed=None):
+    """
+    Large synthetic user → role and role → T-code tables for benchmarking.
+
+    Roles are grouped into departments; each department draws its T-codes
+    from a handful of SoD rules plus display transactions, so some role
+    combinations conflict. Users hold mostly their department's roles, with
+    per-department popularity skew, so co-occurrence carries signal.
+
+    Returns:
+        (user_roles, role_tcodes) DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    n_departments = max(1, n_roles // roles_per_department)
+    department = np.arange(n_roles) % n_departments
+    role_names = np.array([f"Z_D{d:03d}_{i:05d}" for i, d in enumerate(department)])
+
+    rule_tcodes = [list(rule[3]) + list(rule[4]) for rule in rules]
+    rows = []
+    for d in range(n_departments):
+        pool = [t for r in rng.choice(len(rules), 3, replace=False) for t in rule_tcodes[r]]
+        pool += [f"ZD{d:03d}_{j:02d}" for j in range(10)]
+        for role in np.flatnonzero(department == d):
+            rows.extend((role_names[role], t) for t in rng.choice(pool, rng.integers(2, 6), replace=False))
+    role_tcodes = pd.DataFrame(rows, columns=['Role', 'T-code'])
+
+    dept_roles = [np.flatnonzero(department == d) for d in range(n_departments)]
+    # Zipf-like popularity within each department
+    dept_weights = [1 / np.arange(1, len(r) + 1) ** 1.1 for r in dept_roles]
+    dept_weights = [w / w.sum() for w in dept_weights]
+
+    user_dept = rng.integers(n_departments, size=n_users)
+    n_held = np.maximum(1, rng.poisson(roles_per_user, n_users))
+    user_idx = np.repeat(np.arange(n_users), n_held)
+    dept = user_dept[user_idx]
+    crossed = rng.random(len(user_idx)) < 0.1
+    dept[crossed] = rng.integers(n_departments, size=int(crossed.sum()))
+    picks = np.empty(len(user_idx), dtype=np.int64)
+    for d in range(n_departments):
+        sel = np.flatnonzero(dept == d)
+        picks[sel] = rng.choice(dept_roles[d], len(sel), p=dept_weights[d])
+
+    user_ids = sap_user_ids(n_users, rng)
+    pairs = np.unique(user_idx * n_roles + picks)
+    user_roles = pd.DataFrame({'User ID': user_ids[pairs // n_roles], 'Role': role_names[pairs % n_roles]})
+    return user_roles, role_tcodes
@@ -0,0 +1,341 @@
+"""
+Headless Fleet Scoring
+Nightly batch scoring of PdM telemetry archives without the Streamlit UI
+
+Reads CSV / Parquet files in bounded chunks, drops idling readings (RPM < 700),
+builds rolling features, scores them with the autoencoder and writes:
+
+    <out>/alerts.csv          bus_id, timestamp, score of every reading above the threshold
+    <out>/daily_rollups.csv   bus_id, day, max score, alert count, reading count
+    <out>/scores/<file>/      per-bus scores (columnar sensor store, memory-mapped in pass 2)
+
+Pass 1 fans the files out over a process pool; each worker streams its file and
+returns a t-digest of its scores. The merged digest gives the fleet-wide
+percentile threshold without gathering every score, and pass 2 streams the
+stored scores once more to write alerts and rollups.
+
+A bus's history may be spread over several files (e.g. archives split per
+day). Workers score files independently, so between the passes each bus's
+files are ordered by time and its first `window - 1` readings in every file are
+rescored with the rolling tail of its previous file, so the scores match
+scoring each bus's whole history at once. Within a file a bus's readings must
+be in time order, and a bus's files must not overlap.
+
+Usage:
+    python score_fleet.py archive/*.csv --out results [--model ae.npz] [--percentile 95] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from aggregates import DailyRollup
+from autoencoder import AutoencoderScorer
+from features import ChunkedFeatureExtractor
+from quantiles import TDigest
+from sensor_store import SensorStore
+from telemetry import IDLE_RPM, NORMAL_SCORE_LIMIT, SENSOR_NAMES
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Readings used to fit a reference model when no --model is given
+REFERENCE_ROWS = 50_000
+
+_SUFFIXES = ('.csv', '.csv.gz', '.parquet', '.pq')
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def find_inputs(paths):
+    """Expand directories into their CSV / Parquet files (sorted)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(_SUFFIXES)))
+        else:
+            files.append(path)
+    return files
+
+
+def read_chunks(path, columns, chunk_rows):
+    """Yield DataFrames of at most `chunk_rows` rows with only `columns` (if present)"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet needs pyarrow: pip install pyarrow") from None
+        parquet = pq.ParquetFile(path)
+        available = [c for c in columns if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=available):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        available = [c for c in columns if c in header]
+        yield from pd.read_csv(path, usecols=available, chunksize=chunk_rows)
+
+
+def _prepare(chunk, bus_column, default_bus):
+    """Idle filter, bus column and parsed timestamps"""
+    chunk = chunk[chunk['RPM'] >= IDLE_RPM]
+    if bus_column not in chunk:
+        chunk = chunk.assign(**{bus_column: default_bus})
+    return chunk.assign(timestamp=pd.to_datetime(chunk['timestamp']))
+
+
+def _file_bus(path):
+    name = os.path.basename(path)
+    for suffix in _SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+# ============================================================================
+# PASS 1: SCORE (one worker per file)
+# ============================================================================
+
+def score_file(task):
+    """
+    Stream one file: idle filter → features → autoencoder scores → score store.
+
+    The feature windows start empty: nothing carries over from other files.
+
+    Each bus's first `window - 1` readings lack the tail of its previous file:
+    they are kept out of the digest and returned for stitch_files to rescore.
+
+    Returns:
+        (path, rows_read, rows_scored, digest, segments) where segments maps
+        bus_id → first / last timestamp, row count and the head / tail readings
+    """
+    path, scorer, store_root, bus_column, chunk_rows = task
+    extractor = ChunkedFeatureExtractor()
+    n_head = extractor.window - 1
+    store = SensorStore(store_root)
+    segments = {}
+    digest = TDigest()
+    rows_read = rows_scored = 0
+
+    for chunk in read_chunks(path, ['timestamp', bus_column, *SENSOR_NAMES], chunk_rows):
+        rows_read += len(chunk)
+        chunk = _prepare(chunk, bus_column, _file_bus(path))
+        for bus_id, rows in chunk.groupby(bus_column, sort=False):
+            bus_id = str(bus_id)
+            values = rows[SENSOR_NAMES].to_numpy(np.float64)
+            timestamps = rows['timestamp'].to_numpy()
+            scores = scorer.score(extractor.transform(bus_id, values))
+            out = pd.DataFrame({'timestamp': timestamps, 'Anomaly Score': scores})
+            segment = segments.get(bus_id)
+            if segment is None:
+                store.write_bus(bus_id, out, attrs={'source': os.path.abspath(path)})
+                segment = segments[bus_id] = {'first': timestamps[0], 'rows': 0, 'head': values[:0]}
+            else:
+                store.append(bus_id, out)
+            head = max(0, min(len(values), n_head - segment['rows']))
+            segment['head'] = np.concatenate([segment['head'], values[:head]])
+            segment['rows'] += len(values)
+            segment['last'] = timestamps[-1]
+            digest.update(scores[head:])
+            rows_scored += len(rows)
+    for bus_id, segment in segments.items():
+        segment['tail'] = extractor.tail(bus_id)
+    return path, rows_read, rows_scored, digest, segments
+
+
+def stitch_files(results, store_roots, scorer):
+    """
+    Order each bus's files by time and rescore its head readings in each file
+    with the rolling tail of the file before it.
+
+    Returns:
+        (digest, order): t-digest of every head score (as rescored), and
+        bus_id → its store roots in time order
+    """
+    by_bus = {}
+    for root, (path, _, _, _, segments) in zip(store_roots, results):
+        for bus_id, segment in segments.items():
+            by_bus.setdefault(bus_id, []).append((path, root, segment))
+
+    digest = TDigest()
+    order = {}
+    for bus_id, parts in by_bus.items():
+        parts.sort(key=lambda part: part[2]['first'])
+        for (prev_path, _, prev), (path, _, segment) in zip(parts, parts[1:]):
+            if segment['first'] <= prev['last']:
+                raise ValueError(f"Bus {bus_id}: {path} starts at {pd.Timestamp(segment['first'])}, before the end "
+                                 f"of {prev_path} ({pd.Timestamp(prev['last'])}); a bus's files must not overlap")
+        extractor = ChunkedFeatureExtractor()
+        for i, (_, root, segment) in enumerate(parts):
+            scores = scorer.score(extractor.transform(bus_id, segment['head']))
+            if i:
+                # The first file's head is the start of the history and already scored that way
+                SensorStore(root).overwrite(bus_id, 'Anomaly Score', scores)
+            digest.update(scores)
+            # In a short file the tail starts inside the head; carry only what follows it
+            tail = segment['tail']
+            extractor.carry(bus_id, tail[max(0, len(segment['head']) + len(tail) - segment['rows']):])
+        order[bus_id] = [root for _, root, _ in parts]
+    return digest, order
+
+
+def fit_reference_model(path, bus_column, max_rows=REFERENCE_ROWS):
+    """
+    Reference autoencoder (PCA-equivalent weights) from the first readings of a file.
+
+    Without labels, readings of the lowest-error 80% under a first fit stand in
+    for normal operation.
+    """
+    extractor = ChunkedFeatureExtractor()
+    chunk = next(read_chunks(path, ['timestamp', bus_column, 'Anomaly Score', *SENSOR_NAMES], max_rows))
+    chunk = _prepare(chunk, bus_column, _file_bus(path))
+    blocks = []
+    for bus_id, rows in chunk.groupby(bus_column, sort=False):
+        features = extractor.transform(str(bus_id), rows[SENSOR_NAMES].to_numpy(np.float64))
+        if 'Anomaly Score' in rows:
+            # Labelled archive (e.g. exported demo data): keep its normal readings
+            features = features[rows['Anomaly Score'].to_numpy() < NORMAL_SCORE_LIMIT]
+        blocks.append(features)
+    features = np.concatenate(blocks)
+    scorer = AutoencoderScorer.from_pca(features)
+    errors = scorer.score(features)
+    return AutoencoderScorer.from_pca(features[errors <= np.percentile(errors, 80)])
+
+
+# ============================================================================
+# PASS 2: ALERTS AND ROLLUPS
+# ============================================================================
+
+def write_outputs(order, threshold, out_dir):
+    """
+    Stream the stored scores once: alerts above `threshold` and daily rollups.
+
+    Args:
+        order: bus_id → store roots holding its scores, in time order (the
+            rollup only folds readings newer than those it has seen)
+    """
+    rollup = DailyRollup()
+    n_alerts = 0
+    alerts_path = os.path.join(out_dir, 'alerts.csv')
+    with open(alerts_path, 'w', encoding='utf-8', newline='') as f:
+        f.write('bus_id,timestamp,score\n')
+        for bus_id, roots in order.items():
+            for root in roots:
+                columns = SensorStore(root).open_columns(bus_id)
+                timestamps, scores = columns['timestamp'], columns['Anomaly Score']
+                alerts = scores > threshold
+                rollup.update(bus_id, timestamps, scores, alerts)
+                rows = np.flatnonzero(alerts)
+                n_alerts += len(rows)
+                if len(rows):
+                    pd.DataFrame({
+                        'bus_id': bus_id, 'timestamp': timestamps[rows], 'score': scores[rows],
+                    }).to_csv(f, header=False, index=False)
+
+    bus_ids = sorted(rollup.bus_ids)
+    with open(os.path.join(out_dir, 'daily_rollups.csv'), 'w', encoding='utf-8', newline='') as f:
+        f.write('bus_id,day,max_score,alerts,readings\n')
+        if bus_ids:
+            maxima, days = rollup.matrix(bus_ids, 'max')
+            alerts, _ = rollup.matrix(bus_ids, 'alerts')
+            counts, _ = rollup.matrix(bus_ids, 'count')
+            bus_idx, day_idx = np.nonzero(~np.isnan(counts))
+            pd.DataFrame({
+                'bus_id': np.asarray(bus_ids)[bus_idx],
+                'day': days[day_idx],
+                'max_score': maxima[bus_idx, day_idx],
+                'alerts': alerts[bus_idx, day_idx].astype(np.int64),
+                'readings': counts[bus_idx, day_idx].astype(np.int64),
+            }).to_csv(f, header=False, index=False)
+    return n_alerts, len(bus_ids)
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (finished) workers, in MB"""
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 / 1024 if sys.platform != 'darwin' else 1 / 1024 ** 2
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='CSV / Parquet files or directories')
+    parser.add_argument('--out', required=True, help='Output directory')
+    parser.add_argument('--model', help='Autoencoder weights (.npz, see AutoencoderScorer.load); '
+                                        'default: reference model fitted on the first file')
+    parser.add_argument('--percentile', type=float, default=95.0, help='Fleet-wide alert percentile')
+    parser.add_argument('--threshold', type=float, help='Fixed alert threshold (overrides --percentile)')
+    parser.add_argument('--bus-column', default='bus_id',
+                        help='Column holding the bus ID (default: file name when the column is missing)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    files = find_inputs(args.inputs)
+    if not files:
+        parser.error("no CSV / Parquet inputs found")
+    os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    scorer = AutoencoderScorer.load(args.model) if args.model else fit_reference_model(files[0], args.bus_column)
+    store_roots = [os.path.join(args.out, 'scores', f'{i:04d}_{_file_bus(path)}') for i, path in enumerate(files)]
+    tasks = [(path, scorer, root, args.bus_column, args.chunk_rows) for path, root in zip(files, store_roots)]
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(tasks)))
+
+    if workers == 1:
+        results = list(map(score_file, tasks))
+    else:
+        # spawn: workers start clean instead of inheriting the parent's memory
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            results = list(pool.map(score_file, tasks))
+
+    rows_read = sum(r[1] for r in results)
+    rows_scored = sum(r[2] for r in results)
+    head_digest, order = stitch_files(results, store_roots, scorer)
+    digest = TDigest.merge_all([r[3] for r in results] + [head_digest])
+    threshold = args.threshold if args.threshold is not None else float(digest.percentile(args.percentile))
+    n_alerts, n_buses = write_outputs(order, threshold, args.out)
+    seconds = time.perf_counter() - started
+
+    summary = {
+        'files': len(files),
+        'workers': workers,
+        'buses': n_buses,
+        'rows_read': rows_read,
+        'rows_scored': rows_scored,
+        'idle_rows_dropped': rows_read - rows_scored,
+        'threshold': threshold,
+        'alerts': n_alerts,
+        'seconds': seconds,
+        'score_digest': digest.to_dict(),
+    }
+    with open(os.path.join(args.out, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=1)
+
+    own_rss, worker_rss = peak_rss_mb()
+    print(f"Scored {rows_scored:,} of {rows_read:,} rows ({rows_read - rows_scored:,} idle) "
+          f"from {len(files)} file(s), {n_buses} bus(es), on {workers} worker(s)")
+    print(f"Threshold {threshold:.4f} → {n_alerts:,} alerts")
+    print(f"{seconds:.2f} s · {rows_read / seconds:,.0f} rows/s")
+    if workers > 1:
+        print(f"Peak RSS: {own_rss:,.0f} MB (main), {worker_rss:,.0f} MB (largest worker)")
+    else:
+        print(f"Peak RSS: {own_rss:,.0f} MB (scored in the main process)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Columnar Sensor Store
+Per-bus partitions of PdM telemetry on disk, read back through np.memmap without copying
+
+Layout:
+    <root>/<bus_id>/meta.json          row count, column specs, generator attributes
+    <root>/<bus_id>/<column>.<ext>     one contiguous array per column
+
+Timestamps are stored sorted as datetime64[ns] (int64), sensors and scores as
+float32, flags as bool and categoricals as int8 codes (categories in meta.json).
+"""
+
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# COLUMN ENCODING
+# ============================================================================
+
+STORE_VERSION = 1
+TIMESTAMP_COL = 'timestamp'
+
+_KIND_DTYPES = {
+    'timestamp': np.dtype('datetime64[ns]'),
+    'float': np.dtype('float32'),
+    'bool': np.dtype('bool'),
+    'category': np.dtype('int8'),
+}
+
+
+def _column_file(name):
+    return re.sub(r'[^0-9a-z]+', '_', name.lower()).strip('_') + '.bin'
+
+
+def _encode(series):
+    """Map a DataFrame column to (kind, ndarray, extra meta)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category', series.cat.codes.to_numpy(np.int8), {'categories': list(series.cat.categories)}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'timestamp', series.to_numpy('datetime64[ns]'), {}
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool', series.to_numpy(bool), {}
+    return 'float', series.to_numpy(np.float32), {}
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class SensorStore:
+    """
+    Directory of per-bus columnar partitions.
+
+    Example:
+        store = SensorStore('data/sensor_store')
+        store.write_bus('WA7230M', df, attrs={'seed': 42})
+        history = store.open_bus('WA7230M')          # memmap-backed, no copy
+        window = store.open_bus('WA7230M', start='2025-01-01', end='2025-02-01')
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _bus_dir(self, bus_id):
+        return os.path.join(self.root, str(bus_id))
+
+    def bus_ids(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, d, 'meta.json')))
+
+    def meta(self, bus_id):
+        """Partition metadata, or None if the bus is not stored"""
+        path = os.path.join(self._bus_dir(bus_id), 'meta.json')
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def has_bus(self, bus_id, attrs=None):
+        """True if the bus is stored (and, if given, was written with these attrs; extra stored attrs are ignored)"""
+        meta = self.meta(bus_id)
+        if meta is None or meta.get('version') != STORE_VERSION:
+            return False
+        stored = meta.get('attrs', {})
+        return attrs is None or all(k in stored and stored[k] == v for k, v in attrs.items())
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write_bus(self, bus_id, df, attrs=None):
+        """
+        Write (or replace) a bus partition from a DataFrame sorted by timestamp.
+
+        The partition is built in a temporary directory and swapped in, so
+        readers never see a half-written bus.
+        """
+        timestamps = df[TIMESTAMP_COL].to_numpy('datetime64[ns]')
+        if len(timestamps) > 1 and (np.diff(timestamps.view(np.int64)) < 0).any():
+            raise ValueError(f"Bus {bus_id}: timestamps must be sorted ascending")
+
+        final_dir = self._bus_dir(bus_id)
+        tmp_dir = final_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns = []
+        for name in df.columns:
+            kind, values, extra = _encode(df[name])
+            filename = _column_file(name)
+            np.ascontiguousarray(values, dtype=_KIND_DTYPES[kind]).tofile(os.path.join(tmp_dir, filename))
+            columns.append({'name': name, 'file': filename, 'kind': kind, **extra})
+
+        meta = {'version': STORE_VERSION, 'n_rows': len(df), 'columns': columns, 'attrs': attrs or {}}
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+
+    def append(self, bus_id, df):
+        """
+        Append newer rows to an existing partition (same columns, later timestamps).
+
+        Column files are extended in place and meta.json is rewritten last.
+        """
+        meta = self.meta(bus_id)
+        if meta is None:
+            raise KeyError(f"Bus {bus_id} is not in the store")
+        if len(df) == 0:
+            return
+        bus_dir = self._bus_dir(bus_id)
+        if meta['n_rows']:
+            last = self._memmap(bus_dir, meta, TIMESTAMP_COL)[-1]
+            if df[TIMESTAMP_COL].to_numpy('datetime64[ns]')[0] < last:
+                raise ValueError(f"Bus {bus_id}: appended rows must be newer than {last}")
+
+        for col in meta['columns']:
+            kind, values, extra = _encode(df[col['name']])
+            if kind == 'category' and extra['categories'] != col['categories']:
+                values = pd.Categorical(df[col['name']], categories=col['categories']).codes
+            with open(os.path.join(bus_dir, col['file']), 'ab') as f:
+                np.ascontiguousarray(values, dtype=_KIND_DTYPES[col['kind']]).tofile(f)
+
+        meta['n_rows'] += len(df)
+        with open(os.path.join(bus_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+
+    def overwrite(self, bus_id, name, values, start=0):
+        """Overwrite rows [start, start + len(values)) of a numeric column in place"""
+        meta = self.meta(bus_id)
+        if meta is None:
+            raise KeyError(f"Bus {bus_id} is not in the store")
+        col = next(c for c in meta['columns'] if c['name'] == name)
+        if col['kind'] == 'category':
+            raise ValueError(f"Column {name!r} is categorical; rewrite the bus instead")
+        if start < 0 or start + len(values) > meta['n_rows']:
+            raise IndexError(f"Rows {start}:{start + len(values)} are outside bus {bus_id} ({meta['n_rows']} rows)")
+        if len(values) == 0:
+            return
+        out = np.memmap(os.path.join(self._bus_dir(bus_id), col['file']), dtype=_KIND_DTYPES[col['kind']],
+                        mode='r+', shape=(meta['n_rows'],))
+        out[start:start + len(values)] = values
+        out.flush()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _memmap(bus_dir, meta, name):
+        col = next(c for c in meta['columns'] if c['name'] == name)
+        dtype = _KIND_DTYPES[col['kind']]
+        if meta['n_rows'] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(bus_dir, col['file']), dtype=dtype, mode='r', shape=(meta['n_rows'],))
+
+    def row_range(self, bus_id, start=None, end=None):
+        """[lo, hi) row indices covering start <= timestamp < end (binary search)"""
+        meta = self.meta(bus_id)
+        ts = self._memmap(self._bus_dir(bus_id), meta, TIMESTAMP_COL)
+        lo = 0 if start is None else int(np.searchsorted(ts, np.datetime64(pd.Timestamp(start), 'ns'), 'left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, np.datetime64(pd.Timestamp(end), 'ns'), 'left'))
+        return lo, hi
+
+    def open_columns(self, bus_id, columns=None, start=None, end=None):
+        """Dict of read-only memmap slices, one per requested column"""
+        meta = self.meta(bus_id)
+        if meta is None:
+            raise KeyError(f"Bus {bus_id} is not in the store")
+        bus_dir = self._bus_dir(bus_id)
+        names = [c['name'] for c in meta['columns']] if columns is None else list(columns)
+        lo, hi = self.row_range(bus_id, start, end) if (start is not None or end is not None) else (0, meta['n_rows'])
+        return {name: self._memmap(bus_dir, meta, name)[lo:hi] for name in names}
+
+    def open_bus(self, bus_id, columns=None, start=None, end=None):
+        """
+        DataFrame view of a bus partition.
+
+        Numeric columns wrap the memmaps directly (copy=False), so opening a bus
+        costs no heap memory beyond the small categorical codes.
+        """
+        meta = self.meta(bus_id)
+        arrays = self.open_columns(bus_id, columns, start, end)
+        specs = {c['name']: c for c in meta['columns']}
+        data = {}
+        for name, values in arrays.items():
+            spec = specs[name]
+            if spec['kind'] == 'category':
+                data[name] = pd.Categorical.from_codes(np.asarray(values), categories=spec['categories'])
+            else:
+                data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def nbytes(self, bus_id=None):
+        """On-disk size of one bus (or the whole store)"""
+        buses = self.bus_ids() if bus_id is None else [bus_id]
+        total = 0
+        for bus in buses:
+            bus_dir = self._bus_dir(bus)
+            total += sum(os.path.getsize(os.path.join(bus_dir, f)) for f in os.listdir(bus_dir))
+        return total
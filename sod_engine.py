@@ -0,0 +1,412 @@
+"""
+Segregation of Duties Engine
+Bitset SoD rule checks over user → role → T-code assignments
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# BITSETS
+# ============================================================================
+
+_WORD_BITS = 64
+
+
+def _n_words(n_bits):
+    return max(1, -(-n_bits // _WORD_BITS))
+
+
+def _bitsets(rows, bits, n_rows, n_words):
+    """(n_rows × n_words) uint64 bitsets with bit `bits[i]` set in row `rows[i]`"""
+    out = np.zeros((n_rows, n_words), dtype=np.uint64)
+    bits = np.asarray(bits, dtype=np.int64)
+    np.bitwise_or.at(out, (np.asarray(rows, dtype=np.int64), bits // _WORD_BITS),
+                     np.left_shift(np.uint64(1), (bits % _WORD_BITS).astype(np.uint64)))
+    return out
+
+
+def _or_by_group(groups, bitsets, n_groups):
+    """OR of the bitset rows sharing a group id; groups without rows stay empty"""
+    out = np.zeros((n_groups, bitsets.shape[1]), dtype=np.uint64)
+    if len(groups) == 0:
+        return out
+    order = np.argsort(groups, kind='stable')
+    groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    out[groups[starts]] = np.bitwise_or.reduceat(bitsets[order], starts, axis=0)
+    return out
+
+
+# ============================================================================
+# RULE ENGINE
+# ============================================================================
+
+class SodEngine:
+    """
+    SoD rules compiled to T-code bitsets.
+
+    Each rule is `(rule_id, "Function 1 vs Function 2", risk, tcodes_1, tcodes_2)`.
+    Only T-codes named by some rule get a bit, so a user's effective access is
+    a couple of uint64 words: the OR of the bitsets of the user's roles. A user
+    violates a rule when their access intersects both functions' masks, which
+    is tested for every user × rule at once with word-wise ANDs.
+
+    Example:
+        engine = SodEngine(DEMO_CONFIG['sod']['rules'])
+        violations = engine.violations(user_roles, role_tcodes)
+    """
+
+    def __init__(self, rules):
+        self.rules = [tuple(rule) for rule in rules]
+        self.rule_ids = [rule[0] for rule in self.rules]
+        self.tcodes = sorted({t for rule in self.rules for t in (*rule[3], *rule[4])})
+        self.tcode_index = pd.Index(self.tcodes)
+        self.n_words = _n_words(len(self.tcodes))
+        self.function_1 = self._masks([rule[3] for rule in self.rules])
+        self.function_2 = self._masks([rule[4] for rule in self.rules])
+        self.rule_table = pd.DataFrame(
+            [(rid, desc, risk, *desc.split(' vs ')) for rid, desc, risk, *_ in self.rules],
+            columns=['Rule ID', 'Description', 'Risk Level', 'Function 1', 'Function 2'],
+        )
+
+    def _masks(self, tcode_sets):
+        rows = np.repeat(np.arange(len(tcode_sets)), [len(s) for s in tcode_sets])
+        bits = self.tcode_index.get_indexer([t for s in tcode_sets for t in s])
+        return _bitsets(rows, bits, len(tcode_sets), self.n_words)
+
+    @property
+    def n_rules(self):
+        return len(self.rules)
+
+    def role_bits(self, role_tcodes):
+        """
+        Args:
+            role_tcodes: DataFrame with 'Role' and 'T-code' columns
+
+        Returns:
+            (roles, bits): role names and their (roles × words) T-code bitsets
+        """
+        role_codes, roles = pd.factorize(role_tcodes['Role'])
+        bits = self.tcode_index.get_indexer(role_tcodes['T-code'])
+        relevant = bits >= 0  # T-codes no rule mentions cannot cause a conflict
+        return roles, _bitsets(role_codes[relevant], bits[relevant], len(roles), self.n_words)
+
+    def user_bits(self, user_roles, roles, role_bits):
+        """
+        Args:
+            user_roles: DataFrame with 'User ID' and 'Role' columns
+            roles, role_bits: output of `role_bits`
+
+        Returns:
+            (users, bits): user IDs and their effective access bitsets
+        """
+        user_codes, users = pd.factorize(user_roles['User ID'])
+        role_codes = pd.Index(roles).get_indexer(user_roles['Role'])
+        known = role_codes >= 0
+        return users, _or_by_group(user_codes[known], role_bits[role_codes[known]], len(users))
+
+    def check(self, user_bits, rules=None):
+        """
+        Boolean (users × rules) matrix of violations for the given access bitsets.
+
+        Args:
+            rules: Rule indices to test (default: all rules, in order)
+        """
+        function_1 = self.function_1 if rules is None else self.function_1[rules]
+        function_2 = self.function_2 if rules is None else self.function_2[rules]
+        hits_1 = np.zeros((len(user_bits), len(function_1)), dtype=bool)
+        hits_2 = np.zeros_like(hits_1)
+        for w in range(self.n_words):
+            word = user_bits[:, w, None]
+            hits_1 |= (word & function_1[None, :, w]) != 0
+            hits_2 |= (word & function_2[None, :, w]) != 0
+        return hits_1 & hits_2
+
+    def evaluate(self, user_roles, role_tcodes):
+        """Users and their (users × rules) violation matrix"""
+        roles, role_bits = self.role_bits(role_tcodes)
+        users, user_bits = self.user_bits(user_roles, roles, role_bits)
+        return users, self.check(user_bits)
+
+    def violations(self, user_roles, role_tcodes):
+        """One row per (user, rule) violation"""
+        users, hits = self.evaluate(user_roles, role_tcodes)
+        user_idx, rule_idx = np.nonzero(hits)
+        return self.frame(np.asarray(users)[user_idx], rule_idx)
+
+    def frame(self, users, rule_idx):
+        """Violation table for parallel arrays of user IDs and rule indices"""
+        out = self.rule_table.iloc[np.asarray(rule_idx, dtype=np.int64)].reset_index(drop=True)
+        out.insert(0, 'User ID', np.asarray(users))
+        return out
+
+
+# ============================================================================
+# INCREMENTAL RE-EVALUATION
+# ============================================================================
+
+_NO_RULES = np.zeros(0, dtype=np.int64)
+
+
+class IncrementalSodEngine:
+    """
+    Live SoD state that follows a stream of access changes.
+
+    Keeps every user's roles and access bitset, a reverse index from role to
+    users and from T-code bit to the rules that mention it. A change only
+    re-tests the users it reaches against the rules its T-codes take part in:
+    one user for a role grant / revoke, the role's holders for a T-code added
+    to / removed from a role. Each change returns the violations it added and
+    resolved as lists of (user_id, rule_id), and `risk_counts` is kept up to
+    date from those deltas.
+
+    Example:
+        live = IncrementalSodEngine(SodEngine(rules), user_roles, role_tcodes)
+        added, resolved = live.grant('JSMITH42', 'Z_AP_PAY_VENDOR')
+    """
+
+    def __init__(self, engine, user_roles, role_tcodes):
+        self.engine = engine
+        roles, self.role_bits = engine.role_bits(role_tcodes)
+        users, self.user_bits = engine.user_bits(user_roles, roles, self.role_bits)
+        self.hits = engine.check(self.user_bits)
+
+        self.roles = list(roles)
+        self.role_index = {role: i for i, role in enumerate(self.roles)}
+        self.users = list(users)
+        self.user_index = {user: i for i, user in enumerate(self.users)}
+
+        tcode_rows = engine.tcode_index.get_indexer(role_tcodes['T-code'])
+        self.role_tcodes = [set() for _ in self.roles]
+        for role, bit in zip(role_tcodes['Role'], tcode_rows):
+            if bit >= 0:
+                self.role_tcodes[self.role_index[role]].add(int(bit))
+
+        self.user_roles = [set() for _ in self.users]
+        self.role_users = [set() for _ in self.roles]
+        for user, role in zip(user_roles['User ID'], user_roles['Role']):
+            if role in self.role_index:
+                u, r = self.user_index[user], self.role_index[role]
+                self.user_roles[u].add(r)
+                self.role_users[r].add(u)
+
+        rule_bits = [[] for _ in engine.tcodes]
+        for k, rule in enumerate(engine.rules):
+            for bit in set(engine.tcode_index.get_indexer([*rule[3], *rule[4]])):
+                rule_bits[bit].append(k)
+        self.tcode_rules = [np.array(rules, dtype=np.int64) for rules in rule_bits]
+
+        risks = np.array([rule[2] for rule in engine.rules])
+        self.risk_counts = {risk: 0 for risk in dict.fromkeys(risks)}
+        for risk, count in zip(risks, self.hits.sum(axis=0)):
+            self.risk_counts[risk] += int(count)
+
+    # ------------------------------------------------------------------
+    # Changes
+    # ------------------------------------------------------------------
+
+    def grant(self, user_id, role):
+        """Assign `role` to `user_id`; returns (added, resolved) violations"""
+        u, r = self._user(user_id), self._role(role)
+        if r in self.user_roles[u]:
+            return self._delta()
+        self.user_roles[u].add(r)
+        self.role_users[r].add(u)
+        self.user_bits[u] |= self.role_bits[r]
+        return self._reevaluate([u], self.role_tcodes[r])
+
+    def revoke(self, user_id, role):
+        """Remove `role` from `user_id`; returns (added, resolved) violations"""
+        u, r = self.user_index.get(user_id), self.role_index.get(role)
+        if u is None or r is None or r not in self.user_roles[u]:
+            return self._delta()
+        self.user_roles[u].discard(r)
+        self.role_users[r].discard(u)
+        self._refresh_users([u])
+        return self._reevaluate([u], self.role_tcodes[r])
+
+    def grant_tcode(self, role, tcode):
+        """Add `tcode` to `role` for all of its holders; returns (added, resolved)"""
+        r, bit = self._role(role), self._bit(tcode)
+        if bit is None or bit in self.role_tcodes[r]:
+            return self._delta()
+        self.role_tcodes[r].add(bit)
+        self.role_bits[r] = self._tcode_bits(self.role_tcodes[r])
+        holders = list(self.role_users[r])
+        self.user_bits[holders] |= self.role_bits[r]
+        return self._reevaluate(holders, [bit])
+
+    def revoke_tcode(self, role, tcode):
+        """Remove `tcode` from `role` for all of its holders; returns (added, resolved)"""
+        r, bit = self.role_index.get(role), self._bit(tcode)
+        if r is None or bit is None or bit not in self.role_tcodes[r]:
+            return self._delta()
+        self.role_tcodes[r].discard(bit)
+        self.role_bits[r] = self._tcode_bits(self.role_tcodes[r])
+        holders = list(self.role_users[r])
+        self._refresh_users(holders)
+        return self._reevaluate(holders, [bit])
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def violations(self):
+        """Current violations, one row per (user, rule)"""
+        user_idx, rule_idx = np.nonzero(self.hits)
+        return self.engine.frame(np.asarray(self.users, dtype=object)[user_idx], rule_idx)
+
+    def roles_of(self, user_id):
+        u = self.user_index.get(user_id)
+        return sorted(self.roles[r] for r in self.user_roles[u]) if u is not None else []
+
+    def assignments(self):
+        """Current (user_roles, role_tcodes) tables; role_tcodes keeps only T-codes the rules use"""
+        user_roles = pd.DataFrame(
+            [(user, self.roles[r]) for user, held in zip(self.users, self.user_roles) for r in sorted(held)],
+            columns=['User ID', 'Role'],
+        )
+        role_tcodes = pd.DataFrame(
+            [(role, self.engine.tcodes[b]) for role, bits in zip(self.roles, self.role_tcodes) for b in sorted(bits)],
+            columns=['Role', 'T-code'],
+        )
+        return user_roles, role_tcodes
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _user(self, user_id):
+        if user_id not in self.user_index:
+            self.user_index[user_id] = len(self.users)
+            self.users.append(user_id)
+            self.user_roles.append(set())
+            self.user_bits = np.vstack([self.user_bits, np.zeros((1, self.engine.n_words), dtype=np.uint64)])
+            self.hits = np.vstack([self.hits, np.zeros((1, self.engine.n_rules), dtype=bool)])
+        return self.user_index[user_id]
+
+    def _role(self, role):
+        if role not in self.role_index:
+            self.role_index[role] = len(self.roles)
+            self.roles.append(role)
+            self.role_tcodes.append(set())
+            self.role_users.append(set())
+            self.role_bits = np.vstack([self.role_bits, np.zeros((1, self.engine.n_words), dtype=np.uint64)])
+        return self.role_index[role]
+
+    def _bit(self, tcode):
+        bit = self.engine.tcode_index.get_indexer([tcode])[0]
+        return int(bit) if bit >= 0 else None  # T-codes outside every rule cannot conflict
+
+    def _tcode_bits(self, bits):
+        return _bitsets(np.zeros(len(bits), dtype=np.int64), sorted(bits), 1, self.engine.n_words)[0]
+
+    def _refresh_users(self, users):
+        """Rebuild the access bitsets of `users` from their remaining roles"""
+        groups = np.repeat(np.arange(len(users)), [len(self.user_roles[u]) for u in users])
+        roles = np.fromiter((r for u in users for r in self.user_roles[u]), dtype=np.int64, count=len(groups))
+        self.user_bits[users] = _or_by_group(groups, self.role_bits[roles], len(users))
+
+    def _reevaluate(self, users, bits):
+        rules = np.unique(np.concatenate([self.tcode_rules[b] for b in bits])) if len(bits) else _NO_RULES
+        if len(users) == 0 or len(rules) == 0:
+            return self._delta()
+        users = np.asarray(users, dtype=np.int64)
+        block = np.ix_(users, rules)
+        before = self.hits[block]
+        after = self.engine.check(self.user_bits[users], rules)
+        self.hits[block] = after
+
+        added = np.nonzero(after & ~before)
+        resolved = np.nonzero(before & ~after)
+        for (_, rule_pos), sign in ((added, 1), (resolved, -1)):
+            for k in rules[rule_pos]:
+                self.risk_counts[self.engine.rules[k][2]] += sign
+        return self._delta(users[added[0]], rules[added[1]], users[resolved[0]], rules[resolved[1]])
+
+    def _delta(self, added_users=(), added_rules=(), resolved_users=(), resolved_rules=()):
+        ids = self.engine.rule_ids
+        return ([(self.users[u], ids[k]) for u, k in zip(added_users, added_rules)],
+                [(self.users[u], ids[k]) for u, k in zip(resolved_users, resolved_rules)])
+
+
+# ============================================================================
+# SYNTHETIC ASSIGNMENTS
+# ============================================================================
+
+_FIRST_INITIALS = list("JMAKRTDPNSLCBEW")
+_LAST_NAMES = ["SMITH", "JONES", "BROWN", "WILSON", "GARCIA", "LEE", "CHEN", "KIM", "WANG", "ZHOU",
+               "DAVIS", "MILLER", "TAYLOR", "ANDERSON", "THOMAS"]
+
+# Display-only T-codes padded into roles; no rule mentions them
+_DISPLAY_TCODES = ["FBL1N", "FBL3N", "FBL5N", "ME23N", "VA03", "MM03", "FS10N", "PA20", "SU53", "SE16N"]
+
+
+def sap_user_ids(n, rng):
+    """`n` distinct SAP-style user IDs such as JSMITH42"""
+    ids = pd.Series(
+        np.array(_FIRST_INITIALS)[rng.integers(len(_FIRST_INITIALS), size=n)].astype(object)
+        + np.array(_LAST_NAMES)[rng.integers(len(_LAST_NAMES), size=n)].astype(object)
+        + rng.integers(10, 100, size=n).astype(str).astype(object)
+    )
+    repeat = ids.groupby(ids).cumcount()
+    return np.where(repeat > 0, ids + '_' + (repeat + 1).astype(str), ids).astype(str)
+
+
+def role_catalog(rules):
+    """
+    Role → T-code table with one role per rule function (e.g. Z_AP_CREATE_VENDOR).
+
+    A role is named after the module of the first rule mentioning its function
+    and holds the union of that function's T-codes across rules, plus two
+    display-only T-codes.
+    """
+    functions = {}
+    for rule_id, description, _, tcodes_1, tcodes_2 in rules:
+        for name, tcodes in zip(description.split(' vs '), (tcodes_1, tcodes_2)):
+            module = rule_id.rstrip('0123456789')
+            role, known = functions.setdefault(name, (f"Z_{module}_{name.upper().replace(' ', '_')}", set()))
+            known.update(tcodes)
+
+    rows = []
+    for i, (role, tcodes) in enumerate(functions.values()):
+        rows.extend((role, t) for t in sorted(tcodes))
+        rows.extend((role, _DISPLAY_TCODES[j % len(_DISPLAY_TCODES)]) for j in (i, i + 3))
+    return pd.DataFrame(rows, columns=['Role', 'T-code'])
+
+
+def generate_access_assignments(rules, n_users, roles_per_user=3, cross_module=0.15, seed=None):
+    """
+    Synthetic user → role and role → T-code tables over the `role_catalog` roles.
+
+    Users mostly hold roles of one module, so conflicts arise the way they do
+    in practice: from accumulating roles within a department, plus the odd
+    cross-module grant.
+
+    Returns:
+        (user_roles, role_tcodes) DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    role_tcodes = role_catalog(rules)
+    role_names = list(pd.unique(role_tcodes['Role']))
+
+    modules, role_module = np.unique([role.split('_')[1] for role in role_names], return_inverse=True)
+    module_roles = np.argsort(role_module, kind='stable')
+    module_size = np.bincount(role_module, minlength=len(modules))
+    module_start = np.cumsum(module_size) - module_size
+
+    user_ids = sap_user_ids(n_users, rng)
+    n_roles = np.maximum(1, rng.poisson(roles_per_user, n_users))
+    user_idx = np.repeat(np.arange(n_users), n_roles)
+    module = rng.integers(len(modules), size=n_users)[user_idx]
+    crossed = rng.random(len(user_idx)) < cross_module
+    module[crossed] = rng.integers(len(modules), size=int(crossed.sum()))
+    pick = module_start[module] + (rng.random(len(user_idx)) * module_size[module]).astype(np.int64)
+    pairs = np.unique(user_idx * len(role_names) + module_roles[pick])
+
+    user_roles = pd.DataFrame({
+        'User ID': user_ids[pairs // len(role_names)],
+        'Role': np.array(role_names)[pairs % len(role_names)],
+    })
+    return user_roles, role_tcodes
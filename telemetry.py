@@ -0,0 +1,352 @@
+"""
+Bus Telemetry Utilities
+Sensor definitions, synthetic fleet generation and vectorized helpers for the
+Predictive Maintenance demo
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from quantiles import DEFAULT_COMPRESSION, TDigest
+
+# ============================================================================
+# SENSOR DEFINITIONS
+# ============================================================================
+
+# 17 IoT sensors monitored on every bus
+SENSOR_NAMES = [
+    'Engine Temperature', 'Engine Load', 'Fuel Rate', 'Vibration X', 'Vibration Y',
+    'Vibration Z', 'Board Voltage', 'RPM', 'Oil Pressure', 'Coolant Temp',
+    'Intake Air Temp', 'Exhaust Temp', 'Throttle Position', 'Battery Voltage',
+    'Transmission Temp', 'Brake Pressure', 'Wheel Speed'
+]
+
+# Synthetic sensor signatures: (mean, std, anomaly_factor); readings drift by
+# anomaly_factor per unit of anomaly score. RPM is generated separately.
+SENSOR_PROFILES = {
+    'Engine Temperature': (75, 8, 15),
+    'Engine Load': (45, 15, 20),
+    'Fuel Rate': (25, 5, 8),
+    'Vibration X': (0.5, 0.2, 0.8),
+    'Vibration Y': (0.4, 0.15, 0.6),
+    'Vibration Z': (0.3, 0.1, 0.5),
+    'Board Voltage': (26, 1.5, -2),
+    'Oil Pressure': (45, 8, 10),
+    'Coolant Temp': (85, 5, 12),
+    'Intake Air Temp': (35, 8, 5),
+    'Exhaust Temp': (450, 50, 80),
+    'Throttle Position': (30, 15, 10),
+    'Battery Voltage': (12.6, 0.3, -0.5),
+    'Transmission Temp': (80, 10, 15),
+    'Brake Pressure': (100, 20, 25),
+    'Wheel Speed': (45, 15, 10),
+}
+
+# RPM below this is idling and dropped before analysis
+IDLE_RPM = 700
+
+# Nominal operating point of the sensors used by the maintenance classifier
+NOMINAL = {
+    'Vibration X': 0.5,
+    'Vibration Y': 0.4,
+    'Vibration Z': 0.3,
+    'Board Voltage': 26,
+    'Battery Voltage': 12.6,
+    'Engine Temperature': 75,
+    'Engine Load': 45,
+    'Exhaust Temp': 450,
+    'Oil Pressure': 45,
+}
+
+# ============================================================================
+# MAINTENANCE TYPE CLASSIFIER
+# ============================================================================
+
+MAINTENANCE_TYPES = ['Normal', '🔧 Mechanical', '⚡ Electrical', '🔥 Engine Performance']
+
+# Readings scoring below this are never attributed to a maintenance category
+NORMAL_SCORE_LIMIT = 0.5
+
+# Maintenance category each sensor's reconstruction error is attributed to
+SENSOR_CATEGORIES = {
+    'Engine Temperature': '🔥 Engine Performance',
+    'Engine Load': '🔥 Engine Performance',
+    'Fuel Rate': '🔥 Engine Performance',
+    'Vibration X': '🔧 Mechanical',
+    'Vibration Y': '🔧 Mechanical',
+    'Vibration Z': '🔧 Mechanical',
+    'Board Voltage': '⚡ Electrical',
+    'RPM': '🔥 Engine Performance',
+    'Oil Pressure': '🔥 Engine Performance',
+    'Coolant Temp': '🔥 Engine Performance',
+    'Intake Air Temp': '🔥 Engine Performance',
+    'Exhaust Temp': '🔥 Engine Performance',
+    'Throttle Position': '🔥 Engine Performance',
+    'Battery Voltage': '⚡ Electrical',
+    'Transmission Temp': '🔧 Mechanical',
+    'Brake Pressure': '🔧 Mechanical',
+    'Wheel Speed': '🔧 Mechanical',
+}
+
+
+def _abs_dev(df, sensor):
+    """Absolute deviation of one sensor column from its nominal value"""
+    return np.abs(df[sensor].to_numpy(dtype=np.float64) - NOMINAL[sensor])
+
+
+def maintenance_deviation_matrix(df):
+    """
+    Build the (rows × 3) deviation matrix used to pick a maintenance category.
+
+    Columns follow MAINTENANCE_TYPES[1:]: mechanical (vibration), electrical
+    (voltages) and engine performance (temperature, load, exhaust, oil).
+    """
+    vibration = (_abs_dev(df, 'Vibration X') + _abs_dev(df, 'Vibration Y') + _abs_dev(df, 'Vibration Z')) / 3
+    electrical = _abs_dev(df, 'Board Voltage') / 3 + _abs_dev(df, 'Battery Voltage') / 1
+    engine = (_abs_dev(df, 'Engine Temperature') / 20 + _abs_dev(df, 'Engine Load') / 30 +
+              _abs_dev(df, 'Exhaust Temp') / 100 + _abs_dev(df, 'Oil Pressure') / 15) / 4
+    return np.column_stack([vibration, electrical, engine])
+
+
+def classify_maintenance_type(df, score_col='Anomaly Score'):
+    """
+    Label every row with its dominant maintenance category in one column-wise pass.
+
+    Rows scoring below NORMAL_SCORE_LIMIT are 'Normal'; the rest take the category
+    with the largest deviation (ties resolve to the first category, like max()).
+
+    Returns:
+        pd.Categorical with categories MAINTENANCE_TYPES
+    """
+    deviations = maintenance_deviation_matrix(df)
+    scores = df[score_col].to_numpy()
+    codes = np.where(scores < NORMAL_SCORE_LIMIT, 0, np.argmax(deviations, axis=1) + 1).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=MAINTENANCE_TYPES)
+
+
+# ============================================================================
+# ANOMALY PERIOD INJECTION
+# ============================================================================
+
+def inject_anomaly_periods(scores, periods, rng, chunk_size=1_000_000):
+    """
+    Overwrite random samples inside each anomaly period, in place.
+
+    Args:
+        scores: Anomaly scores, shape (n_points,) or (n_buses, n_points); the
+            period fractions always refer to the last (time) axis
+        periods: Iterable of (start_frac, end_frac, probability, low, high). Each
+            sample in [start_frac, end_frac) is replaced with probability
+            `probability` by a draw from uniform(low, high). Periods are applied
+            in order, so later ones win where they overlap.
+        rng: np.random.Generator, the only source of randomness
+        chunk_size: Maximum samples handled per masked write, which bounds the
+            temporary mask when generating long, high-frequency fleet histories
+
+    Returns:
+        The same `scores` array
+    """
+    if scores.size == 0:
+        return scores  # No samples (e.g. an empty history window)
+    n_points = scores.shape[-1]
+    step = max(1, chunk_size // max(1, scores.size // n_points))
+    for start_frac, end_frac, probability, low, high in periods:
+        start, end = int(n_points * start_frac), int(n_points * end_frac)
+        for chunk_start in range(start, end, step):
+            segment = scores[..., chunk_start:min(chunk_start + step, end)]
+            if probability >= 1:
+                segment[...] = rng.uniform(low, high, segment.shape)
+                continue
+            mask = rng.random(segment.shape, dtype=np.float32) < probability
+            segment[mask] = rng.uniform(low, high, np.count_nonzero(mask))
+    return scores
+
+
+# ============================================================================
+# SYNTHETIC BUS HISTORY
+# ============================================================================
+
+HISTORY_START = '2024-11-01'
+HISTORY_END = '2025-09-15'
+
+# Bumped whenever generate_bus_history's output changes, so stored histories are rebuilt
+GENERATOR_VERSION = 3
+
+# Known vehicles shown first in the demo; larger fleets get synthetic IDs
+KNOWN_BUS_IDS = ['WA7230M', 'WA9479M', 'WB8743F', 'WB915L', 'WB946L', 'WWB872U']
+
+
+def stable_seed(seed, key):
+    """
+    Derive a per-key seed that is identical across processes and runs.
+
+    Python's hash() is salted per interpreter, so it cannot be used for this.
+    """
+    digest = hashlib.blake2b(f"{seed}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def fleet_bus_ids(n_buses):
+    """Deterministic vehicle IDs: the known buses first, then synthetic plates"""
+    ids = KNOWN_BUS_IDS[:n_buses]
+    letters = 'ABCDEFGHJKLMNPRSTUVWXY'
+    i = 0
+    while len(ids) < n_buses:
+        h = stable_seed('fleet', i)
+        plate = f"W{letters[h % 22]}{1000 + (h >> 8) % 9000}{letters[(h >> 24) % 22]}"
+        if plate not in ids:
+            ids.append(plate)
+        i += 1
+    return ids
+
+
+def jitter_periods(periods, rng, max_shift):
+    """Shift every anomaly period by the same random offset (fraction of history)"""
+    if not max_shift:
+        return list(periods)
+    shift = rng.uniform(-max_shift, max_shift)
+    return [
+        (min(max(start + shift, 0.0), 1.0), min(max(end + shift, 0.0), 1.0), p, low, high)
+        for start, end, p, low, high in periods
+    ]
+
+
+def generate_bus_history(seed, periods, freq='4h', start=HISTORY_START, end=HISTORY_END, period_jitter=0.0):
+    """
+    Generate one bus's sensor history with anomaly scores and maintenance labels.
+
+    All randomness comes from np.random.default_rng(seed), so the output depends
+    only on the arguments. Idling readings (RPM < IDLE_RPM) are filtered out.
+
+    Args:
+        seed: Generator seed (see stable_seed for per-bus seeds)
+        periods: Anomaly period specs for inject_anomaly_periods
+        freq: Sampling interval (pandas offset alias)
+        start, end: History range
+        period_jitter: Max random shift of the anomaly periods, as a fraction of
+            the history, so different buses do not fail in lockstep
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, end=end, freq=freq)
+    n_points = len(dates)
+
+    # Base anomaly scores (reconstruction errors) with a periodic pattern
+    base_scores = rng.exponential(0.15, n_points)
+    hour_of_week = (dates.dayofweek * 24 + dates.hour).to_numpy()
+    seasonal = 0.1 * np.sin(2 * np.pi * hour_of_week / (24 * 7))  # Weekly pattern (calendar-aligned)
+    base_scores = base_scores + seasonal + 0.1
+
+    # Anomaly periods with maintenance type indicators, plus one sharp spike
+    inject_anomaly_periods(base_scores, jitter_periods(periods, rng, period_jitter), rng)
+    base_scores[int(n_points * 0.45)] = 3.75
+
+    base_scores[-1] = 1.2732
+    base_scores = np.clip(base_scores, 0, 4)
+
+    # RPM with operating state simulation
+    # Normal operating RPM: 800-2500, Idling: 400-700 (about 15% of data)
+    rpm_base = rng.normal(1500, 300, n_points)
+    idling_mask = rng.random(n_points) < 0.15
+    rpm_base[idling_mask] = rng.uniform(400, 650, idling_mask.sum())
+    rpm = rpm_base + base_scores * 200
+
+    data = {
+        'timestamp': dates,
+        'Anomaly Score': base_scores,
+        'RPM': rpm,
+    }
+    for sensor, (mean, std, anomaly_factor) in SENSOR_PROFILES.items():
+        data[sensor] = mean + base_scores * anomaly_factor + rng.normal(0, std, n_points)
+
+    df = pd.DataFrame(data)
+
+    # Filter out idling state for cleaner trend analysis
+    df = df[df['RPM'] >= IDLE_RPM].reset_index(drop=True)
+
+    df['Maintenance Type'] = classify_maintenance_type(df)
+
+    # 95th percentile threshold on filtered data, from the same mergeable sketch
+    # that fleet-wide thresholds are combined from (see generate_fleet)
+    threshold_95 = float(score_digest(df).percentile(95))
+    df['Is Anomaly'] = df['Anomaly Score'] > threshold_95
+    df['Threshold_95'] = threshold_95
+
+    return df
+
+
+def score_digest(df, compression=DEFAULT_COMPRESSION):
+    """t-digest of a history's anomaly scores"""
+    return TDigest(compression).update(df['Anomaly Score'].to_numpy())
+
+
+# ============================================================================
+# FLEET GENERATION
+# ============================================================================
+
+def _generate_bus_task(task):
+    """Process-pool entry point (must be importable at module level)"""
+    bus_id, seed, kwargs = task
+    df = generate_bus_history(stable_seed(seed, bus_id), **kwargs)
+    return bus_id, df, score_digest(df)
+
+
+def history_months(start=HISTORY_START, end=HISTORY_END):
+    return (pd.Timestamp(end) - pd.Timestamp(start)).days / 30.44
+
+
+# Fewer buses than this per worker are not worth a process start-up
+MIN_BUSES_PER_WORKER = 4
+
+
+def generate_fleet(bus_ids, seed, periods, freq='4h', start=HISTORY_START, end=HISTORY_END,
+                   period_jitter=0.05, max_workers=None):
+    """
+    Generate distinct, deterministic histories for many buses in parallel.
+
+    Each bus is seeded with stable_seed(seed, bus_id), so a bus's history does not
+    depend on the fleet size, on worker scheduling or on the interpreter.
+
+    Args:
+        max_workers: Upper bound on processes (None = all cores); small fleets
+            and max_workers=1 are generated in-process
+
+    Returns:
+        (histories, stats): dict bus_id → DataFrame, and a dict with n_buses,
+        workers, seconds, bus_months, bus_months_per_sec, bus_digests (bus_id →
+        score TDigest made by the workers) and score_digest (those merged into
+        one TDigest over the generated buses)
+    """
+    kwargs = dict(periods=list(periods), freq=freq, start=start, end=end, period_jitter=period_jitter)
+    tasks = [(bus_id, seed, kwargs) for bus_id in bus_ids]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks) // MIN_BUSES_PER_WORKER))
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = list(map(_generate_bus_task, tasks))
+    else:
+        # spawn: never fork a process that may be running server threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            results = list(pool.map(_generate_bus_task, tasks, chunksize=chunksize))
+    histories = {bus_id: df for bus_id, df, _ in results}
+    bus_digests = {bus_id: digest for bus_id, _, digest in results}
+    fleet_digest = TDigest.merge_all(bus_digests.values())
+    seconds = time.perf_counter() - started
+
+    bus_months = len(tasks) * history_months(start, end)
+    stats = {
+        'n_buses': len(tasks),
+        'workers': workers,
+        'seconds': seconds,
+        'bus_months': bus_months,
+        'bus_months_per_sec': bus_months / seconds if seconds else float('inf'),
+        'bus_digests': bus_digests,
+        'score_digest': fleet_digest,
+    }
+    return histories, stats